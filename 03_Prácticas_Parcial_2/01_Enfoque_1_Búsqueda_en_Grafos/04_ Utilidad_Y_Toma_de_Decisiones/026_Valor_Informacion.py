@@ -1,3 +1,6 @@
+import numpy as np
+from itertools import product
+
 # ============================================================================
 # 26. VALOR DE LA INFORMACIÓN
 # ============================================================================
@@ -37,6 +40,146 @@ def valor_informacion_perfecta(probabilidades, utilidades):
     # VIP = diferencia
     return utilidad_con_info - utilidad_sin_info
 
+# ============================================================================
+# EVALUADOR VECTORIZADO: UTILIDAD ESPERADA Y VALOR DE LA INFORMACIÓN
+# ============================================================================
+
+class EvaluadorDecision:
+    """
+    Compila los nodos de azar (independientes) y la tabla de utilidad en
+    arrays de NumPy para evaluar todas las decisiones y el valor de la
+    información de muchas observaciones candidatas de una sola vez
+    """
+    def __init__(self, nodos_azar, acciones, utilidad):
+        """
+        Args:
+            nodos_azar: dict {nombre: {valor: probabilidad}}
+            acciones: lista de acciones posibles
+            utilidad: función utilidad(valores_azar, accion) con
+                      valores_azar = {nombre: valor}, o un array con forma
+                      (|X1|, ..., |Xc|, |acciones|) en el orden de nodos_azar
+        """
+        self.variables = list(nodos_azar.keys())
+        self.valores = {v: list(dist.keys()) for v, dist in nodos_azar.items()}
+        self.priors = [np.array(list(nodos_azar[v].values()), dtype=float)
+                       for v in self.variables]
+        self.acciones = list(acciones)
+        self.indice = {v: i for i, v in enumerate(self.variables)}
+        
+        if callable(utilidad):
+            self.U = self._compilar_utilidad(utilidad)
+        else:
+            self.U = np.asarray(utilidad, dtype=float)
+        
+        forma = tuple(len(p) for p in self.priors) + (len(self.acciones),)
+        if self.U.shape != forma:
+            raise ValueError(f"La tabla de utilidad debe tener forma {forma}")
+        
+        # Marginales intermedias ya calculadas: {variable: W[x, d]}
+        self._marginales = {}
+    
+    def _compilar_utilidad(self, funcion):
+        """Evalúa la función de utilidad una sola vez en cada combinación"""
+        dims = [len(self.valores[v]) for v in self.variables]
+        U = np.empty(dims + [len(self.acciones)])
+        for indices in product(*(range(d) for d in dims)):
+            asignacion = {v: self.valores[v][i] for v, i in zip(self.variables, indices)}
+            for k, accion in enumerate(self.acciones):
+                U[indices + (k,)] = funcion(asignacion, accion)
+        return U
+    
+    def _contraer(self, conservar=None):
+        """
+        Contrae la tabla de utilidad con todos los priors salvo (opcionalmente)
+        el de la variable 'conservar', cuyo eje se mantiene sin sumar
+        """
+        c = len(self.variables)
+        ejes_u = list(range(c + 1))
+        operandos = []
+        for i, prior in enumerate(self.priors):
+            if i != conservar:
+                operandos += [prior, [i]]
+        salida = [c] if conservar is None else [conservar, c]
+        return np.einsum(*operandos, self.U, ejes_u, salida, optimize=True)
+    
+    def utilidades_esperadas(self):
+        """
+        Utilidad esperada de TODAS las acciones en una sola contracción
+        Returns:
+            array de tamaño |acciones|
+        """
+        return self._contraer()
+    
+    def mejor_decision(self):
+        """
+        Returns:
+            (accion, utilidad_esperada) de la mejor acción sin información
+        """
+        ue = self.utilidades_esperadas()
+        k = int(np.argmax(ue))
+        return self.acciones[k], float(ue[k])
+    
+    def marginal_ponderada(self, variable):
+        """
+        W[x, d] = P(X=x) · E[U | X=x, d] (se calcula una vez y se guarda)
+        Args:
+            variable: nombre del nodo de azar
+        """
+        if variable not in self._marginales:
+            i = self.indice[variable]
+            self._marginales[variable] = self.priors[i][:, None] * self._contraer(conservar=i)
+        return self._marginales[variable]
+    
+    def valor_informacion_perfecta(self, variables=None):
+        """
+        VIP de observar cada variable (por separado) antes de decidir
+        Args:
+            variables: lista de nombres (None = todos los nodos de azar)
+        Returns:
+            dict {variable: VIP}
+        """
+        if variables is None:
+            variables = self.variables
+        base = self.utilidades_esperadas().max()
+        return {v: float(self.marginal_ponderada(v).max(axis=1).sum() - base)
+                for v in variables}
+    
+    def valor_informacion_imperfecta(self, sensores):
+        """
+        Valor de la información de sensores ruidosos, evaluados por lotes:
+        todos los sensores que observan la misma variable se apilan en un
+        tensor y se procesan en una sola contracción
+        Args:
+            sensores: dict {nombre_sensor: (variable, verosimilitud)} donde
+                      verosimilitud[x][o] = P(O=o | X=x)
+        Returns:
+            dict {nombre_sensor: valor de la información}
+        """
+        base = self.utilidades_esperadas().max()
+        
+        # Agrupar sensores por variable observada
+        grupos = {}
+        for nombre, (variable, verosimilitud) in sensores.items():
+            grupos.setdefault(variable, []).append((nombre, np.asarray(verosimilitud, dtype=float)))
+        
+        valores = {}
+        for variable, lista in grupos.items():
+            W = self.marginal_ponderada(variable)
+            # Rellenar con ceros hasta el mayor número de lecturas posibles
+            max_lecturas = max(L.shape[1] for _, L in lista)
+            L = np.zeros((len(lista), W.shape[0], max_lecturas))
+            for s, (_, verosimilitud) in enumerate(lista):
+                L[s, :, :verosimilitud.shape[1]] = verosimilitud
+            
+            # Para cada sensor y lectura: utilidad de la mejor acción
+            ue_por_lectura = np.einsum('sxo,xd->sod', L, W, optimize=True)
+            con_info = ue_por_lectura.max(axis=2).sum(axis=1)
+            for s, (nombre, _) in enumerate(lista):
+                valores[nombre] = float(con_info[s] - base)
+        
+        return valores
+
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -57,4 +200,47 @@ if __name__ == "__main__":
     
     print(f"Probabilidades de estado: {probs}")
     print(f"Utilidades (Estado, Acción): {utils}")
-    print(f"\n   Valor de la Información Perfecta (VIP) = {vip:.2f}")
\ No newline at end of file
+    print(f"\n   Valor de la Información Perfecta (VIP) = {vip:.2f}")
+    
+    print("\n=== Evaluador vectorizado ===\n")
+    
+    # Mismo problema, compilado en arrays
+    evaluador = EvaluadorDecision(
+        {'Pozo': {'petroleo': 0.6, 'seco': 0.4}},
+        ['perforar', 'no_perforar'],
+        lambda azar, accion: (100 if azar['Pozo'] == 'petroleo' else -50) if accion == 'perforar' else 0
+    )
+    print(f"   Utilidades esperadas: {dict(zip(evaluador.acciones, evaluador.utilidades_esperadas().tolist()))}")
+    print(f"   Mejor decisión sin información: {evaluador.mejor_decision()}")
+    print(f"   VIP(Pozo) = {evaluador.valor_informacion_perfecta()['Pozo']:.2f} (debe coincidir con {vip:.2f})")
+    
+    # Sensores sísmicos con distinta precisión: P(lectura | Pozo)
+    sensores = {}
+    for precision in np.linspace(0.5, 1.0, 6):
+        sensores[f"sismico_{precision:.1f}"] = ('Pozo', [[precision, 1 - precision],
+                                                        [1 - precision, precision]])
+    vii = evaluador.valor_informacion_imperfecta(sensores)
+    print("\n   Valor de la información imperfecta por sensor:")
+    for nombre, valor in vii.items():
+        print(f"      {nombre}: {valor:.2f}")
+    
+    # Ranking de cientos de sensores sobre varios nodos de azar
+    print("\n   Ranking de 300 sensores candidatos (3 nodos de azar):")
+    rng = np.random.default_rng(0)
+    nodos = {
+        'Demanda': {'baja': 0.3, 'media': 0.5, 'alta': 0.2},
+        'Costo': {'bajo': 0.6, 'alto': 0.4},
+        'Clima': {'bueno': 0.7, 'malo': 0.3}
+    }
+    grande = EvaluadorDecision(nodos, ['A', 'B', 'C', 'D'], rng.normal(0, 10, size=(3, 2, 2, 4)))
+    candidatos = {}
+    for k in range(300):
+        variable = list(nodos)[k % 3]
+        L = rng.dirichlet(np.ones(3), size=len(nodos[variable]))
+        candidatos[f"sensor_{k}"] = (variable, L)
+    ranking = sorted(grande.valor_informacion_imperfecta(candidatos).items(),
+                     key=lambda par: -par[1])
+    vip_grande = grande.valor_informacion_perfecta()
+    for nombre, valor in ranking[:3]:
+        variable = candidatos[nombre][0]
+        print(f"      {nombre} ({variable}): {valor:.3f}  (cota VIP={vip_grande[variable]:.3f})")
@@ -1,3 +1,5 @@
+import numpy as np
+
 # ============================================================================
 # 32. TEORÍA DE JUEGOS: EQUILIBRIOS Y MECANISMOS
 # ============================================================================
@@ -83,6 +85,274 @@ def estrategia_minimax(matriz_pagos_j1):
     
     return None
 
+# ============================================================================
+# MOTOR VECTORIZADO: EQUILIBRIOS PUROS, MINIMAX MIXTO Y LEMKE-HOWSON
+# ============================================================================
+
+def equilibrio_nash_puro_vectorizado(matriz_pagos_j1, matriz_pagos_j2):
+    """
+    Encuentra equilibrios de Nash puros con máscaras de mejor respuesta
+    Args:
+        matriz_pagos_j1: matriz (m x n) de pagos del jugador 1
+        matriz_pagos_j2: matriz (m x n) de pagos del jugador 2
+    Returns:
+        lista de equilibrios (fila, columna)
+    """
+    A = np.asarray(matriz_pagos_j1, dtype=float)
+    B = np.asarray(matriz_pagos_j2, dtype=float)
+    
+    # J1 responde óptimamente si su pago es el máximo de la columna
+    mejor_j1 = A == A.max(axis=0, keepdims=True)
+    # J2 responde óptimamente si su pago es el máximo de la fila
+    mejor_j2 = B == B.max(axis=1, keepdims=True)
+    
+    # Cada celda se revisa una sola vez: O(m·n) en lugar de O(m·n·(m+n))
+    return [(int(i), int(j)) for i, j in np.argwhere(mejor_j1 & mejor_j2)]
+
+
+def _intercambiar(tabla, fila, columna):
+    """
+    Pivoteo de intercambio sobre una tabla simplex condensada (en sitio).
+    La tabla no guarda el bloque identidad de las holguras: la variable
+    básica de la fila y la no básica de la columna simplemente se intercambian.
+    Args:
+        tabla: matriz numpy (filas = básicas, columnas = no básicas,
+               última columna = lado derecho)
+        fila, columna: posición del pivote
+    """
+    pivote = tabla[fila, columna]
+    renglon = tabla[fila] / pivote
+    factores = tabla[:, columna].copy()
+    factores[fila] = 0.0
+    
+    # Solo se actualizan las filas con factor distinto de cero
+    activas = np.flatnonzero(factores)
+    if activas.size == tabla.shape[0] - 1:
+        tabla -= np.outer(factores, renglon)
+    elif activas.size:
+        tabla[activas] -= np.outer(factores[activas], renglon)
+    
+    tabla[fila] = renglon
+    tabla[:, columna] = -factores / pivote
+    tabla[fila, columna] = 1.0 / pivote
+
+
+def _prueba_razon(tabla, columna, etiquetas_base=None, filas=None, tolerancia=1e-12):
+    """
+    Prueba de razón mínima del simplex
+    Args:
+        tabla: matriz numpy (la última columna es el lado derecho)
+        columna: columna que entra a la base
+        etiquetas_base: si se da, los empates se rompen por la menor
+                        etiqueta básica (regla de Bland)
+        filas: número de filas de restricción a considerar (None = todas)
+    Returns:
+        índice de la fila que sale, o None si la dirección no está acotada
+    """
+    coef = tabla[:filas, columna]
+    # Los errores de redondeo pueden dejar lados derechos ligeramente negativos
+    lado_derecho = np.maximum(tabla[:filas, -1], 0.0)
+    validas = coef > tolerancia
+    if not validas.any():
+        return None
+    razones = np.full(coef.shape, np.inf)
+    razones[validas] = lado_derecho[validas] / coef[validas]
+    if etiquetas_base is None:
+        return int(np.argmin(razones))
+    
+    empatadas = np.flatnonzero(razones <= razones.min() + tolerancia)
+    return int(empatadas[np.argmin(etiquetas_base[empatadas])])
+
+
+def estrategia_mixta_minimax(matriz_pagos_j1, max_iter=100000, tolerancia=1e-9,
+                             max_degenerados=50):
+    """
+    Resuelve un juego de suma cero en estrategias mixtas mediante
+    programación lineal (simplex sobre una tabla condensada de NumPy).
+    
+    Cada pivoteo cuesta O(m·n) y el número de pivoteos crece con el tamaño
+    del soporte; con la regla de la arista más pronunciada un juego
+    gaussiano de 1000 x 1000 requiere unos pocos miles de pivoteos.
+    Args:
+        matriz_pagos_j1: matriz (m x n) de pagos del jugador maximizador (J1)
+        max_iter: número máximo de pivoteos
+        tolerancia: tolerancia numérica para costos reducidos
+        max_degenerados: pivoteos degenerados seguidos antes de pasar
+                         a la regla de Bland (evita ciclos)
+    Returns:
+        (estrategia_j1, estrategia_j2, valor) con estrategias como arrays,
+        o None si no se alcanza el óptimo en max_iter pivoteos
+    """
+    A = np.asarray(matriz_pagos_j1, dtype=float)
+    m, n = A.shape
+    
+    # Desplazar los pagos para que sean positivos (valor del juego > 0)
+    desplazamiento = 1.0 - A.min()
+    
+    # Programa de J2: max sum(y)  s.a.  A·y <= 1, y >= 0
+    # Tabla condensada: [A | 1] y fila objetivo [-1 ... -1 | 0]
+    tabla = np.empty((m + 1, n + 1))
+    tabla[:m, :n] = A + desplazamiento
+    tabla[:m, n] = 1.0
+    tabla[m, :n] = -1.0
+    tabla[m, n] = 0.0
+    
+    # Etiquetas: 0..n-1 = variables y_j, n..n+m-1 = holguras de cada fila
+    no_basicas = np.arange(n)
+    basicas = np.arange(n, n + m)
+    
+    degenerados = 0
+    for _ in range(max_iter):
+        costos = tabla[m, :n]
+        candidatas = costos < -tolerancia
+        if not candidatas.any():
+            break
+        
+        if degenerados < max_degenerados:
+            # Arista más pronunciada: costo reducido normalizado por la
+            # longitud de la columna (muchos menos pivoteos que Dantzig)
+            normas = np.sqrt(1.0 + np.einsum('ij,ij->j', tabla[:m, :n], tabla[:m, :n]))
+            columna = int(np.argmin(costos / normas))
+            fila = _prueba_razon(tabla, columna, filas=m)
+        else:
+            # Regla de Bland: menor etiqueta que mejora y menor etiqueta que sale
+            indices = np.flatnonzero(candidatas)
+            columna = int(indices[np.argmin(no_basicas[indices])])
+            fila = _prueba_razon(tabla, columna, etiquetas_base=basicas, filas=m)
+        if fila is None:
+            return None  # No debería ocurrir con pagos positivos
+        
+        if tabla[fila, n] <= tolerancia:
+            degenerados += 1
+        elif degenerados < max_degenerados:
+            degenerados = 0
+        
+        _intercambiar(tabla, fila, columna)
+        basicas[fila], no_basicas[columna] = no_basicas[columna], basicas[fila]
+    else:
+        return None
+    
+    # Solución primal (J2): variables y básicas
+    y = np.zeros(n)
+    es_y = basicas < n
+    y[basicas[es_y]] = tabla[:m, n][es_y]
+    # Solución dual (J1): costos reducidos de las holguras no básicas
+    x = np.zeros(m)
+    es_holgura = no_basicas >= n
+    x[no_basicas[es_holgura] - n] = tabla[m, :n][es_holgura]
+    
+    suma = tabla[m, n]  # = sum(y) = sum(x) = 1 / valor
+    estrategia_j1 = x / suma
+    estrategia_j2 = y / suma
+    valor = 1.0 / suma - desplazamiento
+    
+    return estrategia_j1, estrategia_j2, valor
+
+
+def _camino_lemke_howson(A, B, etiqueta_inicial, max_iter):
+    """
+    Sigue el camino de Lemke-Howson desde una etiqueta inicial
+    Args:
+        A, B: matrices de pagos (estrictamente positivos)
+        etiqueta_inicial: etiqueta que se suelta al inicio
+        max_iter: número máximo de pivoteos
+    Returns:
+        ((estrategia_j1, estrategia_j2), pivoteos) o (None, pivoteos)
+        si se agota el presupuesto
+    """
+    m, n = A.shape
+    
+    # Etiquetas 0..m-1 = estrategias de J1, m..m+n-1 = estrategias de J2
+    # Politopo P (J1): B'·x <= 1, x no básicas, holguras (m..m+n-1) básicas
+    # Politopo Q (J2): A·y <= 1, y no básicas, holguras (0..m-1) básicas
+    politopos = [
+        {'tabla': np.hstack([B.T, np.ones((n, 1))]),
+         'basicas': np.arange(m, m + n), 'no_basicas': np.arange(m)},
+        {'tabla': np.hstack([A, np.ones((m, 1))]),
+         'basicas': np.arange(m), 'no_basicas': np.arange(m, m + n)},
+    ]
+    
+    # Soltar la etiqueta inicial en el politopo donde es no básica
+    turno = 0 if etiqueta_inicial < m else 1
+    entra = etiqueta_inicial
+    for pivoteos in range(1, max_iter + 1):
+        politopo = politopos[turno]
+        columna = int(np.flatnonzero(politopo['no_basicas'] == entra)[0])
+        fila = _prueba_razon(politopo['tabla'], columna)
+        if fila is None:
+            return None, pivoteos
+        sale = int(politopo['basicas'][fila])
+        _intercambiar(politopo['tabla'], fila, columna)
+        politopo['basicas'][fila] = entra
+        politopo['no_basicas'][columna] = sale
+        
+        # Se recuperó la etiqueta perdida: equilibrio completamente etiquetado
+        if sale == etiqueta_inicial:
+            break
+        
+        # La etiqueta que sale está duplicada; entra en el otro politopo
+        entra = sale
+        turno = 1 - turno
+    else:
+        return None, max_iter
+    
+    p, q = politopos
+    x = np.zeros(m)
+    es_x = p['basicas'] < m
+    x[p['basicas'][es_x]] = p['tabla'][es_x, -1]
+    y = np.zeros(n)
+    es_y = q['basicas'] >= m
+    y[q['basicas'][es_y] - m] = q['tabla'][es_y, -1]
+    
+    return (x / x.sum(), y / y.sum()), pivoteos
+
+
+def lemke_howson(matriz_pagos_j1, matriz_pagos_j2, etiqueta_inicial=None, max_iter=20000):
+    """
+    Algoritmo de Lemke-Howson para juegos bimatriz generales.
+    
+    Cada pivoteo cuesta O(m·n), pero la longitud del camino depende mucho
+    de la etiqueta inicial. Con etiqueta_inicial=None se recorren las
+    etiquetas en orden (0, 1, ...) con un límite por camino que se duplica
+    en cada ronda, y se devuelve el PRIMER equilibrio encontrado: otro orden
+    de etiquetas puede dar un equilibrio distinto.
+    Args:
+        matriz_pagos_j1: matriz (m x n) de pagos del jugador 1
+        matriz_pagos_j2: matriz (m x n) de pagos del jugador 2
+        etiqueta_inicial: etiqueta que se suelta al inicio (0 .. m+n-1),
+                          o None para probar varias
+        max_iter: presupuesto TOTAL de pivoteos (sumando todos los intentos)
+    Returns:
+        (estrategia_j1, estrategia_j2) como arrays, o None si se agota
+        el presupuesto
+    """
+    A = np.asarray(matriz_pagos_j1, dtype=float)
+    B = np.asarray(matriz_pagos_j2, dtype=float)
+    m, n = A.shape
+    
+    # Pagos estrictamente positivos para que los politopos estén acotados
+    A = A + (1.0 - A.min())
+    B = B + (1.0 - B.min())
+    
+    if etiqueta_inicial is not None:
+        equilibrio, _ = _camino_lemke_howson(A, B, etiqueta_inicial, max_iter)
+        return equilibrio
+    
+    restante = max_iter
+    limite = m + n
+    while restante > 0:
+        for etiqueta in range(m + n):
+            equilibrio, usados = _camino_lemke_howson(A, B, etiqueta, min(limite, restante))
+            restante -= usados
+            if equilibrio is not None:
+                return equilibrio
+            if restante <= 0:
+                break
+        limite *= 2
+    
+    return None
+
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -129,4 +399,83 @@ if __name__ == "__main__":
         print(f"   Punto de silla encontrado en (fila, col): ({resultado[0]}, {resultado[1]})")
         print(f"   Valor del juego: {resultado[2]}")
     else:
-        print("   No se encontró punto de silla (requiere estrategias mixtas).")
\ No newline at end of file
+        print("   No se encontró punto de silla (requiere estrategias mixtas).")
+    
+    print("\n3. Equilibrios puros vectorizados (Dilema del Prisionero):")
+    print(f"   Equilibrios (fila, col): {equilibrio_nash_puro_vectorizado(pagos_j1, pagos_j2)}")
+    
+    print("\n4. Minimax en estrategias mixtas (Piedra, Papel, Tijera):")
+    pagos_ppt = [
+        [ 0, -1,  1],
+        [ 1,  0, -1],
+        [-1,  1,  0]
+    ]
+    resultado = estrategia_mixta_minimax(pagos_ppt)
+    if resultado:
+        p, q, valor = resultado
+        print(f"   Estrategia J1: {np.round(p, 3)}")
+        print(f"   Estrategia J2: {np.round(q, 3)}")
+        print(f"   Valor del juego: {valor:.3f}")
+    else:
+        print("   El simplex no alcanzó el óptimo.")
+    
+    print("\n5. Lemke-Howson (Batalla de los Sexos):")
+    pagos_j1_bs = [
+        [2, 0],
+        [0, 1]
+    ]
+    pagos_j2_bs = [
+        [1, 0],
+        [0, 2]
+    ]
+    for etiqueta in range(4):
+        resultado = lemke_howson(pagos_j1_bs, pagos_j2_bs, etiqueta_inicial=etiqueta)
+        if resultado:
+            x, y = resultado
+            print(f"   Etiqueta {etiqueta}: J1={np.round(x, 3)}, J2={np.round(y, 3)}")
+        else:
+            print(f"   Etiqueta {etiqueta}: sin equilibrio dentro del presupuesto.")
+    
+    print("\n6. Verificación sobre juegos aleatorios pequeños:")
+    rng = np.random.default_rng(0)
+    coinciden_puros = brecha_max = violacion_max = 0.0
+    num_juegos = 200
+    for _ in range(num_juegos):
+        m, n = rng.integers(2, 8, size=2)
+        A = rng.integers(-5, 6, size=(m, n))
+        B = rng.integers(-5, 6, size=(m, n))
+        
+        # Misma respuesta que la versión con bucles
+        if equilibrio_nash_puro(A.tolist(), B.tolist()) == equilibrio_nash_puro_vectorizado(A, B):
+            coinciden_puros += 1
+        
+        # Dualidad: min(p·A) = max(A·q) = valor
+        resultado = estrategia_mixta_minimax(A)
+        if resultado:
+            p, q, valor = resultado
+            brecha_max = max(brecha_max, abs((p @ A).min() - valor), abs((A @ q).max() - valor))
+        
+        # Mejor respuesta: ninguna estrategia pura mejora el pago esperado
+        x, y = lemke_howson(A, B)
+        violacion_max = max(violacion_max,
+                            (A @ y).max() - x @ A @ y,
+                            (x @ B).max() - x @ B @ y)
+    print(f"   Equilibrios puros coincidentes: {int(coinciden_puros)}/{num_juegos}")
+    print(f"   Brecha de dualidad máxima (minimax): {brecha_max:.2e}")
+    print(f"   Violación máxima de mejor respuesta (Lemke-Howson): {violacion_max:.2e}")
+    
+    print("\n7. Juegos grandes (200 x 200 aleatorio):")
+    A_grande = rng.normal(size=(200, 200))
+    B_grande = rng.normal(size=(200, 200))
+    resultado = estrategia_mixta_minimax(A_grande)
+    if resultado:
+        p, q, valor = resultado
+        print(f"   Valor minimax: {valor:.4f}  (soporte J1={int((p > 1e-9).sum())}, J2={int((q > 1e-9).sum())})")
+    else:
+        print("   El simplex no alcanzó el óptimo.")
+    resultado = lemke_howson(A_grande, B_grande)
+    if resultado:
+        x, y = resultado
+        print(f"   Lemke-Howson: soporte J1={int((x > 1e-9).sum())}, J2={int((y > 1e-9).sum())}")
+    else:
+        print("   Lemke-Howson agotó el presupuesto de pivoteos.")
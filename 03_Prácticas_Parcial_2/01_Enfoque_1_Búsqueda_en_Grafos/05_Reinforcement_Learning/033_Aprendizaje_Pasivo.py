@@ -1,4 +1,8 @@
+import os
+import random
+import tempfile
 from collections import defaultdict
+from itertools import islice
 
 # ============================================================================
 # 33. APRENDIZAJE POR REFUERZO PASIVO
@@ -52,6 +56,138 @@ def montecarlo_pasivo(episodios, politica, gamma=0.9):
     V = {s: sum(returns)/len(returns) for s, returns in retornos.items()}
     return V
 
+# ============================================================================
+# ESTIMADORES INCREMENTALES CON EPISODIOS EN FLUJO
+# ============================================================================
+
+class MonteCarloIncremental:
+    """
+    Monte Carlo pasivo con media incremental: V(s) += (G - V(s)) / N(s).
+    No guarda retornos, así que la memoria es O(estados + largo de episodio)
+    """
+    def __init__(self, gamma=0.9, primera_visita=True):
+        """
+        Args:
+            gamma: factor de descuento
+            primera_visita: True = first-visit MC, False = every-visit MC
+        """
+        self.gamma = gamma
+        self.primera_visita = primera_visita
+        self.V = defaultdict(float)
+        self.N = defaultdict(int)
+    
+    def procesar_episodio(self, episodio):
+        """Actualiza V con un episodio [(s, a, r, s'), ...]"""
+        if self.primera_visita:
+            primera = {}
+            for t, (s, _, _, _) in enumerate(episodio):
+                primera.setdefault(s, t)
+        
+        G = 0
+        for t in range(len(episodio) - 1, -1, -1):
+            s, _, r, _ = episodio[t]
+            G = r + self.gamma * G
+            if self.primera_visita and primera[s] != t:
+                continue
+            self.N[s] += 1
+            self.V[s] += (G - self.V[s]) / self.N[s]
+    
+    def procesar(self, episodios):
+        """Consume un iterable (p. ej. un generador) de episodios"""
+        for episodio in episodios:
+            self.procesar_episodio(episodio)
+        return dict(self.V)
+
+
+class TDLambda:
+    """
+    TD(λ) pasivo con trazas de elegibilidad (vista hacia atrás).
+    Solo se guardan las trazas de los estados visitados en el episodio
+    actual; las trazas menores que 'umbral' se descartan.
+    """
+    def __init__(self, alpha=0.1, gamma=0.9, lambd=0.8, reemplazo=False, umbral=1e-6):
+        """
+        Args:
+            alpha: tasa de aprendizaje
+            gamma: factor de descuento
+            lambd: parámetro λ de las trazas (0 = TD(0), 1 ≈ Monte Carlo)
+            reemplazo: True = trazas de reemplazo (tipo first-visit),
+                       False = trazas acumulativas (tipo every-visit)
+            umbral: trazas más pequeñas se eliminan
+        """
+        self.alpha = alpha
+        self.gamma = gamma
+        self.lambd = lambd
+        self.reemplazo = reemplazo
+        self.umbral = umbral
+        self.V = defaultdict(float)
+    
+    def procesar_episodio(self, episodio):
+        """Actualiza V con un episodio [(s, a, r, s'), ...]"""
+        trazas = {}
+        decaimiento = self.gamma * self.lambd
+        
+        for t, (s, _, r, s_siguiente) in enumerate(episodio):
+            # El último estado siguiente del episodio es terminal (valor 0)
+            terminal = t == len(episodio) - 1
+            v_siguiente = 0.0 if terminal else self.V[s_siguiente]
+            delta = r + self.gamma * v_siguiente - self.V[s]
+            
+            trazas[s] = 1.0 if self.reemplazo else trazas.get(s, 0.0) + 1.0
+            
+            for estado, e in list(trazas.items()):
+                self.V[estado] += self.alpha * delta * e
+                e *= decaimiento
+                if e < self.umbral:
+                    del trazas[estado]
+                else:
+                    trazas[estado] = e
+    
+    def procesar(self, episodios):
+        """Consume un iterable (p. ej. un generador) de episodios"""
+        for episodio in episodios:
+            self.procesar_episodio(episodio)
+        return dict(self.V)
+
+
+def escribir_log_episodios(ruta, episodios):
+    """
+    Escribe episodios en un log de texto: una transición por línea,
+    'id_episodio<TAB>s<TAB>a<TAB>r<TAB>s_siguiente'
+    """
+    with open(ruta, 'a', encoding='utf-8') as f:
+        for id_ep, episodio in episodios:
+            for s, a, r, s_sig in episodio:
+                f.write(f"{id_ep}\t{s}\t{a}\t{r}\t{s_sig}\n")
+
+
+def leer_log_episodios(ruta, tam_bloque=100000):
+    """
+    Generador que lee un log de episodios por bloques de líneas y entrega
+    cada episodio en cuanto se completa (el log no se carga entero)
+    Args:
+        ruta: archivo escrito con escribir_log_episodios
+        tam_bloque: líneas leídas por bloque
+    Yields:
+        episodios [(s, a, r, s'), ...] con estados y acciones como texto
+    """
+    actual_id = None
+    actual = []
+    with open(ruta, encoding='utf-8') as f:
+        while True:
+            bloque = list(islice(f, tam_bloque))
+            if not bloque:
+                break
+            for linea in bloque:
+                id_ep, s, a, r, s_sig = linea.rstrip('\n').split('\t')
+                if id_ep != actual_id and actual:
+                    yield actual
+                    actual = []
+                actual_id = id_ep
+                actual.append((s, a, float(r), s_sig))
+    if actual:
+        yield actual
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -77,4 +213,35 @@ if __name__ == "__main__":
     print("\nResultados de Monte Carlo Pasivo:")
     valores_mc = montecarlo_pasivo(episodios, politica, gamma=0.9)
     for s, v in valores_mc.items():
-        print(f"   V({s}): {v:.2f}")
\ No newline at end of file
+        print(f"   V({s}): {v:.2f}")
+
+    print("\nEstimadores incrementales (mismos episodios):")
+    mc_primera = MonteCarloIncremental(gamma=0.9, primera_visita=True).procesar(episodios)
+    mc_cada = MonteCarloIncremental(gamma=0.9, primera_visita=False).procesar(episodios)
+    for s in mc_cada:
+        print(f"   V({s}): every-visit={mc_cada[s]:.2f} (original {valores_mc[s]:.2f}), "
+              f"first-visit={mc_primera[s]:.2f}")
+    
+    # Log en disco con muchos episodios, leído por bloques
+    print("\nEpisodios en flujo desde un log en disco:")
+    def generar_episodios(num, semilla=0):
+        """Paseo aleatorio s1 -> s2 -> s3 -> meta con retrocesos"""
+        rng = random.Random(semilla)
+        for id_ep in range(num):
+            episodio, s = [], 1
+            while s < 4:
+                s_sig = s + 1 if rng.random() < 0.7 else max(1, s - 1)
+                r = 10 if s_sig == 4 else -1
+                episodio.append((f"s{s}", 'ir', r, 'meta' if s_sig == 4 else f"s{s_sig}"))
+                s = s_sig
+            yield id_ep, episodio
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'trayectorias.log')
+        escribir_log_episodios(ruta, generar_episodios(20000))
+        print(f"   Log de {os.path.getsize(ruta) / 1e6:.1f} MB")
+        
+        mc = MonteCarloIncremental(gamma=0.9).procesar(leer_log_episodios(ruta, tam_bloque=5000))
+        td = TDLambda(alpha=0.01, gamma=0.9, lambd=0.8).procesar(leer_log_episodios(ruta, tam_bloque=5000))
+        for s in sorted(mc):
+            print(f"   V({s}): MC={mc[s]:.2f}, TD(λ=0.8)={td[s]:.2f}")
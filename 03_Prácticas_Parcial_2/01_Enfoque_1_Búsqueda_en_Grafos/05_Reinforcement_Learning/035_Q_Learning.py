@@ -1,6 +1,10 @@
 import random
+import time
 from collections import defaultdict
 
+from rl_tabular import AmbienteVectorizado, crear_grid_vectorizado, q_learning_vectorizado
+from memoria_repeticion import MemoriaRepeticion, MemoriaPriorizada
+
 # ============================================================================
 # CLASE DE AMBIENTE SIMPLE PARA PRUEBAS (DEPENDENCIA)
 # ============================================================================
@@ -110,4 +114,60 @@ if __name__ == "__main__":
         print(f"      Q{clave} = {valor:.3f}")
 
     print(f"\n   Valor Q en (0,0) 'derecha': {Q.get(((0,0), 'derecha'), 0):.3f}")
-    print(f"   Valor Q en (0,0) 'abajo': {Q.get(((0,0), 'abajo'), 0):.3f}")
\ No newline at end of file
+    print(f"   Valor Q en (0,0) 'abajo': {Q.get(((0,0), 'abajo'), 0):.3f}")
+    
+    print("\n=== Motor vectorizado (rl_tabular) ===\n")
+    
+    # Rendimiento de la versión con diccionarios
+    inicio = time.perf_counter()
+    pasos_dict = 0
+    env_contado = AmbienteSimple(tamano=4)
+    paso_original = env_contado.step
+    def step_contado(estado, accion):
+        global pasos_dict
+        pasos_dict += 1
+        return paso_original(estado, accion)
+    env_contado.step = step_contado
+    q_learning(env_contado, num_episodios=500, alpha=0.1, gamma=0.9, epsilon=0.2)
+    tiempo_dict = time.perf_counter() - inicio
+    print(f"   Diccionarios: {pasos_dict / tiempo_dict:,.0f} transiciones/s")
+    
+    # Mismo grid compilado a partir de AmbienteSimple, 4096 copias a la vez
+    estados = [(x, y) for x in range(4) for y in range(4)]
+    env_vec = AmbienteVectorizado.desde_ambiente(env, estados, num_ambientes=4096, semilla=0)
+    inicio = time.perf_counter()
+    Q_vec = q_learning_vectorizado(env_vec, num_pasos=500, alpha=0.1, gamma=0.9, epsilon=0.2)
+    tiempo_vec = time.perf_counter() - inicio
+    print(f"   Vectorizado:  {500 * env_vec.num_ambientes / tiempo_vec:,.0f} transiciones/s")
+    
+    Q_vec = env_vec.indice.q_a_diccionario(Q_vec)
+    print(f"\n   Valor Q en (0,0) 'derecha': {Q_vec[((0,0), 'derecha')]:.3f}")
+    print(f"   Valor Q en (0,0) 'abajo': {Q_vec[((0,0), 'abajo')]:.3f}")
+    
+    # Grid más grande construido directamente en NumPy
+    env_grande = crear_grid_vectorizado(tamano=20, num_ambientes=8192, semilla=1)
+    inicio = time.perf_counter()
+    Q_grande = q_learning_vectorizado(env_grande, num_pasos=1000, alpha=0.1, gamma=0.99, epsilon=0.2)
+    tiempo = time.perf_counter() - inicio
+    print(f"\n   Grid 20x20: {1000 * env_grande.num_ambientes / tiempo:,.0f} transiciones/s")
+    print(f"   max Q en el inicio: {Q_grande[env_grande.estado_inicial].max():.3f}")
+    
+    print("\n=== Experience Replay (memoria_repeticion) ===\n")
+    
+    # Pocos pasos de ambiente (caros en producción): 8 copias x 20 pasos
+    # Valor óptimo en (0,0) para el grid 4x4 con gamma=0.9: 5.495
+    # (los retornos de n pasos sin corrección estiman la política exploratoria,
+    # por eso quedan algo por debajo del óptimo)
+    configuraciones = [
+        ("Sin memoria", None, 1),
+        ("Memoria uniforme", MemoriaRepeticion(capacidad=5000, semilla=0), 1),
+        ("Memoria priorizada", MemoriaPriorizada(capacidad=5000, semilla=0), 1),
+        ("Priorizada, 3 pasos", MemoriaPriorizada(capacidad=5000, semilla=0), 3),
+    ]
+    for nombre, memoria, n in configuraciones:
+        env_pocos = crear_grid_vectorizado(tamano=4, num_ambientes=8, semilla=0)
+        Q_rep = q_learning_vectorizado(env_pocos, num_pasos=20, alpha=0.5, gamma=0.9, epsilon=0.2,
+                                       memoria=memoria, tam_lote=64,
+                                       actualizaciones_por_paso=8, n_pasos=n)
+        print(f"   {nombre:<20} max Q(0,0) = {Q_rep[env_pocos.estado_inicial].max():.3f}"
+              f"  ({20 * 8} transiciones de ambiente)")
@@ -1,5 +1,9 @@
 import random
 import math
+import time
+import threading
+
+import numpy as np
 
 # ============================================================================
 # 36. EXPLORACIÓN VS. EXPLOTACIÓN
@@ -88,6 +92,113 @@ def epsilon_decreciente(episodio, epsilon_inicial=1.0, epsilon_final=0.01, decay
     epsilon = epsilon_inicial * (decay ** episodio)
     return max(epsilon_final, epsilon)
 
+# ============================================================================
+# SERVICIO DE BANDIDOS MULTI-BRAZO POR LOTES
+# ============================================================================
+
+class ServicioBandido:
+    """
+    Bandido contextual tabular para servir muchas selecciones por segundo.
+    Conteos y recompensas acumuladas viven en arrays (contextos x brazos)
+    junto con el total de visitas por contexto, que se mantiene al día
+    en lugar de volver a sumarse en cada selección.
+    Las recompensas pueden llegar tarde y desde varios hilos: se encolan y
+    se aplican por lotes bajo un candado.
+    """
+    def __init__(self, num_contextos, num_brazos, c=2, tam_lote_feedback=4096, semilla=None):
+        """
+        Args:
+            num_contextos: número de contextos (estados)
+            num_brazos: número de brazos (acciones)
+            c: constante de exploración de UCB1
+            tam_lote_feedback: recompensas pendientes antes de aplicarlas
+            semilla: semilla del generador aleatorio
+        """
+        self.num_brazos = num_brazos
+        self.c = c
+        self.tam_lote_feedback = tam_lote_feedback
+        self.conteos = np.zeros((num_contextos, num_brazos))
+        self.sumas = np.zeros((num_contextos, num_brazos))
+        self.totales = np.zeros(num_contextos)
+        self.rng = np.random.default_rng(semilla)
+        
+        self._candado = threading.Lock()            # Protege las tablas y el rng
+        self._candado_pendientes = threading.Lock() # Protege la cola de feedback
+        self._pendientes = []
+        self._num_pendientes = 0
+    
+    def seleccionar_ucb1(self, contextos):
+        """
+        UCB1 vectorizado para un lote de peticiones
+        Args:
+            contextos: array (B,) de índices de contexto
+        Returns:
+            array (B,) de brazos elegidos
+        """
+        contextos = np.asarray(contextos)
+        with self._candado:
+            # Sumas, conteos y totales de la misma versión de las tablas
+            n = self.conteos[contextos]
+            sumas = self.sumas[contextos]
+            total = self.totales[contextos]
+            aleatorios = self.rng.integers(0, self.num_brazos, size=len(contextos))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media = sumas / n
+            bonus = self.c * np.sqrt(np.log(np.maximum(total, 1))[:, None] / n)
+        # Los brazos sin probar tienen prioridad (como en ucb1)
+        puntaje = np.where(n == 0, np.inf, media + bonus)
+        brazos = np.argmax(puntaje, axis=1)
+        # Contexto nuevo: exploración aleatoria
+        return np.where(total == 0, aleatorios, brazos)
+    
+    def seleccionar_thompson(self, contextos):
+        """
+        Thompson Sampling vectorizado (recompensas en [0, 1], prior Beta(1, 1))
+        Args:
+            contextos: array (B,) de índices de contexto
+        Returns:
+            array (B,) de brazos elegidos
+        """
+        contextos = np.asarray(contextos)
+        with self._candado:
+            exitos = self.sumas[contextos]
+            fracasos = self.conteos[contextos] - exitos
+            muestras = self.rng.beta(exitos + 1, fracasos + 1)
+        return np.argmax(muestras, axis=1)
+    
+    def registrar_recompensas(self, contextos, brazos, recompensas):
+        """
+        Encola recompensas (posiblemente retrasadas); seguro entre hilos.
+        Se aplican automáticamente al superar tam_lote_feedback.
+        """
+        lote = (np.asarray(contextos), np.asarray(brazos), np.asarray(recompensas, dtype=float))
+        with self._candado_pendientes:
+            self._pendientes.append(lote)
+            self._num_pendientes += len(lote[0])
+            aplicar = self._num_pendientes >= self.tam_lote_feedback
+        if aplicar:
+            self.aplicar_pendientes()
+    
+    def aplicar_pendientes(self):
+        """Aplica todas las recompensas encoladas en una sola actualización"""
+        with self._candado_pendientes:
+            pendientes, self._pendientes = self._pendientes, []
+            self._num_pendientes = 0
+        if not pendientes:
+            return
+        
+        contextos = np.concatenate([p[0] for p in pendientes])
+        brazos = np.concatenate([p[1] for p in pendientes])
+        recompensas = np.concatenate([p[2] for p in pendientes])
+        claves = contextos * self.num_brazos + brazos
+        tamano = self.conteos.size
+        
+        with self._candado:
+            self.conteos += np.bincount(claves, minlength=tamano).reshape(self.conteos.shape)
+            self.sumas += np.bincount(claves, weights=recompensas, minlength=tamano).reshape(self.sumas.shape)
+            self.totales += np.bincount(contextos, minlength=len(self.totales))
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -116,4 +227,65 @@ if __name__ == "__main__":
     print("3. Epsilon Decreciente:")
     print(f"   Epsilon en episodio 0: {epsilon_decreciente(0):.3f}")
     print(f"   Epsilon en episodio 100: {epsilon_decreciente(100):.3f}")
-    print(f"   Epsilon en episodio 500: {epsilon_decreciente(500):.3f}")
\ No newline at end of file
+    print(f"   Epsilon en episodio 500: {epsilon_decreciente(500):.3f}")
+
+    # Servicio de bandidos por lotes
+    print("\n4. Servicio de bandidos (10^4 contextos, 8 brazos):")
+    num_contextos, num_brazos = 10_000, 8
+    rng = np.random.default_rng(0)
+    prob_real = rng.uniform(0.1, 0.9, size=(num_contextos, num_brazos))
+    
+    # Referencia: ucb1 original, una petición a la vez (contextos ya visitados)
+    Q_dict = {(ctx, a): 0.5 for ctx in range(num_contextos) for a in range(num_brazos)}
+    N_dict = {(ctx, a): 10 for ctx in range(num_contextos) for a in range(num_brazos)}
+    inicio = time.perf_counter()
+    for k in range(5000):
+        ucb1(Q_dict, N_dict, k % num_contextos, list(range(num_brazos)))
+    print(f"   ucb1 original: {5000 / (time.perf_counter() - inicio):,.0f} selecciones/s")
+    
+    for nombre in ['ucb1', 'thompson']:
+        servicio = ServicioBandido(num_contextos, num_brazos, semilla=1)
+        seleccionar = servicio.seleccionar_ucb1 if nombre == 'ucb1' else servicio.seleccionar_thompson
+        
+        # Un hilo sirve peticiones; otros devuelven recompensas con retraso
+        cola_feedback = []
+        candado_cola = threading.Lock()
+        total_servidas = 0
+        recompensa_total = 0.0
+        
+        def enviar_feedback():
+            while True:
+                with candado_cola:
+                    lote = cola_feedback.pop(0) if cola_feedback else None
+                if lote is None:
+                    time.sleep(0.001)
+                    continue
+                if lote == 'fin':
+                    return
+                servicio.registrar_recompensas(*lote)
+        
+        hilos = [threading.Thread(target=enviar_feedback) for _ in range(2)]
+        for h in hilos:
+            h.start()
+        
+        inicio = time.perf_counter()
+        for _ in range(200):
+            contextos = rng.integers(0, num_contextos, size=2048)
+            brazos = seleccionar(contextos)
+            recompensas = (rng.random(len(contextos)) < prob_real[contextos, brazos]).astype(float)
+            recompensa_total += recompensas.sum()
+            total_servidas += len(contextos)
+            with candado_cola:
+                cola_feedback.append((contextos, brazos, recompensas))
+        tiempo = time.perf_counter() - inicio
+        
+        with candado_cola:
+            cola_feedback.extend(['fin'] * len(hilos))
+        for h in hilos:
+            h.join()
+        servicio.aplicar_pendientes()
+        
+        print(f"   {nombre}: {total_servidas / tiempo:,.0f} selecciones/s, "
+              f"recompensa media {recompensa_total / total_servidas:.3f} "
+              f"(aleatoria {prob_real.mean():.3f}, óptima {prob_real.max(axis=1).mean():.3f})")
+        print(f"      feedback aplicado: {int(servicio.conteos.sum()):,} recompensas")
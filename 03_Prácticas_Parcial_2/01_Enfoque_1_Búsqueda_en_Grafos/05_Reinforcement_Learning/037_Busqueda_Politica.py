@@ -1,7 +1,13 @@
 import random
 import math
+import time
+import multiprocessing as mp
 from collections import defaultdict
 
+import numpy as np
+
+from rl_tabular import AmbienteVectorizado
+
 # ============================================================================
 # CLASE DE AMBIENTE SIMPLE PARA PRUEBAS (DEPENDENCIA)
 # ============================================================================
@@ -176,6 +182,255 @@ def actor_critic(env, num_episodios=1000, alpha_actor=0.01, alpha_critic=0.1, ga
     
     return dict(theta), dict(V)
 
+# ============================================================================
+# ROLLOUTS PARALELOS: REINFORCE Y ACTOR-CRITIC POR LOTES
+# ============================================================================
+
+# Tablas del ambiente en cada proceso trabajador (se envían una sola vez)
+_tablas_trabajador = None
+
+
+def _iniciar_trabajador(siguiente, recompensa, terminal, estado_inicial):
+    """Inicializador del pool: guarda la dinámica compilada del ambiente"""
+    global _tablas_trabajador
+    _tablas_trabajador = (siguiente, recompensa, terminal, estado_inicial)
+
+
+def softmax_filas(theta):
+    """Softmax estable por filas de una tabla (S, A)"""
+    z = theta - theta.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def generar_trayectorias(theta, num_episodios, max_pasos, semilla, tablas=None):
+    """
+    Ejecuta num_episodios episodios a la vez (sin reinicio) con la política
+    softmax de theta y devuelve las trayectorias en forma de arrays
+    Args:
+        theta: parámetros (S, A)
+        num_episodios: episodios simultáneos (K)
+        max_pasos: longitud máxima de episodio (T)
+        semilla: semilla o SeedSequence del generador
+        tablas: (siguiente, recompensa, terminal, estado_inicial); si es None
+                se usan las del proceso trabajador
+    Returns:
+        dict con arrays (T, K): estados, acciones, recompensas, siguientes,
+        terminados y activos (máscara de pasos válidos)
+    """
+    siguiente, recompensa, terminal, estado_inicial = tablas or _tablas_trabajador
+    rng = np.random.default_rng(semilla)
+    acumulada = np.cumsum(softmax_filas(theta), axis=1)
+    
+    K = num_episodios
+    forma = (max_pasos, K)
+    trayectorias = {
+        'estados': np.zeros(forma, dtype=np.int64),
+        'acciones': np.zeros(forma, dtype=np.int64),
+        'recompensas': np.zeros(forma),
+        'siguientes': np.zeros(forma, dtype=np.int64),
+        'terminados': np.zeros(forma, dtype=bool),
+        'activos': np.zeros(forma, dtype=bool),
+    }
+    
+    s = np.full(K, estado_inicial, dtype=np.int64)
+    activo = np.ones(K, dtype=bool)
+    T = 0
+    while T < max_pasos and activo.any():
+        # Muestreo por CDF inversa: primera acción con acumulada >= u
+        u = rng.random(K)[:, None]
+        a = np.minimum((acumulada[s] < u).sum(axis=1), theta.shape[1] - 1)
+        s_sig = siguiente[s, a]
+        terminado = terminal[s, a]
+        
+        trayectorias['estados'][T] = s
+        trayectorias['acciones'][T] = a
+        trayectorias['recompensas'][T] = np.where(activo, recompensa[s, a], 0.0)
+        trayectorias['siguientes'][T] = s_sig
+        trayectorias['terminados'][T] = terminado & activo
+        trayectorias['activos'][T] = activo
+        
+        activo = activo & ~terminado
+        s = s_sig
+        T += 1
+    
+    return {clave: valor[:T] for clave, valor in trayectorias.items()}
+
+
+def _unir_trayectorias(lotes):
+    """Concatena los lotes de los trabajadores a lo largo del eje de episodios"""
+    T = max(lote['activos'].shape[0] for lote in lotes)
+    unidas = {}
+    for clave in lotes[0]:
+        partes = []
+        for lote in lotes:
+            x = lote[clave]
+            relleno = np.zeros((T - x.shape[0],) + x.shape[1:], dtype=x.dtype)
+            partes.append(np.concatenate([x, relleno]))
+        unidas[clave] = np.concatenate(partes, axis=1)
+    return unidas
+
+
+def retornos_descontados(recompensas, activos, gamma):
+    """
+    Retornos G_t para todas las trayectorias a la vez (recorrido hacia atrás
+    sobre el tiempo, vectorizado sobre los episodios)
+    """
+    G = np.zeros_like(recompensas)
+    acumulado = np.zeros(recompensas.shape[1])
+    for t in range(recompensas.shape[0] - 1, -1, -1):
+        acumulado = np.where(activos[t], recompensas[t] + gamma * acumulado, 0.0)
+        G[t] = acumulado
+    return G
+
+
+def gradiente_log_politica(theta, estados, acciones, pesos):
+    """
+    Suma de pesos · ∇ log π(a|s) para la política softmax tabular:
+    ∇_θ[s] log π(a|s) = onehot(a) - π(·|s)
+    Args:
+        estados, acciones, pesos: arrays 1D de los pasos válidos
+    Returns:
+        gradiente (S, A)
+    """
+    pi = softmax_filas(theta)[estados]
+    contribucion = -pi * pesos[:, None]
+    contribucion[np.arange(len(acciones)), acciones] += pesos
+    gradiente = np.zeros_like(theta)
+    np.add.at(gradiente, estados, contribucion)
+    return gradiente
+
+
+class TrabajadoresRollout:
+    """
+    Pool de procesos que generan episodios en paralelo. Cada trabajador
+    simula su parte de los episodios de forma vectorizada y devuelve
+    arrays; el proceso principal solo agrega y actualiza.
+    Usar como gestor de contexto: with TrabajadoresRollout(env_vec) as t: ...
+    """
+    def __init__(self, env_vectorizado, procesos=None, max_pasos=200, semilla=None):
+        """
+        Args:
+            env_vectorizado: AmbienteVectorizado (rl_tabular) con la dinámica
+            procesos: número de procesos (None = todos los núcleos,
+                      0 = generar en el proceso principal)
+            max_pasos: longitud máxima de episodio
+            semilla: semilla raíz; cada lote usa flujos independientes
+        """
+        self.tablas = (env_vectorizado.siguiente, env_vectorizado.recompensa,
+                       env_vectorizado.terminal, env_vectorizado.estado_inicial)
+        self.num_estados = env_vectorizado.num_estados
+        self.num_acciones = env_vectorizado.num_acciones
+        self.procesos = mp.cpu_count() if procesos is None else procesos
+        self.max_pasos = max_pasos
+        self.semillas = np.random.SeedSequence(semilla)
+        self.pool = None
+    
+    def __enter__(self):
+        if self.procesos > 0:
+            self.pool = mp.Pool(self.procesos, initializer=_iniciar_trabajador,
+                                initargs=self.tablas)
+        return self
+    
+    def __exit__(self, *args):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+    
+    def recolectar(self, theta, num_episodios):
+        """
+        Genera num_episodios episodios repartidos entre los trabajadores
+        Returns:
+            dict de arrays (T, num_episodios)
+        """
+        partes = max(1, self.procesos)
+        tamanos = [num_episodios // partes + (i < num_episodios % partes) for i in range(partes)]
+        tamanos = [k for k in tamanos if k > 0]
+        semillas = self.semillas.spawn(len(tamanos))
+        
+        if self.pool is None:
+            lotes = [generar_trayectorias(theta, k, self.max_pasos, sem, self.tablas)
+                     for k, sem in zip(tamanos, semillas)]
+        else:
+            lotes = self.pool.starmap(generar_trayectorias,
+                                      [(theta, k, self.max_pasos, sem) for k, sem in zip(tamanos, semillas)])
+        return _unir_trayectorias(lotes)
+
+
+def reinforce_por_lotes(trabajadores, num_iteraciones=100, episodios_por_lote=256,
+                        alpha=0.1, gamma=0.9):
+    """
+    REINFORCE con episodios generados en paralelo y una actualización por lote.
+    Usa como línea base el retorno medio de cada paso de tiempo.
+    Args:
+        trabajadores: TrabajadoresRollout (ya abierto)
+        num_iteraciones: número de lotes / actualizaciones
+        episodios_por_lote: episodios por actualización
+        alpha: tasa de aprendizaje
+        gamma: factor de descuento
+    Returns:
+        theta (S, A)
+    """
+    theta = np.zeros((trabajadores.num_estados, trabajadores.num_acciones))
+    
+    for _ in range(num_iteraciones):
+        lote = trabajadores.recolectar(theta, episodios_por_lote)
+        activos = lote['activos']
+        G = retornos_descontados(lote['recompensas'], activos, gamma)
+        
+        # Ventaja = G - media de G en el mismo paso de tiempo (reduce varianza)
+        validos_t = np.maximum(activos.sum(axis=1, keepdims=True), 1)
+        linea_base = (G * activos).sum(axis=1, keepdims=True) / validos_t
+        ventaja = G - linea_base
+        
+        gradiente = gradiente_log_politica(theta, lote['estados'][activos],
+                                           lote['acciones'][activos], ventaja[activos])
+        theta += alpha * gradiente / episodios_por_lote
+    
+    return theta
+
+
+def actor_critic_por_lotes(trabajadores, num_iteraciones=100, episodios_por_lote=256,
+                           alpha_actor=0.1, alpha_critic=0.5, gamma=0.9):
+    """
+    Actor-Critic por lotes: la ventaja es el error TD del crítico tabular,
+    calculado para todos los pasos del lote a la vez
+    Args:
+        trabajadores: TrabajadoresRollout (ya abierto)
+        num_iteraciones: número de lotes / actualizaciones
+        episodios_por_lote: episodios por actualización
+        alpha_actor, alpha_critic: tasas de aprendizaje
+        gamma: factor de descuento
+    Returns:
+        (theta, V) como arrays
+    """
+    theta = np.zeros((trabajadores.num_estados, trabajadores.num_acciones))
+    V = np.zeros(trabajadores.num_estados)
+    
+    for _ in range(num_iteraciones):
+        lote = trabajadores.recolectar(theta, episodios_por_lote)
+        activos = lote['activos']
+        s = lote['estados'][activos]
+        a = lote['acciones'][activos]
+        r = lote['recompensas'][activos]
+        s_sig = lote['siguientes'][activos]
+        terminado = lote['terminados'][activos]
+        
+        # Error TD de todos los pasos: δ = r + γ·V(s') - V(s)
+        delta = r + gamma * V[s_sig] * ~terminado - V[s]
+        
+        # Crítico: promedio de δ por estado
+        suma = np.bincount(s, weights=delta, minlength=V.size)
+        conteo = np.bincount(s, minlength=V.size)
+        visitados = conteo > 0
+        V[visitados] += alpha_critic * suma[visitados] / conteo[visitados]
+        
+        # Actor: gradiente de política ponderado por δ
+        theta += alpha_actor * gradiente_log_politica(theta, s, a, delta) / episodios_por_lote
+    
+    return theta, V
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -204,4 +459,35 @@ if __name__ == "__main__":
     print(f"   Muestra de valores de crítico:")
     for i, (clave, valor) in enumerate(list(V_ac.items())[:5]):
          print(f"      V{clave} = {valor:.3f}")
-    print()
\ No newline at end of file
+    print()
+
+    print("3. Rollouts paralelos (REINFORCE y Actor-Critic por lotes):")
+    estados = [(x, y) for x in range(4) for y in range(4)]
+    env_vec = AmbienteVectorizado.desde_ambiente(env, estados)
+    inicio_idx = env_vec.estado_inicial
+    
+    # Versión original: un episodio a la vez en el proceso principal
+    inicio = time.perf_counter()
+    reinforce(env, num_episodios=500, alpha=0.001, gamma=0.9)
+    print(f"   REINFORCE original (500 episodios): {time.perf_counter() - inicio:.2f} s")
+    
+    for procesos in [0, mp.cpu_count()]:
+        with TrabajadoresRollout(env_vec, procesos=procesos, semilla=0) as trabajadores:
+            inicio = time.perf_counter()
+            theta_lote = reinforce_por_lotes(trabajadores, num_iteraciones=40,
+                                             episodios_por_lote=512, alpha=0.5, gamma=0.9)
+            tiempo = time.perf_counter() - inicio
+        pi_inicio = softmax_filas(theta_lote)[inicio_idx]
+        print(f"   REINFORCE por lotes, {procesos} procesos ({40 * 512} episodios): {tiempo:.2f} s")
+        print(f"      π(·|(0,0)) = {dict(zip(env.acciones, np.round(pi_inicio, 3).tolist()))}")
+    
+    with TrabajadoresRollout(env_vec, procesos=mp.cpu_count(), semilla=1) as trabajadores:
+        theta_ac_lote, V_lote = actor_critic_por_lotes(trabajadores, num_iteraciones=100,
+                                                      episodios_por_lote=512, alpha_actor=0.5,
+                                                      gamma=0.9)
+    # V es el valor de la política softmax aprendida, que sigue explorando:
+    # se acerca al óptimo de la política determinista sin alcanzarlo
+    print(f"   Actor-Critic por lotes ({100 * 512} episodios): V(0,0) = {V_lote[inicio_idx]:.3f} "
+          f"(política estocástica; óptimo determinista 5.495)")
+    pi_inicio = softmax_filas(theta_ac_lote)[inicio_idx]
+    print(f"      π(·|(0,0)) = {dict(zip(env.acciones, np.round(pi_inicio, 3).tolist()))}")
@@ -0,0 +1,200 @@
+"""
+MEMORIA DE REPETICIÓN (EXPERIENCE REPLAY)
+Buffer circular en arrays preasignados, muestreo uniforme y priorizado con
+árbol de sumas, y retornos de n pasos para los módulos de RL (33-37)
+"""
+
+import numpy as np
+
+# ============================================================================
+# BUFFER CIRCULAR
+# ============================================================================
+
+class MemoriaRepeticion:
+    """
+    Buffer circular de capacidad fija. Cada campo es un array de NumPy
+    preasignado (no se crea una tupla por transición).
+    Se guarda 'descuento' en lugar de 'terminado': gamma^n si hay que
+    continuar desde 'siguiente', 0 si el episodio terminó. Así la misma
+    memoria sirve para transiciones de 1 paso y de n pasos.
+    """
+    def __init__(self, capacidad, semilla=None):
+        self.capacidad = capacidad
+        self.estados = np.zeros(capacidad, dtype=np.int64)
+        self.acciones = np.zeros(capacidad, dtype=np.int64)
+        self.retornos = np.zeros(capacidad)
+        self.siguientes = np.zeros(capacidad, dtype=np.int64)
+        self.descuentos = np.zeros(capacidad)
+        self.posicion = 0   # Próxima celda a escribir
+        self.tamano = 0     # Celdas ocupadas
+        self.rng = np.random.default_rng(semilla)
+
+    def __len__(self):
+        return self.tamano
+
+    def agregar(self, estados, acciones, retornos, siguientes, descuentos):
+        """
+        Inserta un lote de transiciones (sobrescribe las más antiguas)
+        Args:
+            arrays (B,) con estado, acción, retorno, estado siguiente y descuento
+        Returns:
+            índices de las celdas escritas
+        """
+        estados, acciones, retornos, siguientes, descuentos = (
+            np.atleast_1d(x) for x in (estados, acciones, retornos, siguientes, descuentos))
+        # Si el lote no cabe, solo se conservan las últimas 'capacidad' transiciones
+        if len(estados) > self.capacidad:
+            sobra = len(estados) - self.capacidad
+            estados, acciones, retornos, siguientes, descuentos = (
+                x[sobra:] for x in (estados, acciones, retornos, siguientes, descuentos))
+        B = len(estados)
+
+        indices = (self.posicion + np.arange(B)) % self.capacidad
+        self.estados[indices] = estados
+        self.acciones[indices] = acciones
+        self.retornos[indices] = retornos
+        self.siguientes[indices] = siguientes
+        self.descuentos[indices] = descuentos
+
+        self.posicion = (self.posicion + B) % self.capacidad
+        self.tamano = min(self.tamano + B, self.capacidad)
+        return indices
+
+    def lote(self, indices):
+        """Devuelve las transiciones de los índices dados como arrays"""
+        return (self.estados[indices], self.acciones[indices], self.retornos[indices],
+                self.siguientes[indices], self.descuentos[indices])
+
+    def muestrear(self, tam_lote):
+        """
+        Muestreo uniforme con reemplazo
+        Returns:
+            (indices, pesos, transiciones) con pesos = 1
+        """
+        indices = self.rng.integers(0, self.tamano, size=tam_lote)
+        return indices, np.ones(tam_lote), self.lote(indices)
+
+# ============================================================================
+# ÁRBOL DE SUMAS Y MEMORIA PRIORIZADA
+# ============================================================================
+
+class ArbolSuma:
+    """
+    Árbol binario completo guardado en un array: el nodo i tiene hijos
+    2i y 2i+1, y las hojas (prioridades) empiezan en 'hojas'.
+    Actualizar y buscar cuestan O(log n) y se hacen por lotes.
+    """
+    def __init__(self, capacidad):
+        self.profundidad = max(1, int(np.ceil(np.log2(capacidad))))
+        self.hojas = 2 ** self.profundidad
+        self.arbol = np.zeros(2 * self.hojas)
+
+    @property
+    def total(self):
+        return self.arbol[1]
+
+    def actualizar(self, indices, prioridades):
+        """Asigna prioridades a las hojas y recalcula sus ancestros"""
+        nodos = np.asarray(indices) + self.hojas
+        self.arbol[nodos] = prioridades
+        for _ in range(self.profundidad):
+            nodos = np.unique(nodos // 2)
+            self.arbol[nodos] = self.arbol[2 * nodos] + self.arbol[2 * nodos + 1]
+
+    def buscar(self, valores):
+        """
+        Desciende el árbol para cada valor acumulado en [0, total)
+        Returns:
+            índices de hoja
+        """
+        valores = np.array(valores, dtype=float)
+        nodos = np.ones(len(valores), dtype=np.int64)
+        for _ in range(self.profundidad):
+            izquierdo = 2 * nodos
+            suma_izq = self.arbol[izquierdo]
+            derecha = valores > suma_izq
+            valores = np.where(derecha, valores - suma_izq, valores)
+            nodos = izquierdo + derecha
+        return nodos - self.hojas
+
+    def prioridades(self, indices):
+        return self.arbol[np.asarray(indices) + self.hojas]
+
+
+class MemoriaPriorizada(MemoriaRepeticion):
+    """
+    Repetición priorizada: P(i) ∝ (|error_td| + epsilon)^alpha, con pesos de
+    muestreo por importancia (N · P(i))^-beta normalizados por el máximo
+    """
+    def __init__(self, capacidad, alpha=0.6, beta=0.4, epsilon=1e-3, semilla=None):
+        super().__init__(capacidad, semilla)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.arbol = ArbolSuma(capacidad)
+        self.prioridad_max = 1.0
+
+    def agregar(self, estados, acciones, retornos, siguientes, descuentos):
+        """Las transiciones nuevas entran con la prioridad máxima vista"""
+        indices = super().agregar(estados, acciones, retornos, siguientes, descuentos)
+        self.arbol.actualizar(indices, np.full(len(indices), self.prioridad_max))
+        return indices
+
+    def muestrear(self, tam_lote):
+        """
+        Muestreo estratificado proporcional a la prioridad
+        Returns:
+            (indices, pesos, transiciones)
+        """
+        segmento = self.arbol.total / tam_lote
+        valores = (np.arange(tam_lote) + self.rng.random(tam_lote)) * segmento
+        indices = np.minimum(self.arbol.buscar(valores), self.tamano - 1)
+
+        probabilidades = self.arbol.prioridades(indices) / self.arbol.total
+        pesos = (self.tamano * probabilidades) ** -self.beta
+        pesos /= pesos.max()
+        return indices, pesos, self.lote(indices)
+
+    def actualizar_prioridades(self, indices, errores_td):
+        """Recalcula la prioridad de las transiciones muestreadas"""
+        prioridades = (np.abs(errores_td) + self.epsilon) ** self.alpha
+        self.prioridad_max = max(self.prioridad_max, float(prioridades.max()))
+        self.arbol.actualizar(indices, prioridades)
+
+# ============================================================================
+# RETORNOS DE N PASOS
+# ============================================================================
+
+def retornos_n_pasos(recompensas, terminados, siguientes, gamma, n):
+    """
+    Retornos de n pasos para trayectorias de N ambientes en paralelo
+    Args:
+        recompensas: array (T, N)
+        terminados: array (T, N) booleano
+        siguientes: array (T, N) con el estado siguiente de cada paso
+        gamma: factor de descuento
+        n: número de pasos (T >= n)
+    Returns:
+        (retornos, estados_arranque, descuentos), cada uno (T-n+1, N):
+        G_t = sum_k gamma^k r_{t+k} cortado al terminar el episodio,
+        estado desde el que se hace bootstrap y gamma^n (o 0 si terminó)
+    """
+    recompensas = np.asarray(recompensas, dtype=float)
+    terminados = np.asarray(terminados, dtype=bool)
+    siguientes = np.asarray(siguientes)
+    ventanas = recompensas.shape[0] - n + 1
+
+    retornos = np.zeros((ventanas,) + recompensas.shape[1:])
+    arranque = siguientes[:ventanas].copy()
+    descuentos = np.ones_like(retornos)
+    activo = np.ones(retornos.shape, dtype=bool)
+
+    for k in range(n):
+        r_k = recompensas[k:k + ventanas]
+        retornos += np.where(activo, descuentos * r_k, 0.0)
+        arranque = np.where(activo, siguientes[k:k + ventanas], arranque)
+        descuentos = np.where(activo, descuentos * gamma, descuentos)
+        activo &= ~terminados[k:k + ventanas]
+
+    # Si el episodio terminó dentro de la ventana no hay bootstrap
+    return retornos, arranque, descuentos * activo
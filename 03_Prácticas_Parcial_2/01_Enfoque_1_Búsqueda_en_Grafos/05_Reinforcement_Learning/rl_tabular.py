@@ -0,0 +1,284 @@
+"""
+RL TABULAR VECTORIZADO
+Motor común para Q-Learning (35) y SARSA (34): índices enteros de estados y
+acciones, tabla Q en NumPy y ambientes que avanzan N copias a la vez
+"""
+
+import numpy as np
+
+from memoria_repeticion import retornos_n_pasos
+
+# ============================================================================
+# ÍNDICE DE ESTADOS Y ACCIONES
+# ============================================================================
+
+class IndiceTabular:
+    """Traduce estados y acciones arbitrarios a enteros consecutivos"""
+    def __init__(self, estados, acciones):
+        self.estados = list(estados)
+        self.acciones = list(acciones)
+        self.indice_estado = {s: i for i, s in enumerate(self.estados)}
+        self.indice_accion = {a: i for i, a in enumerate(self.acciones)}
+
+    @property
+    def num_estados(self):
+        return len(self.estados)
+
+    @property
+    def num_acciones(self):
+        return len(self.acciones)
+
+    def q_a_diccionario(self, Q):
+        """
+        Convierte una tabla Q (estados x acciones) al formato de los módulos
+        originales {(estado, accion): valor}
+        """
+        return {(s, a): float(Q[i, j])
+                for i, s in enumerate(self.estados)
+                for j, a in enumerate(self.acciones)}
+
+# ============================================================================
+# AMBIENTE TABULAR VECTORIZADO
+# ============================================================================
+
+class AmbienteVectorizado:
+    """
+    N copias independientes de un ambiente tabular determinista.
+    La dinámica se guarda en tablas (estado, acción) -> siguiente, recompensa
+    y terminado, así que step() es un simple 'gather' sobre arrays.
+    Las copias que terminan se reinician automáticamente.
+    """
+    def __init__(self, siguiente, recompensa, terminal, indice, estado_inicial,
+                 num_ambientes=1024, semilla=None):
+        """
+        Args:
+            siguiente: array (S, A) con el índice del estado siguiente
+            recompensa: array (S, A) con la recompensa
+            terminal: array (S, A) booleano, True si la transición termina
+            indice: IndiceTabular con los estados y acciones
+            estado_inicial: índice del estado de reinicio
+            num_ambientes: número de copias que avanzan a la vez
+            semilla: semilla del generador aleatorio
+        """
+        self.siguiente = np.asarray(siguiente, dtype=np.int64)
+        self.recompensa = np.asarray(recompensa, dtype=float)
+        self.terminal = np.asarray(terminal, dtype=bool)
+        self.indice = indice
+        self.estado_inicial = estado_inicial
+        self.num_ambientes = num_ambientes
+        self.rng = np.random.default_rng(semilla)
+        self.reset()
+
+    @classmethod
+    def desde_ambiente(cls, env, estados, num_ambientes=1024, semilla=None):
+        """
+        Compila un ambiente con la interfaz de los módulos (reset/step(s, a))
+        llamando a step una sola vez por cada par (estado, acción)
+        Args:
+            env: ambiente con atributos 'acciones', reset() y step(s, a)
+            estados: lista de todos los estados alcanzables
+        """
+        indice = IndiceTabular(estados, env.acciones)
+        S, A = indice.num_estados, indice.num_acciones
+        siguiente = np.zeros((S, A), dtype=np.int64)
+        recompensa = np.zeros((S, A))
+        terminal = np.zeros((S, A), dtype=bool)
+
+        for i, s in enumerate(indice.estados):
+            for j, a in enumerate(indice.acciones):
+                s_sig, r, terminado = env.step(s, a)
+                siguiente[i, j] = indice.indice_estado[s_sig]
+                recompensa[i, j] = r
+                terminal[i, j] = terminado
+
+        inicial = indice.indice_estado[env.reset()]
+        return cls(siguiente, recompensa, terminal, indice, inicial, num_ambientes, semilla)
+
+    @property
+    def num_estados(self):
+        return self.siguiente.shape[0]
+
+    @property
+    def num_acciones(self):
+        return self.siguiente.shape[1]
+
+    def reset(self):
+        """Reinicia todas las copias al estado inicial"""
+        self.estados = np.full(self.num_ambientes, self.estado_inicial, dtype=np.int64)
+        return self.estados
+
+    def step(self, acciones):
+        """
+        Avanza todas las copias un paso
+        Args:
+            acciones: array (N,) con el índice de acción de cada copia
+        Returns:
+            (estados_siguientes, recompensas, terminados); las copias
+            terminadas ya quedan reiniciadas en self.estados
+        """
+        s = self.estados
+        s_siguiente = self.siguiente[s, acciones]
+        r = self.recompensa[s, acciones]
+        terminado = self.terminal[s, acciones]
+        self.estados = np.where(terminado, self.estado_inicial, s_siguiente)
+        return s_siguiente, r, terminado
+
+
+def crear_grid_vectorizado(tamano=4, num_ambientes=1024, semilla=None):
+    """
+    Grid world de AmbienteSimple (34/35/37) construido directamente en NumPy
+    Args:
+        tamano: lado del grid
+        num_ambientes: número de copias
+    Returns:
+        AmbienteVectorizado
+    """
+    acciones = ['arriba', 'abajo', 'izquierda', 'derecha']
+    estados = [(x, y) for x in range(tamano) for y in range(tamano)]
+    indice = IndiceTabular(estados, acciones)
+
+    xs = np.array([s[0] for s in estados])
+    ys = np.array([s[1] for s in estados])
+    # Desplazamientos (dx, dy) de cada acción, recortados a los bordes
+    dx = np.array([0, 0, -1, 1])
+    dy = np.array([-1, 1, 0, 0])
+    x_sig = np.clip(xs[:, None] + dx[None, :], 0, tamano - 1)
+    y_sig = np.clip(ys[:, None] + dy[None, :], 0, tamano - 1)
+    siguiente = x_sig * tamano + y_sig  # mismo orden que 'estados'
+
+    terminal = (x_sig == tamano - 1) & (y_sig == tamano - 1)
+    recompensa = np.where(terminal, 10.0, -0.1)
+
+    return AmbienteVectorizado(siguiente, recompensa, terminal, indice,
+                               indice.indice_estado[(0, 0)], num_ambientes, semilla)
+
+# ============================================================================
+# POLÍTICA Y ACTUALIZACIONES POR LOTES
+# ============================================================================
+
+def epsilon_greedy_vectorizado(Q, estados, epsilon, rng):
+    """
+    Epsilon-greedy para un lote de estados (empates rotos al azar)
+    Args:
+        Q: tabla (S, A)
+        estados: array (N,) de índices de estado
+        epsilon: probabilidad de explorar
+        rng: np.random.Generator
+    Returns:
+        array (N,) de índices de acción
+    """
+    q = Q[estados]
+    es_max = q == q.max(axis=1, keepdims=True)
+    acciones = np.argmax(es_max * rng.random(q.shape), axis=1)
+
+    explorar = rng.random(len(estados)) < epsilon
+    acciones[explorar] = rng.integers(0, Q.shape[1], size=int(explorar.sum()))
+    return acciones
+
+
+def actualizar_q_lote(Q, estados, acciones, objetivos, alpha, pesos=None):
+    """
+    Actualización TD por lotes. Si un mismo par (s, a) aparece varias veces
+    en el lote se usa el promedio de sus errores TD (como un solo paso)
+    Args:
+        Q: tabla (S, A), se modifica en sitio
+        estados, acciones: arrays (N,)
+        objetivos: array (N,) con los objetivos TD
+        alpha: tasa de aprendizaje
+        pesos: pesos opcionales (N,) de muestreo por importancia
+    Returns:
+        errores TD (N,) antes de la actualización
+    """
+    plana = Q.reshape(-1)
+    claves = estados * Q.shape[1] + acciones
+    errores = objetivos - plana[claves]
+    ponderados = errores if pesos is None else errores * pesos
+    suma = np.bincount(claves, weights=ponderados, minlength=plana.size)
+    conteo = np.bincount(claves, minlength=plana.size)
+    tocadas = conteo > 0
+    plana[tocadas] += alpha * suma[tocadas] / conteo[tocadas]
+    return errores
+
+
+def q_learning_vectorizado(env, num_pasos=1000, alpha=0.1, gamma=0.9, epsilon=0.1, Q=None,
+                           memoria=None, tam_lote=256, actualizaciones_por_paso=1, n_pasos=1):
+    """
+    Q-Learning sobre N copias del ambiente a la vez
+    Args:
+        env: AmbienteVectorizado
+        num_pasos: pasos por copia (transiciones totales = num_pasos · N)
+        alpha, gamma, epsilon: como en q_learning (35)
+        Q: tabla inicial opcional (S, A)
+        memoria: MemoriaRepeticion o MemoriaPriorizada opcional; si se da,
+                 las transiciones se guardan y Q se actualiza con lotes
+                 muestreados de la memoria (modo experience replay)
+        tam_lote: transiciones por lote de repetición
+        actualizaciones_por_paso: lotes de repetición por paso del ambiente
+        n_pasos: longitud de los retornos guardados en la memoria
+    Returns:
+        tabla Q (S, A)
+    """
+    if Q is None:
+        Q = np.zeros((env.num_estados, env.num_acciones))
+    s = env.reset()
+    ventana = []  # Últimos n_pasos pasos (s, a, r, terminado, s')
+
+    for _ in range(num_pasos):
+        a = epsilon_greedy_vectorizado(Q, s, epsilon, env.rng)
+        s_siguiente, r, terminado = env.step(a)
+
+        if memoria is None:
+            # Objetivo off-policy: r + gamma · max_a' Q(s', a') (0 si terminó)
+            objetivos = r + gamma * Q[s_siguiente].max(axis=1) * ~terminado
+            actualizar_q_lote(Q, s, a, objetivos, alpha)
+        else:
+            ventana.append((s, a, r, terminado, s_siguiente))
+            if len(ventana) == n_pasos:
+                _, _, R, T, S2 = (np.stack(campo) for campo in zip(*ventana))
+                G, arranque, descuentos = retornos_n_pasos(R, T, S2, gamma, n_pasos)
+                s0, a0 = ventana.pop(0)[:2]
+                memoria.agregar(s0, a0, G[0], arranque[0], descuentos[0])
+
+            if len(memoria) >= tam_lote:
+                for _ in range(actualizaciones_por_paso):
+                    indices, pesos, (S, A, G, S2, D) = memoria.muestrear(tam_lote)
+                    objetivos = G + D * Q[S2].max(axis=1)
+                    errores = actualizar_q_lote(Q, S, A, objetivos, alpha, pesos)
+                    if hasattr(memoria, 'actualizar_prioridades'):
+                        memoria.actualizar_prioridades(indices, errores)
+
+        s = env.estados
+
+    return Q
+
+
+def sarsa_vectorizado(env, num_pasos=1000, alpha=0.1, gamma=0.9, epsilon=0.1, Q=None):
+    """
+    SARSA sobre N copias del ambiente a la vez
+    Args:
+        env: AmbienteVectorizado
+        num_pasos: pasos por copia (transiciones totales = num_pasos · N)
+        alpha, gamma, epsilon: como en sarsa (34)
+        Q: tabla inicial opcional (S, A)
+    Returns:
+        tabla Q (S, A)
+    """
+    if Q is None:
+        Q = np.zeros((env.num_estados, env.num_acciones))
+    s = env.reset()
+    a = epsilon_greedy_vectorizado(Q, s, epsilon, env.rng)
+
+    for _ in range(num_pasos):
+        s_siguiente, r, terminado = env.step(a)
+
+        # A' se elige en el estado real de cada copia (ya reiniciado si terminó);
+        # en las copias terminadas el término Q(s', a') se anula
+        a_siguiente = epsilon_greedy_vectorizado(Q, env.estados, epsilon, env.rng)
+        q_siguiente = Q[s_siguiente, a_siguiente] * ~terminado
+        objetivos = r + gamma * q_siguiente
+        actualizar_q_lote(Q, s, a, objetivos, alpha)
+
+        s = env.estados
+        a = a_siguiente
+
+    return Q
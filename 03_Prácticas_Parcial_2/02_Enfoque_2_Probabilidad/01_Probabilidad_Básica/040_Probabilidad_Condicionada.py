@@ -1,5 +1,10 @@
+import time
 from collections import defaultdict
 
+import numpy as np
+
+from tabla_probabilidad import TablaProbabilidad
+
 # ============================================================================
 # 3. PROBABILIDAD CONDICIONADA Y NORMALIZACIÓN
 # ============================================================================
@@ -23,10 +28,15 @@ def normalizar_distribucion(valores):
     """
     Normaliza una distribución para que sume 1
     Args:
-        valores: lista o dict de valores no normalizados
+        valores: lista, dict, array de NumPy o TablaProbabilidad
     Returns:
         distribución normalizada
     """
+    if isinstance(valores, TablaProbabilidad):
+        return valores.normalizar()
+    if isinstance(valores, np.ndarray):
+        total = valores.sum()
+        return np.full(valores.shape, 1.0 / valores.size) if total == 0 else valores / total
     if isinstance(valores, dict):
         total = sum(valores.values())
         if total == 0:
@@ -43,11 +53,27 @@ def probabilidad_conjunta_a_condicional(p_conjunta, variables):
     """
     Convierte probabilidad conjunta P(A,B) a condicional P(A|B)
     Args:
-        p_conjunta: dict {(a, b): probabilidad}
-        variables: lista de variables ['A', 'B']
+        p_conjunta: dict {(a, b): probabilidad} o TablaProbabilidad
+        variables: lista de variables ['A', 'B'] (o ['A', 'B', 'C', ...]
+                   para P(A | B, C, ...))
     Returns:
         dict de probabilidades condicionales P(A|B) = {b: {a: prob}}
+        (con más de dos variables, b es la tupla de valores condicionantes);
+        si p_conjunta es una TablaProbabilidad, la tabla P(A | resto)
     """
+    if isinstance(p_conjunta, TablaProbabilidad):
+        return p_conjunta.condicional(variables[:1], variables[1:])
+    if len(variables) > 2:
+        # Vía tabla: una división vectorizada en lugar de bucles por clave
+        tabla = TablaProbabilidad.desde_dict(p_conjunta, variables)
+        condicional = tabla.condicional(variables[:1], variables[1:])
+        marginal = tabla.marginal(variables[1:])
+        condicionales = defaultdict(dict)
+        for clave in p_conjunta:
+            if marginal.prob(dict(zip(variables[1:], clave[1:]))) > 0:
+                condicionales[clave[1:]][clave[0]] = condicional.prob(dict(zip(variables, clave)))
+        return dict(condicionales)
+
     # Calcular marginales de B (la variable condicionante)
     marginal_b = defaultdict(float)
     for (a, b), prob in p_conjunta.items():
@@ -92,4 +118,28 @@ if __name__ == "__main__":
     }
     # Queremos P(Clima | Tráfico)
     p_clima_dado_trafico = probabilidad_conjunta_a_condicional(p_conjunta, ['Clima', 'Tráfico'])
-    print(f"   P(Clima | Tráfico): {p_clima_dado_trafico}")
\ No newline at end of file
+    print(f"   P(Clima | Tráfico): {p_clima_dado_trafico}")
+
+    # Ejemplo 4: Tabla etiquetada N-dimensional (12 variables binarias)
+    print("\nTabla de probabilidad etiquetada (12 variables):")
+    rng = np.random.default_rng(0)
+    nombres = [f"X{i}" for i in range(12)]
+    conjunta = TablaProbabilidad(nombres, {v: [0, 1] for v in nombres},
+                                 rng.random((2,) * 12)).normalizar()
+    p_x0 = conjunta.condicional(['X0'], ['X1', 'X2'])
+    print(f"   P(X0=1 | X1=0, X2=1) = {p_x0.prob({'X0': 1, 'X1': 0, 'X2': 1}):.4f}")
+    print(f"   H(X0..X11) = {conjunta.entropia():.4f} bits, "
+          f"I(X0; X1 | X2) = {conjunta.informacion_mutua(['X0'], ['X1'], ['X2']):.5f} bits")
+
+    # Comparación con el bucle de dicts en una conjunta de 1000 x 1000
+    valores_grandes = rng.random((1000, 1000))
+    valores_grandes /= valores_grandes.sum()
+    dict_grande = {(a, b): float(valores_grandes[a, b]) for a in range(1000) for b in range(1000)}
+    tabla_grande = TablaProbabilidad(['A', 'B'], {'A': range(1000), 'B': range(1000)}, valores_grandes)
+    inicio = time.perf_counter()
+    probabilidad_conjunta_a_condicional(dict_grande, ['A', 'B'])
+    t_dict = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    probabilidad_conjunta_a_condicional(tabla_grande, ['A', 'B'])
+    t_tabla = time.perf_counter() - inicio
+    print(f"   P(A|B) con 10^6 entradas: dicts {t_dict * 1e3:.0f} ms, tabla {t_tabla * 1e3:.1f} ms")
@@ -1,6 +1,10 @@
+import numbers
 import random
+import time
 from math import comb # comb (combinatoria) es necesaria para binomial
 
+import numpy as np
+
 # ============================================================================
 # 4. DISTRIBUCIÓN DE PROBABILIDAD
 # ============================================================================
@@ -56,6 +60,124 @@ class DistribucionProbabilidad:
         return sum(p * (v - media)**2 for v, p in self.distribucion.items())
 
 
+class DistribucionCompacta:
+    """
+    Distribución discreta en arrays paralelos (valores, probabilidades) con
+    tabla de alias de Walker/Vose: cada muestra cuesta O(1) en lugar de
+    reconstruir las listas y llamar a random.choices (O(k)).
+    Misma interfaz que DistribucionProbabilidad más muestras(n).
+    """
+    def __init__(self, valores, probabilidades, semilla=None):
+        """
+        Args:
+            valores: lista de valores posibles
+            probabilidades: probabilidades (o pesos) correspondientes
+            semilla: semilla de los generadores aleatorios
+        """
+        if len(valores) != len(probabilidades):
+            raise ValueError("Valores y probabilidades deben tener la misma longitud")
+
+        self.valores = list(valores)
+        probs = np.asarray(probabilidades, dtype=float)
+        total = probs.sum()
+        # Igual que DistribucionProbabilidad: pesos nulos -> uniforme
+        self.probs = probs / total if total > 0 else np.full(len(probs), 1.0 / len(probs))
+        self.indice = {v: i for i, v in enumerate(self.valores)}
+        # Solo los números reales (no bool ni cadenas) van a un array numérico
+        self.numericos = all(isinstance(v, numbers.Real) and not isinstance(v, (bool, np.bool_))
+                             for v in self.valores)
+        self._valores_array = np.asarray(self.valores) if self.numericos else None
+
+        self._construir_alias()
+        self.random = random.Random(semilla)
+        self.rng = np.random.default_rng(semilla)
+        self._momentos = None
+
+    @classmethod
+    def desde_distribucion(cls, distribucion, semilla=None):
+        """Convierte una DistribucionProbabilidad"""
+        return cls(list(distribucion.distribucion.keys()),
+                   list(distribucion.distribucion.values()), semilla)
+
+    def _construir_alias(self):
+        """
+        Método de Vose, O(k): cada celda i guarda su probabilidad de
+        aceptación y el índice 'alias' que completa la celda hasta 1/k
+        """
+        k = len(self.probs)
+        escaladas = (self.probs * k).tolist()
+        aceptacion = [1.0] * k
+        alias = list(range(k))
+        pequenas = [i for i, q in enumerate(escaladas) if q < 1.0]
+        grandes = [i for i, q in enumerate(escaladas) if q >= 1.0]
+
+        while pequenas and grandes:
+            i, j = pequenas.pop(), grandes.pop()
+            aceptacion[i] = escaladas[i]
+            alias[i] = j
+            escaladas[j] -= 1.0 - escaladas[i]
+            (pequenas if escaladas[j] < 1.0 else grandes).append(j)
+        # Lo que queda tiene probabilidad 1 salvo error de redondeo
+
+        self.aceptacion = aceptacion
+        self.alias = alias
+        self.aceptacion_array = np.array(aceptacion)
+        self.alias_array = np.array(alias)
+
+    def prob(self, valor):
+        """Obtiene probabilidad de un valor"""
+        i = self.indice.get(valor)
+        return 0 if i is None else float(self.probs[i])
+
+    def muestra(self):
+        """Una muestra en O(1): celda uniforme y aceptación o alias"""
+        u = self.random.random() * len(self.aceptacion)
+        i = int(u)
+        if u - i < self.aceptacion[i]:
+            return self.valores[i]
+        return self.valores[self.alias[i]]
+
+    def muestras_indices(self, n):
+        """n índices de valor a la vez (array de NumPy)"""
+        celdas = self.rng.integers(0, len(self.aceptacion), size=n)
+        aceptar = self.rng.random(n) < self.aceptacion_array[celdas]
+        return np.where(aceptar, celdas, self.alias_array[celdas])
+
+    def muestras(self, n):
+        """
+        n muestras vectorizadas
+        Returns:
+            array de valores (o lista si los valores no son numéricos),
+            con los mismos valores que devuelve muestra()
+        """
+        indices = self.muestras_indices(n)
+        if self.numericos:
+            return self._valores_array[indices]
+        return [self.valores[i] for i in indices.tolist()]
+
+    def _calcular_momentos(self):
+        """Media y varianza se calculan una sola vez"""
+        if self._momentos is None:
+            if not self.numericos:
+                self._momentos = (None, None)
+            else:
+                x = self._valores_array.astype(float)
+                media = float(self.probs @ x)
+                self._momentos = (media, float(self.probs @ (x - media) ** 2))
+        return self._momentos
+
+    def esperanza(self):
+        """Calcula el valor esperado (media)"""
+        media = self._calcular_momentos()[0]
+        if media is None:
+            print("Advertencia: No se puede calcular la esperanza de valores no numéricos.")
+        return media
+
+    def varianza(self):
+        """Calcula la varianza"""
+        return self._calcular_momentos()[1]
+
+
 def distribucion_binomial(n, p, k):
     """
     Probabilidad binomial: P(X=k) en n intentos con probabilidad p
@@ -96,4 +218,29 @@ if __name__ == "__main__":
     print("Distribución Binomial:")
     # Probabilidad de 3 caras (k=3) en 5 lanzamientos (n=5)
     p_3_caras = distribucion_binomial(n=5, p=0.5, k=3)
-    print(f"   P(3 caras en 5 lanzamientos) = {p_3_caras:.3f}")
\ No newline at end of file
+    print(f"   P(3 caras en 5 lanzamientos) = {p_3_caras:.3f}")
+
+    # Ejemplo 3: Distribución compacta con tabla de alias
+    print("\nDistribución compacta (tabla de alias de Vose):")
+    compacta = DistribucionCompacta.desde_distribucion(dist_dado_cargado, semilla=0)
+    print(f"   Valor esperado: {compacta.esperanza():.2f}, varianza: {compacta.varianza():.2f}")
+    frecuencias = np.bincount(compacta.muestras_indices(1_000_000), minlength=6) / 1_000_000
+    print(f"   Frecuencias en 10^6 muestras: {np.round(frecuencias, 3).tolist()}")
+
+    pesos = np.random.default_rng(1).random(1000)
+    grande = DistribucionProbabilidad(list(range(1000)), pesos.tolist())
+    grande_c = DistribucionCompacta(list(range(1000)), pesos)
+    n = 20_000
+    inicio = time.perf_counter()
+    for _ in range(n):
+        grande.muestra()
+    t_original = (time.perf_counter() - inicio) / n
+    inicio = time.perf_counter()
+    for _ in range(n):
+        grande_c.muestra()
+    t_alias = (time.perf_counter() - inicio) / n
+    inicio = time.perf_counter()
+    grande_c.muestras(10_000_000)
+    t_lote = (time.perf_counter() - inicio) / 10_000_000
+    print(f"   k=1000, por muestra: original {t_original * 1e6:.1f} µs, "
+          f"alias {t_alias * 1e6:.2f} µs, lote {t_lote * 1e9:.0f} ns")
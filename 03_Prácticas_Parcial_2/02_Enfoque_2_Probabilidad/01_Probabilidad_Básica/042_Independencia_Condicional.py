@@ -1,3 +1,7 @@
+import numpy as np
+
+from tabla_probabilidad import TablaProbabilidad
+
 # ============================================================================
 # 5. INDEPENDENCIA CONDICIONAL
 # ============================================================================
@@ -30,6 +34,22 @@ def independencia_condicional(p_a_dado_c, p_b_dado_c, p_ab_dado_c, tolerancia=0.
     return abs(p_ab_dado_c - (p_a_dado_c * p_b_dado_c)) < tolerancia
 
 
+def independencia_en_tabla(tabla, a, b, dado=(), tolerancia=0.001):
+    """
+    Verifica A ⊥ B | C directamente sobre una conjunta de muchas variables:
+    compara P(A,B|C) con P(A|C)·P(B|C) en todas las configuraciones a la vez
+    Args:
+        tabla: TablaProbabilidad con la distribución conjunta
+        a, b: listas de variables
+        dado: lista de variables condicionantes
+        tolerancia: margen de error
+    Returns:
+        (True si son condicionalmente independientes, I(A;B|C) en bits)
+    """
+    return (tabla.independencia_condicional(a, b, dado, tolerancia),
+            tabla.informacion_mutua(a, b, dado))
+
+
 def factorizar_por_independencia(variables, dependencias):
     """
     Factoriza una distribución conjunta usando independencias (Regla de la Cadena)
@@ -81,4 +101,15 @@ if __name__ == "__main__":
     dependencias_red = {'A': [], 'B': ['A'], 'C': ['A']}
     fact = factorizar_por_independencia(variables_red, dependencias_red)
     print(f"   Red: A -> B, A -> C")
-    print(f"   P(A,B,C) = {fact}")
\ No newline at end of file
+    print(f"   P(A,B,C) = {fact}")
+
+    # Ejemplo 4: Independencia sobre una conjunta etiquetada
+    print("\nIndependencia sobre la conjunta P(A,B,C) de la red A -> B, A -> C:")
+    p_a = np.array([0.3, 0.7])
+    p_b_dado_a = np.array([[0.9, 0.1], [0.2, 0.8]])  # [a, b]
+    p_c_dado_a = np.array([[0.6, 0.4], [0.5, 0.5]])  # [a, c]
+    conjunta = TablaProbabilidad(['A', 'B', 'C'], {v: [0, 1] for v in 'ABC'},
+                                 np.einsum('a,ab,ac->abc', p_a, p_b_dado_a, p_c_dado_a))
+    for dado in [[], ['A']]:
+        indep, im = independencia_en_tabla(conjunta, ['B'], ['C'], dado)
+        print(f"   B ⊥ C | {dado}: {indep} (I = {im:.5f} bits)")
@@ -1,3 +1,5 @@
+from tabla_probabilidad import TablaProbabilidad
+
 # ============================================================================
 # 6. REGLA DE BAYES
 # ============================================================================
@@ -49,12 +51,24 @@ def actualizar_creencia_bayes(prior, verosimilitud, evidencia):
     """
     Actualización bayesiana de creencias (usando diccionarios)
     Args:
-        prior: dict {hipótesis: probabilidad_previa}
-        verosimilitud: dict {hipótesis: P(evidencia|hipótesis)}
-        evidencia: (Opcional, solo para claridad)
+        prior: dict {hipótesis: probabilidad_previa} o TablaProbabilidad
+        verosimilitud: dict {hipótesis: P(evidencia|hipótesis)} o
+                       TablaProbabilidad (puede incluir ejes de observación)
+        evidencia: (Opcional, solo para claridad); con tablas, dict
+                   {variable_observada: valor} para fijar esos ejes
     Returns:
-        dict {hipótesis: probabilidad_posterior}
+        dict {hipótesis: probabilidad_posterior} (TablaProbabilidad si el
+        prior es una tabla)
     """
+    if isinstance(prior, TablaProbabilidad):
+        # Vía tabla: producto alineado por nombre y normalización vectorizada
+        numeradores = prior * verosimilitud
+        if isinstance(evidencia, dict):
+            numeradores = numeradores.reducir(evidencia)
+        if numeradores.valores.sum() == 0:
+            return prior
+        return numeradores.normalizar()
+
     # Calcular numeradores
     numeradores = {}
     for hipotesis in prior.keys():
@@ -106,4 +120,15 @@ if __name__ == "__main__":
     
     print(f"   Prior: {prior}")
     print(f"   Evidencia: 'Salió un 6'")
-    print(f"   Posterior: {posterior}")
\ No newline at end of file
+    print(f"   Posterior: {posterior}")
+
+    # Ejemplo 3: Actualización con tablas etiquetadas (varias hipótesis y observaciones)
+    print("\nActualización con tablas (dos tiradas observadas a la vez):")
+    caras = [1, 2, 3, 4, 5, 6]
+    prior_t = TablaProbabilidad.desde_dict(prior, ['Dado'])
+    verosimilitud_t = TablaProbabilidad(
+        ['Dado', 'T1', 'T2'], {'Dado': prior_t.dominios['Dado'], 'T1': caras, 'T2': caras},
+        [[[1/36] * 6] * 6,
+         [[a * b for b in [0.1] * 5 + [0.5]] for a in [0.1] * 5 + [0.5]]])
+    posterior_t = actualizar_creencia_bayes(prior_t, verosimilitud_t, {'T1': 6, 'T2': 6})
+    print(f"   Posterior tras dos seises: {posterior_t.a_dict()}")
@@ -0,0 +1,176 @@
+"""
+TABLA DE PROBABILIDAD
+Tabla N-dimensional con ejes etiquetados (un eje por variable, con su
+dominio) sobre un array de NumPy: marginales, condicionales, productos,
+normalización, entropía e independencia condicional sin bucles de Python.
+Vía rápida para los ayudantes de 40, 42 y 43.
+"""
+
+import numpy as np
+
+# ============================================================================
+# TABLA DE PROBABILIDAD
+# ============================================================================
+
+class TablaProbabilidad:
+    """
+    Función sobre el producto cartesiano de los dominios de 'variables'.
+    valores[i, j, ...] corresponde a (dominios[v0][i], dominios[v1][j], ...).
+    No tiene por qué estar normalizada (sirve también para verosimilitudes).
+    """
+    def __init__(self, variables, dominios, valores):
+        """
+        Args:
+            variables: lista de nombres de variable (uno por eje)
+            dominios: dict {variable: [valores]} o lista en el orden de variables
+            valores: array con forma (|dom(v0)|, |dom(v1)|, ...)
+        """
+        self.variables = tuple(variables)
+        if isinstance(dominios, dict):
+            dominios = [dominios[v] for v in self.variables]
+        self.dominios = {v: list(d) for v, d in zip(self.variables, dominios)}
+        self.valores = np.asarray(valores, dtype=float)
+        forma = tuple(len(self.dominios[v]) for v in self.variables)
+        if self.valores.shape != forma:
+            raise ValueError(f"La forma {self.valores.shape} no coincide con los dominios {forma}")
+        self._indices = {v: {x: i for i, x in enumerate(d)} for v, d in self.dominios.items()}
+
+    @classmethod
+    def desde_dict(cls, tabla, variables, dominios=None):
+        """
+        Construye la tabla desde el formato de los módulos {(a, b, ...): p}
+        (o {a: p} con una sola variable); las combinaciones ausentes valen 0
+        Args:
+            tabla: dict con tuplas de valores como claves
+            variables: nombres de las variables en el orden de las tuplas
+            dominios: dict {variable: [valores]}; por defecto, en orden de aparición
+        """
+        claves = [k if isinstance(k, tuple) else (k,) for k in tabla]
+        if dominios is None:
+            dominios = {v: list(dict.fromkeys(k[i] for k in claves))
+                        for i, v in enumerate(variables)}
+        indices = [{x: j for j, x in enumerate(dominios[v])} for v in variables]
+        valores = np.zeros([len(dominios[v]) for v in variables])
+        posiciones = tuple(np.array([ind[k[i]] for k in claves], dtype=np.int64)
+                           for i, ind in enumerate(indices))
+        np.add.at(valores, posiciones, list(tabla.values()))
+        return cls(variables, dominios, valores)
+
+    def a_dict(self):
+        """Formato de los módulos: {(a, b, ...): p} o {a: p} con una variable"""
+        resultado = {}
+        for indice, p in np.ndenumerate(self.valores):
+            clave = tuple(self.dominios[v][i] for v, i in zip(self.variables, indice))
+            resultado[clave[0] if len(clave) == 1 else clave] = float(p)
+        return resultado
+
+    def __repr__(self):
+        return f"TablaProbabilidad({list(self.variables)}, forma={self.valores.shape})"
+
+    def prob(self, asignacion):
+        """
+        Valor de una asignación completa {variable: valor}
+        """
+        indice = tuple(self._indices[v][asignacion[v]] for v in self.variables)
+        return float(self.valores[indice])
+
+    # ------------------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------------------
+
+    def normalizar(self):
+        """Divide por la suma total (uniforme si la suma es 0)"""
+        total = self.valores.sum()
+        if total == 0:
+            return TablaProbabilidad(self.variables, self.dominios,
+                                     np.full(self.valores.shape, 1.0 / self.valores.size))
+        return TablaProbabilidad(self.variables, self.dominios, self.valores / total)
+
+    def marginal(self, variables):
+        """
+        Tabla sobre 'variables' sumando las demás (en el orden pedido)
+        """
+        variables = list(variables)
+        sumar = tuple(i for i, v in enumerate(self.variables) if v not in variables)
+        restantes = [v for v in self.variables if v in variables]
+        valores = self.valores.sum(axis=sumar)
+        valores = np.transpose(valores, [restantes.index(v) for v in variables])
+        return TablaProbabilidad(variables, self.dominios, valores)
+
+    def reducir(self, evidencia):
+        """
+        Fija variables a valores {variable: valor} y elimina sus ejes
+        (sin normalizar: el resultado es P(resto, evidencia))
+        """
+        indice = tuple(self._indices[v][evidencia[v]] if v in evidencia else slice(None)
+                       for v in self.variables)
+        restantes = [v for v in self.variables if v not in evidencia]
+        return TablaProbabilidad(restantes, self.dominios, self.valores[indice])
+
+    def condicionar(self, evidencia):
+        """P(resto | evidencia) como tabla normalizada"""
+        return self.reducir(evidencia).normalizar()
+
+    def condicional(self, objetivo, dado):
+        """
+        P(objetivo | dado) para todos los valores de 'dado' a la vez: la
+        marginal conjunta se divide por la marginal de 'dado' (las
+        configuraciones con probabilidad 0 quedan en 0)
+        Returns:
+            tabla con ejes objetivo + dado
+        """
+        objetivo, dado = list(objetivo), list(dado)
+        conjunta = self.marginal(objetivo + dado)
+        ejes_objetivo = tuple(range(len(objetivo)))
+        normalizador = conjunta.valores.sum(axis=ejes_objetivo, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valores = np.where(normalizador > 0, conjunta.valores / normalizador, 0.0)
+        return TablaProbabilidad(objetivo + dado, self.dominios, valores)
+
+    def __mul__(self, otra):
+        """
+        Producto punto a punto alineando los ejes por nombre (las variables
+        comunes deben tener el mismo dominio)
+        """
+        variables = list(self.variables) + [v for v in otra.variables if v not in self.variables]
+        etiqueta = {v: i for i, v in enumerate(variables)}
+        dominios = {**otra.dominios, **self.dominios}
+        for v in set(self.variables) & set(otra.variables):
+            if self.dominios[v] != otra.dominios[v]:
+                raise ValueError(f"Dominios distintos para {v}")
+        valores = np.einsum(self.valores, [etiqueta[v] for v in self.variables],
+                            otra.valores, [etiqueta[v] for v in otra.variables],
+                            [etiqueta[v] for v in variables])
+        return TablaProbabilidad(variables, dominios, valores)
+
+    # ------------------------------------------------------------------------
+    # Medidas
+    # ------------------------------------------------------------------------
+
+    def entropia(self, base=2):
+        """H(variables) de la tabla normalizada"""
+        p = self.valores.ravel() / self.valores.sum()
+        p = p[p > 0]
+        return float(-(p * np.log(p)).sum() / np.log(base))
+
+    def informacion_mutua(self, a, b, dado=(), base=2):
+        """
+        I(A; B | C) = H(A,C) + H(B,C) - H(A,B,C) - H(C)
+        Args:
+            a, b, dado: listas de variables
+        """
+        a, b, dado = list(a), list(b), list(dado)
+        h = lambda variables: self.marginal(variables).entropia(base) if variables else 0.0
+        # max(0, ·): con independencia exacta el redondeo puede dar -1e-17
+        return max(0.0, h(a + dado) + h(b + dado) - h(a + b + dado) - h(dado))
+
+    def independencia_condicional(self, a, b, dado=(), tolerancia=1e-3):
+        """
+        True si max |P(A,B|C) - P(A|C)·P(B|C)| < tolerancia sobre todas las
+        configuraciones con P(C) > 0
+        """
+        a, b, dado = list(a), list(b), list(dado)
+        conjunta = self.condicional(a + b, dado)
+        producto = self.condicional(a, dado) * self.condicional(b, dado)
+        producto = producto.marginal(a + b + dado)  # Mismo orden de ejes
+        return bool(np.abs(conjunta.valores - producto.valores).max() < tolerancia)
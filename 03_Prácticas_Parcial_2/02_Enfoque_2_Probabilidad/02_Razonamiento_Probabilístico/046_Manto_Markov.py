@@ -1,3 +1,8 @@
+import time
+
+from indice_estructural import IndiceEstructural
+from red_compilada import crear_red_sintetica
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -5,10 +10,12 @@ class RedBayesiana:
     def __init__(self):
         self.nodos = {}
         self.estructura = {}
+        self.indice = IndiceEstructural()  # Padres/hijos, manto y d-separación
     
     def agregar_nodo(self, nombre, padres, tabla_prob):
         self.nodos[nombre] = {'padres': padres, 'tabla': tabla_prob}
         self.estructura[nombre] = padres
+        self.indice.agregar_nodo(nombre, padres)
     
     # (prob_dado_padres no es necesaria para esta función)
 
@@ -26,6 +33,12 @@ def manto_markov(nodo, red_bayesiana):
     Returns:
         conjunto de nodos en el manto de Markov
     """
+    # Con el índice estructural de la red: listas de hijos mantenidas al
+    # agregar nodos y resultado en caché
+    indice = getattr(red_bayesiana, 'indice', None)
+    if indice is not None:
+        return set(indice.manto_markov(nodo))
+
     manto = set()
     
     # Agregar padres
@@ -75,4 +88,28 @@ if __name__ == "__main__":
 
     manto_robo = manto_markov('Robo', red)
     print(f"   Manto de Markov de 'Robo': {manto_robo}")
-    print("   (Padres: Ninguno; Hijos: Alarma; Co-Padres: Terremoto)\n")
\ No newline at end of file
+    print("   (Padres: Ninguno; Hijos: Alarma; Co-Padres: Terremoto)\n")
+
+    print("Índice estructural (d-separación con Bayes-Ball):")
+    indice = red.indice
+    casos = [('Robo', 'Terremoto', []), ('Robo', 'Terremoto', ['Alarma']),
+             ('Robo', 'Terremoto', ['Juan']), ('Juan', 'Maria', ['Alarma']),
+             ('Robo', 'Maria', [])]
+    for x, y, z in casos:
+        print(f"   {x} ⊥ {y} | {z}: {indice.d_separados(x, y, z)}")
+    requeridas, observaciones = indice.relevantes(['Robo'], ['Alarma', 'Maria'])
+    print(f"   P(Robo | Alarma, Maria) solo necesita las CPTs de {sorted(requeridas)}")
+    print(f"   y las observaciones {sorted(observaciones)}\n")
+
+    red_grande, variables_g, _ = crear_red_sintetica(RedBayesiana, num_nodos=2000, semilla=0)
+    indice_g = red_grande.indice
+    red_grande.indice = None  # Versión original: recorre toda la estructura
+    inicio = time.perf_counter()
+    mantos = [manto_markov(v, red_grande) for v in variables_g[:200]]
+    t_original = time.perf_counter() - inicio
+    red_grande.indice = indice_g
+    inicio = time.perf_counter()
+    mantos_indice = [manto_markov(v, red_grande) for v in variables_g[:200]]
+    t_indice = time.perf_counter() - inicio
+    print(f"   Red de 2000 nodos, 200 mantos: recorriendo {t_original * 1e3:.1f} ms, "
+          f"con índice {t_indice * 1e3:.2f} ms (iguales: {mantos == mantos_indice})")
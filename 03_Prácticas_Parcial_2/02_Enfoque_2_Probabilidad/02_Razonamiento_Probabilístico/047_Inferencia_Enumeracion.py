@@ -1,5 +1,9 @@
+import time
 from itertools import product
 
+from arbol_uniones import ArbolUniones
+from red_compilada import RedCompilada, enumeracion_compilada, crear_red_sintetica
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -82,6 +86,83 @@ def inferencia_enumeracion(query_var, evidencia, red_bayesiana, variables, domin
         
     return resultados_normalizados
 
+
+def inferencia_enumeracion_memo(query_var, evidencia, red_bayesiana, variables, dominios):
+    """
+    Enumeración en profundidad (ENUMERATION-ASK) con memoización y poda;
+    misma interfaz y resultado que inferencia_enumeracion.
+    - Poda: solo se recorren la query, la evidencia y sus ancestros (las
+      demás variables son estériles y suman 1)
+    - Factorización: P(var | padres) multiplica a la suma sobre las
+      variables siguientes en vez de recalcular la conjunta completa
+    - Memoización: la suma desde la posición i solo depende de los valores
+      ya asignados que son padres de variables en i.. (su 'contexto')
+    Args:
+        query_var, evidencia, red_bayesiana, variables, dominios: como en
+        inferencia_enumeracion (variables en orden topológico)
+    Returns:
+        dict {valor_query: probabilidad_normalizada}
+    """
+    relevantes = set()
+    pendientes = [query_var, *evidencia]
+    while pendientes:
+        v = pendientes.pop()
+        if v not in relevantes:
+            relevantes.add(v)
+            pendientes.extend(red_bayesiana.estructura.get(v, []))
+    orden = [v for v in variables if v in relevantes]
+    padres = {v: red_bayesiana.estructura.get(v, []) for v in orden}
+
+    # Contexto de cada posición (la query entra hasta su propia posición,
+    # porque su valor cambia entre las ramas del bucle externo)
+    contextos = []
+    necesarios = set()
+    for i in range(len(orden) - 1, -1, -1):
+        necesarios.update(padres[orden[i]])
+        contexto = [v for v in orden[:i] if v in necesarios]
+        if query_var not in orden[:i]:
+            contexto.append(query_var)
+        contextos.append(tuple(contexto))
+    contextos.reverse()
+
+    asignacion = dict(evidencia)
+    memo = {}
+
+    def enumerar(i):
+        if i == len(orden):
+            return 1.0
+        clave = (i,) + tuple(asignacion[v] for v in contextos[i])
+        if clave in memo:
+            return memo[clave]
+
+        var = orden[i]
+        valores_padres = {p: asignacion[p] for p in padres[var]}
+        if var in asignacion:
+            prob = red_bayesiana.prob_dado_padres(var, asignacion[var], valores_padres)
+            total = prob * enumerar(i + 1) if prob else 0.0
+        else:
+            total = 0.0
+            for valor in dominios[var]:
+                prob = red_bayesiana.prob_dado_padres(var, valor, valores_padres)
+                if prob:  # Las ramas con probabilidad 0 no se exploran
+                    asignacion[var] = valor
+                    total += prob * enumerar(i + 1)
+            asignacion.pop(var, None)
+
+        memo[clave] = total
+        return total
+
+    resultados = {}
+    for valor_query in dominios[query_var]:
+        asignacion[query_var] = valor_query
+        resultados[valor_query] = enumerar(0)
+
+    total = sum(resultados.values())
+    if total > 0:
+        return {k: v/total for k, v in resultados.items()}
+    # Si la evidencia es imposible, P(E)=0
+    return {k: 0 for k in resultados}
+
 # ============================================================================
 # EJEMPLOS DE USO
 # ============================================================================
@@ -128,4 +209,67 @@ if __name__ == "__main__":
     for valor, prob in resultado.items():
         print(f"   P(Robo={valor} | J=T, M=T) = {prob:.4f}")
     
-    # (El resultado esperado es ~28.4% para Robo=True)
\ No newline at end of file
+    # (El resultado esperado es ~28.4% para Robo=True)
+
+    print("\nRed compilada (CPTs como arrays):")
+    red_c = RedCompilada(red, dominios)
+    inicio = time.perf_counter()
+    for _ in range(200):
+        inferencia_enumeracion(query_var, evidencia, red, variables, dominios)
+    t_dict = (time.perf_counter() - inicio) / 200
+    inicio = time.perf_counter()
+    for _ in range(200):
+        resultado_c = enumeracion_compilada(red_c, query_var, evidencia)
+    t_comp = (time.perf_counter() - inicio) / 200
+    for valor, prob in resultado_c.items():
+        print(f"   P(Robo={valor} | J=T, M=T) = {prob:.4f}")
+    print(f"   Tiempo por consulta: dicts {t_dict * 1e3:.3f} ms, compilada {t_comp * 1e3:.3f} ms")
+
+    print("\nEnumeración con memoización y poda (misma interfaz):")
+    for valor, prob in inferencia_enumeracion_memo(query_var, evidencia, red, variables, dominios).items():
+        print(f"   P(Robo={valor} | J=T, M=T) = {prob:.4f}")
+
+    def medir(funcion, *args, repeticiones=1):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            resultado = funcion(*args)
+        return resultado, (time.perf_counter() - inicio) / repeticiones
+
+    casos = [("alarma", red, variables, dominios, query_var, evidencia, 200)]
+    for n in (14, 18):
+        red_n, variables_n, dominios_n = crear_red_sintetica(RedBayesiana, num_nodos=n, semilla=n)
+        casos.append((f"sintética {n}", red_n, variables_n, dominios_n,
+                      'X0', {f'X{n - 1}': 1, f'X{n // 2}': 0}, 1))
+    for nombre, red_n, variables_n, dominios_n, q, ev, reps in casos:
+        r1, t1 = medir(inferencia_enumeracion, q, ev, red_n, variables_n, dominios_n, repeticiones=reps)
+        r2, t2 = medir(inferencia_enumeracion_memo, q, ev, red_n, variables_n, dominios_n, repeticiones=reps)
+        error = max(abs(r1[k] - r2[k]) for k in r1)
+        print(f"   {nombre:14s} completa {t1 * 1e3:9.2f} ms, memo {t2 * 1e3:7.2f} ms (error {error:.1e})")
+    red_n, variables_n, dominios_n = crear_red_sintetica(RedBayesiana, num_nodos=200, semilla=1)
+    _, t2 = medir(inferencia_enumeracion_memo, 'X0', {'X199': 1, 'X150': 0}, red_n, variables_n, dominios_n)
+    print(f"   sintética 200  completa   inviable, memo {t2 * 1e3:7.2f} ms")
+
+    print("\nÁrbol de uniones (una calibración, muchas consultas):")
+    arbol = ArbolUniones(red_c)
+    arbol.fijar_evidencia(evidencia)
+    for variable in variables:
+        print(f"   P({variable}=True | J=T, M=T) = {arbol.marginal(variable)[True]:.4f}")
+
+    red_s, variables_s, dominios_s = crear_red_sintetica(RedBayesiana, num_nodos=200, semilla=1)
+    arbol_s = ArbolUniones(RedCompilada(red_s, dominios_s))
+    print(f"   Red sintética de 200 nodos: {len(arbol_s.cliques)} cliques, "
+          f"la mayor con {max(len(c) for c in arbol_s.cliques)} variables")
+    inicio = time.perf_counter()
+    arbol_s.fijar_evidencia({'X199': 1, 'X150': 0, 'X120': 1})
+    arbol_s.calibrar()
+    t_calib = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for variable in variables_s:
+        arbol_s.marginal(variable)
+    t_consultas = time.perf_counter() - inicio
+    print(f"   Calibración {t_calib * 1e3:.1f} ms, 200 marginales {t_consultas * 1e3:.2f} ms")
+    antes = arbol_s.mensajes_calculados
+    arbol_s.actualizar_evidencia({'X10': 0})
+    arbol_s.calibrar()
+    print(f"   Nueva evidencia X10=0: se recalculan {arbol_s.mensajes_calculados - antes} "
+          f"de {len(arbol_s.separadores)} mensajes")
@@ -1,3 +1,9 @@
+import time
+
+from factores import eliminacion_variables_compilada
+from factores import sumar_variable as _sumar_variable
+from red_compilada import RedCompilada, crear_red_sintetica
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -9,78 +15,80 @@ class RedBayesiana:
     def agregar_nodo(self, nombre, padres, tabla_prob):
         self.nodos[nombre] = {'padres': padres, 'tabla': tabla_prob}
         self.estructura[nombre] = padres
-    # ... (métodos omitidos por simplicidad, ya que las funciones
-    #      de eliminación de variables son stubs conceptuales)
+    
+    def prob_dado_padres(self, nodo, valor, valores_padres):
+        tabla = self.nodos[nodo]['tabla']
+        padres = self.nodos[nodo]['padres']
+        if not padres:
+            return tabla.get(valor, 0)
+        clave_padres = tuple(valores_padres.get(p) for p in padres)
+        clave_completa = (valor,) + clave_padres
+        return tabla.get(clave_completa, 0)
 
 # ============================================================================
-# 11. ELIMINACIÓN DE VARIABLES (Conceptual)
+# 11. ELIMINACIÓN DE VARIABLES
 # ============================================================================
 
-def reducir_factor(factor, variable, valor):
-    """Reduce un factor fijando una variable a un valor"""
-    # (Implementación simplificada)
-    print(f"   -> Reduciendo factor en {variable}={valor}")
-    # En una implementación real:
-    # 1. Se itera la tabla del factor
-    # 2. Se crea una nueva tabla solo con las filas que coinciden
-    # 3. Se elimina 'variable' de la lista de variables del factor
-    return factor
+def reducir_factor(factor, variable, valor, dominio):
+    """
+    Reduce un factor fijando una variable a un valor
+    Args:
+        factor: Factor
+        variable: nombre de la variable
+        valor: valor de la variable (no su índice)
+        dominio: valores posibles de la variable, en el orden de los ejes
+    Returns:
+        Factor sin el eje de 'variable' (el mismo si no la contiene)
+    """
+    if valor not in dominio:
+        raise ValueError(f"{valor!r} no pertenece al dominio de {variable}: {list(dominio)}")
+    return factor.reducir(variable, list(dominio).index(valor))
 
 
 def sumar_variable(factores, variable):
-    """Suma (marginaliza) una variable de los factores"""
-    # (Implementación simplificada)
-    print(f"   -> Sumando (eliminando) variable {variable}")
-    # En una implementación real:
-    # 1. Se identifican todos los factores que contienen 'variable'
-    # 2. Se multiplican esos factores (pointwise product)
-    # 3. Se suma sobre 'variable' para crear un nuevo factor
-    # 4. Se devuelven los factores no afectados + el nuevo factor
-    return factores
+    """
+    Suma (marginaliza) una variable de los factores: multiplica los que la
+    contienen y la suma en una sola contracción (ver factores.py)
+    """
+    return _sumar_variable(factores, variable)
 
 
-def eliminacion_variables(query, evidencia, red_bayesiana, orden_eliminacion):
+def dominios_desde_tablas(red_bayesiana):
     """
-    Inferencia más eficiente eliminando variables en orden
+    Deduce el dominio de cada variable de las claves de su tabla
+    (el valor propio es la clave en las raíces y el primer elemento en el resto)
+    """
+    dominios = {}
+    for nodo, datos in red_bayesiana.nodos.items():
+        valores = []
+        for clave in datos['tabla']:
+            valor = clave[0] if datos['padres'] else clave
+            if valor not in valores:
+                valores.append(valor)
+        dominios[nodo] = valores
+    return dominios
+
+
+def eliminacion_variables(query, evidencia, red_bayesiana, orden_eliminacion=None,
+                          dominios=None, heuristica='min_fill'):
+    """
+    Inferencia exacta eliminando variables en orden
     Args:
         query: variable a consultar
         evidencia: dict de evidencia
         red_bayesiana: RedBayesiana
-        orden_eliminacion: lista ordenada de variables a eliminar
+        orden_eliminacion: lista ordenada de variables a eliminar; si es None
+                           se calcula con la heurística
+        dominios: dict {variable: [valores]}; por defecto se deduce de las tablas
+        heuristica: 'min_fill', 'min_degree' o 'weighted_min_fill'
     Returns:
-        distribución de probabilidad
+        dict {valor_query: probabilidad}
     """
-    print(f"Iniciando Eliminación de Variables para P({query}|Evidencia)")
-    
-    factores = []
-    
-    # 1. Crear factores iniciales de cada nodo
-    print("1. Creando factores iniciales...")
-    for nodo in red_bayesiana.nodos:
-        factores.append({
-            'variables': [nodo] + red_bayesiana.estructura.get(nodo, []),
-            'tabla': red_bayesiana.nodos[nodo]['tabla']
-        })
-    print(f"   -> {len(factores)} factores creados.")
-
-    # 2. Reducir factores con evidencia
-    print("2. Reduciendo factores con evidencia...")
-    for var, valor in evidencia.items():
-        factores = [reducir_factor(f, var, valor) for f in factores]
-    
-    # 3. Eliminar variables en orden
-    print("3. Eliminando variables (marginalizando)...")
-    for var in orden_eliminacion:
-        if var != query and var not in evidencia:
-            factores = sumar_variable(factores, var)
-    
-    # 4. Multiplicar factores restantes y normalizar (simplificado)
-    print("4. Combinando factores finales y normalizando.")
-    resultado = factores[0] if factores else {}
-    
-    # (El resultado real sería un factor sobre Q, que se normaliza)
-    print("¡Eliminación de Variables (conceptual) completada!")
-    return resultado
+    if dominios is None:
+        dominios = dominios_desde_tablas(red_bayesiana)
+    red_c = RedCompilada(red_bayesiana, dominios)
+    return eliminacion_variables_compilada(red_c, query, evidencia,
+                                           orden_eliminacion, heuristica)
 
 # ============================================================================
 # EJEMPLOS DE USO
@@ -89,15 +97,26 @@ def eliminacion_variables(query, evidencia, red_bayesiana, orden_eliminacion):
 # --- Función de ayuda para crear la red de ejemplo ---
 def crear_red_alarma():
     red = RedBayesiana()
-    red.agregar_nodo('Robo', [], {})
-    red.agregar_nodo('Terremoto', [], {})
-    red.agregar_nodo('Alarma', ['Robo', 'Terremoto'], {})
-    red.agregar_nodo('Juan', ['Alarma'], {})
-    red.agregar_nodo('Maria', ['Alarma'], {})
+    red.agregar_nodo('Robo', [], {True: 0.001, False: 0.999})
+    red.agregar_nodo('Terremoto', [], {True: 0.002, False: 0.998})
+    red.agregar_nodo('Alarma', ['Robo', 'Terremoto'], {
+        (True, True, True): 0.95, (False, True, True): 0.05,
+        (True, True, False): 0.94, (False, True, False): 0.06,
+        (True, False, True): 0.29, (False, False, True): 0.71,
+        (True, False, False): 0.001, (False, False, False): 0.999,
+    })
+    red.agregar_nodo('Juan', ['Alarma'], {
+        (True, True): 0.90, (False, True): 0.10,
+        (True, False): 0.05, (False, False): 0.95,
+    })
+    red.agregar_nodo('Maria', ['Alarma'], {
+        (True, True): 0.70, (False, True): 0.30,
+        (True, False): 0.01, (False, False): 0.99,
+    })
     return red
 
 if __name__ == "__main__":
-    print("=== 11. Eliminación de Variables (Conceptual) ===\n")
+    print("=== 11. Eliminación de Variables ===\n")
     
     red = crear_red_alarma()
     
@@ -106,4 +125,21 @@ if __name__ == "__main__":
     # Orden óptimo: eliminar 'Alarma', luego 'Terremoto'
     orden = ['Alarma', 'Terremoto']
     
-    eliminacion_variables(query, evidencia, red, orden)
\ No newline at end of file
+    print("Con orden manual ['Alarma', 'Terremoto']:")
+    for valor, prob in eliminacion_variables(query, evidencia, red, orden).items():
+        print(f"   P(Robo={valor} | J=T, M=T) = {prob:.4f}")
+    # (El resultado esperado es ~28.4% para Robo=True, como en 10)
+
+    print("\nCon orden calculado por min-fill:")
+    for valor, prob in eliminacion_variables(query, evidencia, red).items():
+        print(f"   P(Robo={valor} | J=T, M=T) = {prob:.4f}")
+
+    print("\nRed sintética de 200 nodos (la enumeración de 10 necesitaría 2^~195 términos):")
+    red_s, variables_s, dominios_s = crear_red_sintetica(RedBayesiana, num_nodos=200, semilla=1)
+    red_c = RedCompilada(red_s, dominios_s)
+    evidencia_s = {'X199': 1, 'X150': 0, 'X120': 1}
+    for heuristica in ['min_fill', 'min_degree', 'weighted_min_fill']:
+        inicio = time.perf_counter()
+        resultado = eliminacion_variables_compilada(red_c, 'X0', evidencia_s, heuristica=heuristica)
+        t = time.perf_counter() - inicio
+        print(f"   {heuristica:18s} P(X0=1 | e) = {resultado[1]:.6f}  ({t * 1e3:.1f} ms)")
@@ -1,6 +1,11 @@
 import random
+import time
 from collections import defaultdict
 
+import numpy as np
+
+from red_compilada import RedCompilada, muestrear_compilada, rechazo_compilado
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -146,4 +151,26 @@ if __name__ == "__main__":
     resultado = muestreo_rechazo('Robo', evidencia, red, variables, dominios, 100000)
     print(f"   P(Robo|Juan=True, Maria=True):")
     for valor, prob in resultado.items():
-        print(f"      Robo={valor}: {prob:.4f}")
\ No newline at end of file
+        print(f"      Robo={valor}: {prob:.4f}")
+    
+    print("\nMuestreo con la red compilada (orden topológico, arrays):")
+    red_c = RedCompilada(red, dominios)
+    inicio = time.perf_counter()
+    muestreo_directo(red, variables, dominios, num_muestras=20000)
+    t_dict = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    matriz = muestrear_compilada(red_c, 1_000_000, np.random.default_rng(0))
+    t_comp = time.perf_counter() - inicio
+    robo = red_c.indice['Robo']
+    print(f"   P(Robo=True) ≈ {(matriz[:, robo] == 0).mean():.4f} con {len(matriz):,} muestras")
+    print(f"   Muestras/s: dicts {20000 / t_dict:,.0f}, compilada {len(matriz) / t_comp:,.0f}")
+
+    print("\nRechazo por bloques con máscara booleana (10^7 muestras):")
+    inicio = time.perf_counter()
+    resultado, aceptadas = rechazo_compilado(red_c, 'Robo', evidencia, 10_000_000,
+                                             rng=np.random.default_rng(1))
+    t_rechazo = time.perf_counter() - inicio
+    print(f"   P(Robo|Juan=True, Maria=True) con {aceptadas:,} muestras aceptadas:")
+    for valor, prob in resultado.items():
+        print(f"      Robo={valor}: {prob:.4f}")
+    print(f"   Tiempo: {t_rechazo:.2f} s ({10_000_000 / t_rechazo:,.0f} muestras/s)")
@@ -1,6 +1,12 @@
+import multiprocessing as mp
 import random
+import time
 from collections import defaultdict
 
+import numpy as np
+
+from red_compilada import RedCompilada, muestrear_ponderado, crear_red_sintetica
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -72,6 +78,143 @@ def ponderacion_verosimilitud(query, evidencia, red_bayesiana, variables, domini
     
     return {k: v/total for k, v in conteos_ponderados.items()}
 
+# ============================================================================
+# PONDERACIÓN DE VEROSIMILITUD PARALELA Y ADAPTATIVA
+# ============================================================================
+
+# Red compilada en cada proceso trabajador (se envía una sola vez)
+_red_trabajador = None
+
+
+def _iniciar_trabajador(red_c):
+    """Inicializador del pool: guarda la red compilada"""
+    global _red_trabajador
+    _red_trabajador = red_c
+
+
+def estadisticas_lote(query, evidencia, num_muestras, semilla, red_c=None):
+    """
+    Genera un lote ponderado y lo resume en sumas de pesos por valor de la
+    query, en escala logarítmica para poder unir lotes sin underflow
+    Args:
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+        num_muestras: tamaño del lote
+        semilla: semilla o SeedSequence del generador
+        red_c: RedCompilada; si es None se usa la del proceso trabajador
+    Returns:
+        (log Σw, log Σw²) por valor de la query, arrays (|dom(query)|,)
+    """
+    red_c = red_c or _red_trabajador
+    q = red_c.indice[query]
+    estados, log_pesos = muestrear_ponderado(red_c, num_muestras, evidencia,
+                                             np.random.default_rng(semilla))
+    maximo = log_pesos.max()
+    card = red_c.cardinalidades[q]
+    if not np.isfinite(maximo):
+        return np.full(card, -np.inf), np.full(card, -np.inf)
+
+    w = np.exp(log_pesos - maximo)
+    suma = np.bincount(estados[:, q], weights=w, minlength=card)
+    suma2 = np.bincount(estados[:, q], weights=w * w, minlength=card)
+    with np.errstate(divide='ignore'):
+        return maximo + np.log(suma), 2 * maximo + np.log(suma2)
+
+
+class PonderacionParalela:
+    """
+    Ponderación de verosimilitud repartida en un pool de procesos, con
+    flujos aleatorios independientes (SeedSequence.spawn) y parada
+    adaptativa. Usar como gestor de contexto:
+    with PonderacionParalela(red_c) as lw: lw.estimar(...)
+    """
+    def __init__(self, red_c, procesos=None, semilla=None):
+        """
+        Args:
+            red_c: RedCompilada
+            procesos: número de procesos (None = todos los núcleos,
+                      0 = muestrear en el proceso principal)
+            semilla: semilla raíz
+        """
+        self.red_c = red_c
+        self.procesos = mp.cpu_count() if procesos is None else procesos
+        self.semillas = np.random.SeedSequence(semilla)
+        self.pool = None
+
+    def __enter__(self):
+        if self.procesos > 0:
+            self.pool = mp.Pool(self.procesos, initializer=_iniciar_trabajador,
+                                initargs=(self.red_c,))
+        return self
+
+    def __exit__(self, *args):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def _ronda(self, query, evidencia, tam_lote):
+        """Un lote por trabajador; devuelve sus estadísticas unidas"""
+        partes = max(1, self.procesos)
+        semillas = self.semillas.spawn(partes)
+        if self.pool is None:
+            lotes = [estadisticas_lote(query, evidencia, tam_lote, sem, self.red_c)
+                     for sem in semillas]
+        else:
+            lotes = self.pool.starmap(estadisticas_lote,
+                                      [(query, evidencia, tam_lote, sem) for sem in semillas])
+        log_w = np.logaddexp.reduce([lote[0] for lote in lotes], axis=0)
+        log_w2 = np.logaddexp.reduce([lote[1] for lote in lotes], axis=0)
+        return log_w, log_w2, partes * tam_lote
+
+    def estimar(self, query, evidencia, ess_objetivo=None, semiancho_objetivo=None,
+                z=1.96, tam_lote=100_000, max_muestras=10**8):
+        """
+        Muestrea por rondas hasta cumplir los criterios de parada dados
+        Args:
+            query: nombre de la variable consultada
+            evidencia: dict {variable: valor}
+            ess_objetivo: tamaño de muestra efectivo mínimo, (Σw)² / Σw²
+            semiancho_objetivo: semiancho máximo del intervalo de confianza
+                                de cada probabilidad (aproximación delta
+                                del estimador de razón)
+            z: cuantil normal del intervalo (1.96 = 95%)
+            tam_lote: muestras por trabajador y ronda
+            max_muestras: límite total de muestras
+        Returns:
+            dict con 'distribucion', 'muestras', 'ess' y 'semiancho'
+        """
+        card = self.red_c.cardinalidades[self.red_c.indice[query]]
+        log_w = np.full(card, -np.inf)
+        log_w2 = np.full(card, -np.inf)
+        muestras = 0
+
+        while True:
+            lw, lw2, n = self._ronda(query, evidencia, tam_lote)
+            log_w = np.logaddexp(log_w, lw)
+            log_w2 = np.logaddexp(log_w2, lw2)
+            muestras += n
+
+            log_total = np.logaddexp.reduce(log_w)
+            if np.isfinite(log_total):
+                # Todo relativo a Σw: p_v = Σw_v / Σw, ESS = (Σw)² / Σw²
+                p = np.exp(log_w - log_total)
+                s2 = np.exp(log_w2 - 2 * log_total)
+                ess = 1.0 / s2.sum()
+                varianza = s2 * (1 - p) ** 2 + (s2.sum() - s2) * p ** 2
+                semiancho = float(z * np.sqrt(varianza).max())
+            else:
+                p, ess, semiancho = np.zeros(card), 0.0, np.inf
+
+            listo = ((ess_objetivo is None or ess >= ess_objetivo) and
+                     (semiancho_objetivo is None or semiancho <= semiancho_objetivo))
+            if listo or muestras >= max_muestras:
+                break
+
+        q = self.red_c.indice[query]
+        return {'distribucion': self.red_c.decodificar_distribucion(q, p),
+                'muestras': muestras, 'ess': float(ess), 'semiancho': semiancho}
+
 # ============================================================================
 # EJEMPLOS DE USO
 # ============================================================================
@@ -115,4 +258,27 @@ if __name__ == "__main__":
     for valor, prob in resultado.items():
         print(f"      Robo={valor}: {prob:.4f}")
     
-    # (El resultado esperado es ~28.4% para Robo=True)
\ No newline at end of file
+    # (El resultado esperado es ~28.4% para Robo=True)
+
+    print("\nPonderación paralela y adaptativa (pesos en log, parada por ESS / IC):")
+    red_c = RedCompilada(red, dominios)
+    for procesos in [0, mp.cpu_count()]:
+        with PonderacionParalela(red_c, procesos=procesos, semilla=0) as lw:
+            inicio = time.perf_counter()
+            est = lw.estimar('Robo', evidencia, semiancho_objetivo=0.005, tam_lote=200_000)
+            tiempo = time.perf_counter() - inicio
+        print(f"   {procesos} procesos: P(Robo=True|J,M) = {est['distribucion'][True]:.4f} "
+              f"± {est['semiancho']:.4f} (exacto 0.2842)")
+        print(f"      {est['muestras']:,} muestras, ESS {est['ess']:,.0f}, {tiempo:.2f} s")
+
+    # Evidencia rara: 10 observaciones en una red de 200 nodos (P(e) ~ 1e-3 o menos)
+    red_s, variables_s, dominios_s = crear_red_sintetica(RedBayesiana, num_nodos=200, semilla=1)
+    red_sc = RedCompilada(red_s, dominios_s)
+    evidencia_s = {f'X{i}': i % 2 for i in range(100, 200, 10)}
+    with PonderacionParalela(red_sc, semilla=1) as lw:
+        inicio = time.perf_counter()
+        est = lw.estimar('X95', evidencia_s, ess_objetivo=20_000, tam_lote=50_000)
+        tiempo = time.perf_counter() - inicio
+    print(f"   Red de 200 nodos, 10 observaciones: P(X95=1|e) = {est['distribucion'][1]:.4f} "
+          f"± {est['semiancho']:.4f}")
+    print(f"      {est['muestras']:,} muestras hasta ESS {est['ess']:,.0f}, {tiempo:.2f} s")
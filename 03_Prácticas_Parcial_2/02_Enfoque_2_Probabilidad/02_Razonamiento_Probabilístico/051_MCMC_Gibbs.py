@@ -1,6 +1,13 @@
+import multiprocessing as mp
 import random
+import time
 from collections import defaultdict
 
+import numpy as np
+
+from indice_estructural import IndiceEstructural
+from red_compilada import RedCompilada, gibbs_compilado, barridos_gibbs, crear_red_sintetica
+
 # ============================================================================
 # 7. RED BAYESIANA (DEPENDENCIA)
 # ============================================================================
@@ -8,10 +15,12 @@ class RedBayesiana:
     def __init__(self):
         self.nodos = {}
         self.estructura = {}
+        self.indice = IndiceEstructural()  # Padres/hijos, manto y d-separación
     
     def agregar_nodo(self, nombre, padres, tabla_prob):
         self.nodos[nombre] = {'padres': padres, 'tabla': tabla_prob}
         self.estructura[nombre] = padres
+        self.indice.agregar_nodo(nombre, padres)
     
     def prob_dado_padres(self, nodo, valor, valores_padres):
         tabla = self.nodos[nodo]['tabla']
@@ -26,6 +35,9 @@ class RedBayesiana:
 # 9. MANTO DE MARKOV (DEPENDENCIA)
 # ============================================================================
 def manto_markov(nodo, red_bayesiana):
+    indice = getattr(red_bayesiana, 'indice', None)
+    if indice is not None:
+        return set(indice.manto_markov(nodo))
     manto = set()
     padres = red_bayesiana.estructura.get(nodo, [])
     manto.update(padres)
@@ -87,8 +99,9 @@ def mcmc_gibbs_sampling(query, evidencia, red_bayesiana, variables, dominios,
                 prob = red_bayesiana.prob_dado_padres(var, valor, valores_padres)
                 
                 # Multiplicar por P(hijo | padres_hijo) para cada hijo
-                hijos = [n for n, pads in red_bayesiana.estructura.items() 
-                         if var in pads]
+                indice = getattr(red_bayesiana, 'indice', None)
+                hijos = indice.hijos[var] if indice is not None else [
+                    n for n, pads in red_bayesiana.estructura.items() if var in pads]
                 for hijo in hijos:
                     padres_hijo = red_bayesiana.estructura[hijo]
                     valores_padres_hijo = {p: estado_temp[p] for p in padres_hijo}
@@ -120,6 +133,188 @@ def mcmc_gibbs_sampling(query, evidencia, red_bayesiana, variables, dominios,
     
     return {k: v/total_conteos for k, v in conteos.items()}
 
+# ============================================================================
+# GIBBS CON CADENAS PARALELAS Y DIAGNÓSTICOS (R-HAT / ESS)
+# ============================================================================
+
+# Red compilada de cada proceso trabajador (guarda sus propias tablas de Gibbs)
+_red_trabajador = None
+
+
+def _iniciar_trabajador(red_c):
+    """Inicializador del pool: guarda la red compilada"""
+    global _red_trabajador
+    _red_trabajador = red_c
+
+
+def avanzar_cadena(query, evidencia, estado, num_barridos, semilla, red_c=None):
+    """
+    Avanza una cadena num_barridos barridos desde 'estado'
+    Args:
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+        estado: lista de índices de valor (estado actual de la cadena)
+        num_barridos: barridos a ejecutar
+        semilla: semilla o SeedSequence del generador
+        red_c: RedCompilada; si es None se usa la del proceso trabajador
+    Returns:
+        (estado final, conteos (|dom(query)|,) de la query en los barridos)
+    """
+    red_c = red_c or _red_trabajador
+    # Las condicionales del manto se calculan una vez por red y evidencia
+    tablas = red_c.condicionales_gibbs(red_c.codificar(evidencia))
+
+    estado = list(estado)
+    q = red_c.indice[query]
+    conteos = np.zeros(red_c.cardinalidades[q], dtype=np.int64)
+    for k, c in barridos_gibbs(tablas, estado, num_barridos, q,
+                               np.random.default_rng(semilla)).items():
+        conteos[k] = c
+    return estado, conteos
+
+
+def r_hat(conteos, barridos):
+    """
+    R-hat de Gelman-Rubin del indicador de cada valor de la query a partir
+    de los conteos por cadena (no hace falta guardar las muestras)
+    Args:
+        conteos: array (cadenas, |dom|) de conteos tras el burn-in
+        barridos: barridos por cadena
+    Returns:
+        máximo R-hat sobre los valores
+    """
+    if barridos < 2:
+        return np.inf
+    p = conteos / barridos
+    W = (p * (1 - p)).mean(axis=0) * barridos / (barridos - 1)
+    B = barridos * p.var(axis=0, ddof=1)
+    var_mas = (barridos - 1) / barridos * W + B / barridos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        R = np.sqrt(np.where(W > 0, var_mas / W, np.where(B > 0, np.inf, 1.0)))
+    return float(R.max())
+
+
+def ess_medias_lotes(historial, tam_lote):
+    """
+    Tamaño de muestra efectivo por el método de medias por lotes: cada
+    ronda de cada cadena es un lote de tam_lote barridos
+    Args:
+        historial: array (rondas, cadenas, |dom|) de conteos por ronda
+    Returns:
+        mínimo ESS sobre los valores con varianza no nula
+    """
+    medias = historial.reshape(-1, historial.shape[-1]) / tam_lote
+    if len(medias) < 2:
+        return 0.0
+    n = len(medias) * tam_lote
+    p = medias.mean(axis=0)
+    varianza = p * (1 - p)
+    varianza_lotes = medias.var(axis=0, ddof=1)
+    validos = varianza > 0
+    if not validos.any():
+        return float(n)
+    ess = n * varianza[validos] / (tam_lote * np.maximum(varianza_lotes[validos], 1e-300))
+    return float(min(ess.min(), n))
+
+
+class GibbsParalelo:
+    """
+    Varias cadenas de Gibbs sobre una RedCompilada, repartidas en un pool de
+    procesos. Las cadenas avanzan por rondas; el burn-in se fija cuando R-hat
+    baja del umbral (se descarta la primera mitad, como en Gelman-Rubin) y
+    después se muestrea hasta alcanzar el ESS pedido. La query se acumula
+    como conteos por ronda, nunca como muestras.
+    Usar como gestor de contexto: with GibbsParalelo(red_c) as g: g.estimar(...)
+    """
+    def __init__(self, red_c, num_cadenas=4, procesos=None, semilla=None):
+        """
+        Args:
+            red_c: RedCompilada
+            num_cadenas: cadenas independientes (al menos 2 para R-hat)
+            procesos: número de procesos (None = todos los núcleos,
+                      0 = ejecutar en el proceso principal)
+            semilla: semilla raíz
+        """
+        self.red_c = red_c
+        self.num_cadenas = num_cadenas
+        self.procesos = mp.cpu_count() if procesos is None else procesos
+        self.semillas = np.random.SeedSequence(semilla)
+        self.rng = np.random.default_rng(self.semillas.spawn(1)[0])
+        self.pool = None
+
+    def __enter__(self):
+        if self.procesos > 0:
+            self.pool = mp.Pool(min(self.procesos, self.num_cadenas),
+                                initializer=_iniciar_trabajador, initargs=(self.red_c,))
+        return self
+
+    def __exit__(self, *args):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def _ronda(self, query, evidencia, estados, barridos):
+        semillas = self.semillas.spawn(len(estados))
+        if self.pool is None:
+            resultados = [avanzar_cadena(query, evidencia, e, barridos, sem, self.red_c)
+                          for e, sem in zip(estados, semillas)]
+        else:
+            resultados = self.pool.starmap(avanzar_cadena,
+                                           [(query, evidencia, e, barridos, sem)
+                                            for e, sem in zip(estados, semillas)])
+        estados = [r[0] for r in resultados]
+        return estados, np.stack([r[1] for r in resultados])
+
+    def estimar(self, query, evidencia, barridos_por_ronda=500, umbral_rhat=1.01,
+                ess_objetivo=5000, max_barridos=10**6):
+        """
+        Args:
+            query: nombre de la variable consultada
+            evidencia: dict {variable: valor}
+            barridos_por_ronda: barridos de cada cadena por ronda (tamaño de lote)
+            umbral_rhat: R-hat máximo para dar por terminado el burn-in
+            ess_objetivo: ESS mínimo tras el burn-in
+            max_barridos: límite de barridos por cadena
+        Returns:
+            dict con 'distribucion', 'burn_in', 'barridos', 'r_hat' y 'ess'
+        """
+        ev = self.red_c.codificar(evidencia)
+        # Estados iniciales dispersos: valores uniformes en cada cadena
+        estados = [[int(ev.get(v, self.rng.integers(self.red_c.cardinalidades[v])))
+                    for v in range(self.red_c.num_variables)]
+                   for _ in range(self.num_cadenas)]
+
+        historial = []
+        burn_in = None
+        barridos = 0
+        R, ess = np.inf, 0.0
+        while barridos < max_barridos:
+            estados, conteos = self._ronda(query, evidencia, estados, barridos_por_ronda)
+            historial.append(conteos)
+            barridos += barridos_por_ronda
+
+            if burn_in is None:
+                if len(historial) < 2:
+                    continue
+                # Gelman-Rubin sobre la segunda mitad de lo recorrido
+                mitad = historial[len(historial) // 2:]
+                R = r_hat(np.sum(mitad, axis=0), len(mitad) * barridos_por_ronda)
+                if R < umbral_rhat:
+                    burn_in = barridos - len(mitad) * barridos_por_ronda
+                    historial = mitad
+            else:
+                R = r_hat(np.sum(historial, axis=0), len(historial) * barridos_por_ronda)
+            if burn_in is not None:
+                ess = ess_medias_lotes(np.array(historial), barridos_por_ronda)
+                if ess >= ess_objetivo:
+                    break
+
+        total = np.sum(historial, axis=(0, 1))
+        q = self.red_c.indice[query]
+        return {'distribucion': self.red_c.decodificar_distribucion(q, total / total.sum()),
+                'burn_in': burn_in, 'barridos': barridos, 'r_hat': R, 'ess': ess}
+
 # ============================================================================
 # EJEMPLOS DE USO
 # ============================================================================
@@ -163,4 +358,36 @@ if __name__ == "__main__":
     
     print(f"   P(Robo|Juan=True, Maria=True):")
     for valor, prob in resultado_mcmc.items():
-        print(f"      Robo={valor}: {prob:.4f}")
\ No newline at end of file
+        print(f"      Robo={valor}: {prob:.4f}")
+    
+    print("\nGibbs sobre la red compilada (estado entero en sitio):")
+    red_c = RedCompilada(red, dominios)
+    inicio = time.perf_counter()
+    mcmc_gibbs_sampling('Robo', evidencia, red, variables, dominios, num_muestras=5000, burn_in=500)
+    t_dict = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado_c = gibbs_compilado(red_c, 'Robo', evidencia, num_muestras=5000, burn_in=500,
+                                  rng=np.random.default_rng(0))
+    t_comp = time.perf_counter() - inicio
+    for valor, prob in resultado_c.items():
+        print(f"      Robo={valor}: {prob:.4f}")
+    print(f"   Tiempo: dicts {t_dict:.2f} s, compilada {t_comp:.2f} s")
+
+    print("\nCadenas paralelas con burn-in automático (R-hat) y parada por ESS:")
+    with GibbsParalelo(red_c, num_cadenas=4, semilla=0) as gibbs:
+        inicio = time.perf_counter()
+        est = gibbs.estimar('Robo', evidencia, ess_objetivo=5000)
+        tiempo = time.perf_counter() - inicio
+    print(f"   P(Robo=True|J,M) = {est['distribucion'][True]:.4f} (exacto 0.2842)")
+    print(f"   burn-in {est['burn_in']} barridos, {est['barridos']} barridos por cadena, "
+          f"R-hat {est['r_hat']:.4f}, ESS {est['ess']:,.0f}, {tiempo:.2f} s")
+
+    red_s, variables_s, dominios_s = crear_red_sintetica(RedBayesiana, num_nodos=200, semilla=1)
+    red_sc = RedCompilada(red_s, dominios_s)
+    evidencia_s = {f'X{i}': i % 2 for i in range(100, 200, 10)}
+    with GibbsParalelo(red_sc, num_cadenas=4, semilla=1) as gibbs:
+        inicio = time.perf_counter()
+        est = gibbs.estimar('X95', evidencia_s, barridos_por_ronda=200, ess_objetivo=2000)
+        tiempo = time.perf_counter() - inicio
+    print(f"   Red de 200 nodos: P(X95=1|e) = {est['distribucion'][1]:.4f}, "
+          f"burn-in {est['burn_in']}, R-hat {est['r_hat']:.4f}, ESS {est['ess']:,.0f}, {tiempo:.2f} s")
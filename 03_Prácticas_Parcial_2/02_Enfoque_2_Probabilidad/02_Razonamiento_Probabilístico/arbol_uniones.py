@@ -0,0 +1,249 @@
+"""
+ÁRBOL DE UNIONES (JUNCTION TREE)
+Inferencia exacta con paso de mensajes de Shafer-Shenoy sobre un árbol de
+cliques: moralización, triangulación por eliminación, árbol de expansión
+máximo por tamaño de separador y mensajes guardados en caché, de modo que
+tras calibrar cada marginal es una consulta a un dict y un cambio de
+evidencia solo invalida los mensajes que salen de la clique afectada
+"""
+
+import numpy as np
+
+from factores import Factor, producto, factores_red, orden_eliminacion
+
+# ============================================================================
+# CONSTRUCCIÓN
+# ============================================================================
+
+def cliques_eliminacion(factores, orden):
+    """
+    Triangula el grafo de interacción (el grafo moral si los factores son
+    las CPTs) eliminando en 'orden' y devuelve las cliques maximales
+    Args:
+        factores: lista de Factor
+        orden: orden de eliminación de todas las variables
+    Returns:
+        lista de tuplas de variables
+    """
+    vecinos = {}
+    for f in factores:
+        for v in f.variables:
+            vecinos.setdefault(v, set()).update(u for u in f.variables if u != v)
+
+    cliques = []
+    for v in orden:
+        vs = vecinos.pop(v)
+        clique = frozenset(vs | {v})
+        if not any(clique <= c for c in cliques):
+            cliques = [c for c in cliques if not c <= clique] + [clique]
+        for a in vs:
+            vecinos[a].discard(v)
+            vecinos[a].update(u for u in vs if u != a)
+    return [tuple(sorted(c, key=orden.index)) for c in cliques]
+
+
+def arbol_expansion_maximo(cliques):
+    """
+    Kruskal sobre el peso |Ci ∩ Cj|; con cliques de una eliminación el
+    resultado cumple la propiedad de intersección (running intersection).
+    Las componentes desconectadas se unen con separadores vacíos.
+    Returns:
+        lista de aristas (i, j)
+    """
+    candidatas = sorted(((len(set(a) & set(b)), i, j)
+                         for i, a in enumerate(cliques)
+                         for j, b in enumerate(cliques) if i < j), reverse=True)
+    raiz = list(range(len(cliques)))
+
+    def buscar(i):
+        while raiz[i] != i:
+            raiz[i] = raiz[raiz[i]]
+            i = raiz[i]
+        return i
+
+    aristas = []
+    for _, i, j in candidatas:
+        ri, rj = buscar(i), buscar(j)
+        if ri != rj:
+            raiz[ri] = rj
+            aristas.append((i, j))
+    return aristas
+
+# ============================================================================
+# ÁRBOL DE UNIONES
+# ============================================================================
+
+class ArbolUniones:
+    """
+    Árbol de cliques de una RedCompilada con mensajes Shafer-Shenoy.
+    La evidencia se guarda como factores indicadores multiplicados en la
+    clique 'hogar' de cada variable (la que recibió su CPT), así que las
+    formas de los potenciales no cambian al modificarla.
+    """
+    def __init__(self, red_c, heuristica='min_fill'):
+        """
+        Args:
+            red_c: RedCompilada
+            heuristica: heurística de triangulación (ver orden_eliminacion)
+        """
+        self.red_c = red_c
+        cpts = factores_red(red_c)
+        orden = orden_eliminacion(cpts, list(red_c.nombres), heuristica)
+        self.cliques = cliques_eliminacion(cpts, orden)
+
+        self.vecinos = [[] for _ in self.cliques]
+        for i, j in arbol_expansion_maximo(self.cliques):
+            self.vecinos[i].append(j)
+            self.vecinos[j].append(i)
+        self.separadores = {(i, j): tuple(v for v in self.cliques[i] if v in self.cliques[j])
+                            for i in range(len(self.cliques)) for j in self.vecinos[i]}
+
+        # Cada CPT va a la clique más pequeña que contiene su familia
+        self.hogar = {}
+        asignados = [[] for _ in self.cliques]
+        for f in cpts:
+            familia = set(f.variables)
+            i = min((i for i, c in enumerate(self.cliques) if familia <= set(c)),
+                    key=lambda i: len(self.cliques[i]))
+            asignados[i].append(f)
+            self.hogar[f.variables[-1]] = i
+
+        cards = {v: int(red_c.cardinalidades[red_c.indice[v]]) for v in red_c.nombres}
+        self.base = []
+        for clique, fs in zip(self.cliques, asignados):
+            unos = Factor(clique, np.ones([cards[v] for v in clique]))
+            self.base.append(producto([unos] + fs))
+        self.potenciales = list(self.base)
+
+        self._orden_calibracion()
+        self.evidencia = {}
+        self.mensajes = {}
+        self.marginales = {}
+        self.mensajes_calculados = 0  # Contador para medir el trabajo incremental
+
+    def _orden_calibracion(self):
+        """
+        Recorrido en anchura desde la clique 0: la fase de recolección va de
+        las hojas a la raíz y la de distribución de la raíz a las hojas.
+        También se precalcula, para cada clique, qué mensajes salen de ella.
+        """
+        orden, padre = [0], {0: None}
+        for i in orden:
+            for j in self.vecinos[i]:
+                if j not in padre:
+                    padre[j] = i
+                    orden.append(j)
+        distribucion = [(padre[j], j) for j in orden[1:]]
+        self.calendario = [(j, i) for i, j in reversed(distribucion)] + distribucion
+
+        self.salientes = []
+        for h in range(len(self.cliques)):
+            visitados, pendientes, aristas = {h}, [h], []
+            while pendientes:
+                i = pendientes.pop()
+                for j in self.vecinos[i]:
+                    if j not in visitados:
+                        visitados.add(j)
+                        pendientes.append(j)
+                        aristas.append((i, j))
+            self.salientes.append(aristas)
+
+    # ------------------------------------------------------------------------
+    # Evidencia
+    # ------------------------------------------------------------------------
+
+    def actualizar_evidencia(self, cambios):
+        """
+        Modifica la evidencia de forma incremental
+        Args:
+            cambios: dict {variable: valor}; valor None retira la evidencia
+        """
+        afectadas = set()
+        for v, valor in cambios.items():
+            if self.evidencia.get(v) == valor:
+                continue
+            if valor is None:
+                self.evidencia.pop(v, None)
+            else:
+                self.evidencia[v] = valor
+            afectadas.add(self.hogar[v])
+
+        for h in afectadas:
+            indicadores = []
+            for v, valor in self.evidencia.items():
+                if self.hogar[v] == h:
+                    iv = self.red_c.indice[v]
+                    tabla = np.zeros(self.red_c.cardinalidades[iv])
+                    tabla[self.red_c.indice_valor[iv][valor]] = 1.0
+                    indicadores.append(Factor((v,), tabla))
+            self.potenciales[h] = producto([self.base[h]] + indicadores) if indicadores else self.base[h]
+            # Los mensajes hacia h siguen siendo válidos
+            for arista in self.salientes[h]:
+                self.mensajes.pop(arista, None)
+        if afectadas:
+            self.marginales = {}
+
+    def fijar_evidencia(self, evidencia):
+        """Reemplaza toda la evidencia (solo se invalida lo que cambia)"""
+        cambios = {v: None for v in self.evidencia if v not in evidencia}
+        cambios.update(evidencia)
+        self.actualizar_evidencia(cambios)
+
+    # ------------------------------------------------------------------------
+    # Paso de mensajes
+    # ------------------------------------------------------------------------
+
+    def _mensaje(self, i, j):
+        """m_{i->j} = sum_{Ci \\ Sij} psi_i · prod_{k != j} m_{k->i}"""
+        entrantes = [self.mensajes[(k, i)] for k in self.vecinos[i] if k != j]
+        eliminar = [v for v in self.cliques[i] if v not in self.separadores[(i, j)]]
+        self.mensajes_calculados += 1
+        return producto([self.potenciales[i]] + entrantes, eliminar=eliminar)
+
+    def creencia(self, i):
+        """Potencial calibrado de la clique i (proporcional a P(Ci, e))"""
+        entrantes = [self.mensajes[(k, i)] for k in self.vecinos[i]]
+        return producto([self.potenciales[i]] + entrantes)
+
+    def calibrar(self):
+        """
+        Calcula los mensajes que falten y las marginales de todas las
+        variables; después marginal() no hace ningún cálculo
+        """
+        for i, j in self.calendario:
+            if (i, j) not in self.mensajes:
+                self.mensajes[(i, j)] = self._mensaje(i, j)
+
+        por_clique = {}
+        for v, h in self.hogar.items():
+            por_clique.setdefault(h, []).append(v)
+        for h, variables in por_clique.items():
+            b = self.creencia(h)
+            for v in variables:
+                eje = b.variables.index(v)
+                otros = tuple(k for k in range(b.tabla.ndim) if k != eje)
+                self.marginales[v] = b.tabla.sum(axis=otros)
+
+    def marginal(self, variable):
+        """
+        P(variable | evidencia)
+        Returns:
+            dict {valor: probabilidad}
+        """
+        if variable not in self.marginales:
+            self.calibrar()
+        p = self.marginales[variable]
+        total = p.sum()
+        iv = self.red_c.indice[variable]
+        return self.red_c.decodificar_distribucion(iv, p / total if total > 0 else p)
+
+    def probabilidad_evidencia(self):
+        """P(e): suma de cualquier creencia calibrada"""
+        if not self.marginales:
+            self.calibrar()
+        return float(next(iter(self.marginales.values())).sum())
+
+    def consulta(self, query, evidencia):
+        """Misma interfaz que las demás inferencias: P(query | evidencia)"""
+        self.fijar_evidencia(evidencia)
+        return self.marginal(query)
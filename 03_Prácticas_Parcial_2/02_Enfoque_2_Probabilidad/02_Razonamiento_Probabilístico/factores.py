@@ -0,0 +1,218 @@
+"""
+FACTORES
+Álgebra de factores sobre arrays de NumPy (producto, marginalización y
+reducción por evidencia) y heurísticas de orden de eliminación para la
+eliminación de variables (11) sobre una RedCompilada
+"""
+
+import numpy as np
+
+# ============================================================================
+# FACTOR
+# ============================================================================
+
+class Factor:
+    """
+    Función no negativa sobre un conjunto de variables discretas.
+    'tabla' tiene un eje por variable, en el orden de 'variables', y cada
+    eje se indexa por el índice del valor dentro del dominio.
+    """
+    def __init__(self, variables, tabla):
+        self.variables = tuple(variables)
+        self.tabla = np.asarray(tabla, dtype=float)
+        if self.tabla.ndim != len(self.variables):
+            raise ValueError("La tabla debe tener un eje por variable")
+
+    def __repr__(self):
+        return f"Factor({list(self.variables)}, forma={self.tabla.shape})"
+
+    @property
+    def cardinalidades(self):
+        return dict(zip(self.variables, self.tabla.shape))
+
+    def __mul__(self, otro):
+        return producto([self, otro])
+
+    def reducir(self, variable, valor):
+        """
+        Fija variable = valor (índice) y elimina su eje
+        """
+        if variable not in self.variables:
+            return self
+        eje = self.variables.index(variable)
+        variables = self.variables[:eje] + self.variables[eje + 1:]
+        return Factor(variables, np.take(self.tabla, valor, axis=eje))
+
+    def marginalizar(self, variable):
+        """Suma sobre todos los valores de la variable"""
+        if variable not in self.variables:
+            return self
+        eje = self.variables.index(variable)
+        variables = self.variables[:eje] + self.variables[eje + 1:]
+        return Factor(variables, self.tabla.sum(axis=eje))
+
+    def normalizar(self):
+        total = self.tabla.sum()
+        return Factor(self.variables, self.tabla / total if total > 0 else self.tabla)
+
+
+def producto(factores, eliminar=()):
+    """
+    Producto punto a punto de varios factores, sumando opcionalmente las
+    variables de 'eliminar' en la misma contracción (no se construye el
+    producto completo antes de marginalizar)
+    Args:
+        factores: lista de Factor
+        eliminar: variables a sumar
+    Returns:
+        Factor sobre la unión de variables menos las eliminadas
+    """
+    variables = []
+    for f in factores:
+        variables.extend(v for v in f.variables if v not in variables)
+    if len(variables) > 52:
+        raise ValueError("Demasiadas variables en un solo producto (máximo 52)")
+    etiqueta = {v: i for i, v in enumerate(variables)}
+    salida = [v for v in variables if v not in eliminar]
+
+    operandos = []
+    for f in factores:
+        operandos += [f.tabla, [etiqueta[v] for v in f.variables]]
+    tabla = np.einsum(*operandos, [etiqueta[v] for v in salida], optimize=True)
+    return Factor(salida, tabla)
+
+
+def factores_red(red_c, variables=None):
+    """
+    Un factor P(v | padres) por variable de una RedCompilada; la CPT
+    (configuraciones, |dom(v)|) se ve como array con un eje por padre
+    Args:
+        red_c: RedCompilada
+        variables: índices de las variables a incluir (todas por defecto)
+    Returns:
+        lista de Factor con los nombres de las variables como etiquetas
+    """
+    if variables is None:
+        variables = range(red_c.num_variables)
+    factores = []
+    for v in variables:
+        padres = list(red_c.padres[v])
+        forma = tuple(red_c.cardinalidades[padres]) + (red_c.cardinalidades[v],)
+        nombres = [red_c.nombres[p] for p in padres] + [red_c.nombres[v]]
+        factores.append(Factor(nombres, red_c.cpts[v].reshape(forma)))
+    return factores
+
+# ============================================================================
+# HEURÍSTICAS DE ORDEN DE ELIMINACIÓN
+# ============================================================================
+
+def _puntaje(v, vecinos, cardinalidades, heuristica):
+    """Costo de eliminar v en el grafo de interacción actual"""
+    vs = list(vecinos[v])
+    if heuristica == 'min_degree':
+        return len(vs)
+    relleno = 0
+    for i, a in enumerate(vs):
+        for b in vs[i + 1:]:
+            if b not in vecinos[a]:
+                relleno += 1 if heuristica == 'min_fill' else cardinalidades[a] * cardinalidades[b]
+    return relleno
+
+
+def orden_eliminacion(factores, variables, heuristica='min_fill'):
+    """
+    Orden de eliminación voraz sobre el grafo de interacción de los factores
+    Args:
+        factores: lista de Factor
+        variables: variables a eliminar
+        heuristica: 'min_fill' (menos aristas de relleno), 'min_degree'
+                    (menos vecinos) o 'weighted_min_fill' (relleno ponderado
+                    por el producto de cardinalidades)
+    Returns:
+        lista con las variables en orden de eliminación
+    """
+    if heuristica not in ('min_fill', 'min_degree', 'weighted_min_fill'):
+        raise ValueError(f"Heurística desconocida: {heuristica}")
+
+    vecinos = {}
+    cardinalidades = {}
+    for f in factores:
+        cardinalidades.update(f.cardinalidades)
+        for v in f.variables:
+            vecinos.setdefault(v, set()).update(u for u in f.variables if u != v)
+
+    pendientes = set(variables) & set(vecinos)
+    puntajes = {v: _puntaje(v, vecinos, cardinalidades, heuristica) for v in pendientes}
+    orden = [v for v in variables if v not in vecinos]  # No aparecen en ningún factor
+
+    while pendientes:
+        # Empates: menos vecinos primero
+        v = min(pendientes, key=lambda u: (puntajes[u], len(vecinos[u])))
+        orden.append(v)
+        pendientes.discard(v)
+
+        vs = vecinos.pop(v)
+        for a in vs:
+            vecinos[a].discard(v)
+            vecinos[a].update(u for u in vs if u != a)
+
+        # Solo cambia el puntaje de los vecinos de v y de sus vecinos
+        afectados = set(vs)
+        for a in vs:
+            afectados |= vecinos[a]
+        for a in afectados & pendientes:
+            puntajes[a] = _puntaje(a, vecinos, cardinalidades, heuristica)
+
+    return orden
+
+# ============================================================================
+# ELIMINACIÓN DE VARIABLES
+# ============================================================================
+
+def sumar_variable(factores, variable):
+    """
+    Multiplica los factores que contienen la variable y la suma en una sola
+    contracción; los demás factores pasan sin cambios
+    """
+    con = [f for f in factores if variable in f.variables]
+    sin = [f for f in factores if variable not in f.variables]
+    if not con:
+        return sin
+    return sin + [producto(con, eliminar=(variable,))]
+
+
+def eliminacion_variables_compilada(red_c, query, evidencia, orden=None, heuristica='min_fill'):
+    """
+    P(query | evidencia) por eliminación de variables.
+    Antes de construir factores se poda la red con Bayes-Ball: solo entran
+    las CPTs requeridas (ni variables estériles ni las d-separadas de la
+    query dada la evidencia).
+    Args:
+        red_c: RedCompilada
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+        orden: orden de eliminación opcional (nombres); si no se da se
+               calcula con la heurística
+        heuristica: ver orden_eliminacion()
+    Returns:
+        dict {valor_query: probabilidad}
+    """
+    q = red_c.indice[query]
+    ev = red_c.codificar(evidencia)
+    requeridas, _ = red_c.grafo.relevantes([q], ev)
+
+    factores = factores_red(red_c, sorted(requeridas))
+    for v, k in ev.items():
+        factores = [f.reducir(red_c.nombres[v], k) for f in factores]
+
+    eliminar = [red_c.nombres[v] for v in sorted(requeridas) if v != q and v not in ev]
+    if orden is None:
+        orden = orden_eliminacion(factores, eliminar, heuristica)
+    else:
+        orden = [v for v in orden if v in eliminar] + [v for v in eliminar if v not in orden]
+
+    for variable in orden:
+        factores = sumar_variable(factores, variable)
+
+    resultado = producto(factores).normalizar()
+    return red_c.decodificar_distribucion(q, resultado.tabla)
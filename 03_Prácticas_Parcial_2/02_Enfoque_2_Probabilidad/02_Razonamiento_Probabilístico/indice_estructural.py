@@ -0,0 +1,166 @@
+"""
+ÍNDICE ESTRUCTURAL
+Adyacencia de padres e hijos mantenida al agregar nodos, con consultas de
+manto de Markov, ancestros y d-separación (Bayes-Ball de Shachter) en tiempo
+lineal y guardadas en caché, para podar variables irrelevantes antes de la
+inferencia
+"""
+
+from collections import deque
+
+# ============================================================================
+# ÍNDICE ESTRUCTURAL
+# ============================================================================
+
+class IndiceEstructural:
+    """
+    Grafo dirigido de una red bayesiana con listas de padres y de hijos.
+    Los nodos pueden ser nombres o índices enteros. Las cachés se vacían
+    cada vez que se agrega un nodo.
+    """
+    def __init__(self):
+        self.padres = {}
+        self.hijos = {}
+        self._mantos = {}
+        self._ancestros = {}
+        self._bolas = {}
+
+    @classmethod
+    def desde_estructura(cls, estructura):
+        """Construye el índice a partir de un dict {nodo: [padres]}"""
+        indice = cls()
+        for nodo, padres in estructura.items():
+            indice.agregar_nodo(nodo, padres)
+        return indice
+
+    def agregar_nodo(self, nodo, padres):
+        """
+        Registra el nodo y sus padres; actualiza las listas de hijos en
+        O(|padres|) en lugar de recorrer toda la estructura
+        """
+        self.padres[nodo] = list(padres)
+        self.hijos.setdefault(nodo, [])
+        for p in padres:
+            self.hijos.setdefault(p, []).append(nodo)
+        self._mantos.clear()
+        self._ancestros.clear()
+        self._bolas.clear()
+
+    # ------------------------------------------------------------------------
+    # Consultas locales
+    # ------------------------------------------------------------------------
+
+    def manto_markov(self, nodo):
+        """Padres, hijos y co-padres de los hijos (sin el propio nodo)"""
+        if nodo not in self._mantos:
+            manto = set(self.padres.get(nodo, ()))
+            for hijo in self.hijos.get(nodo, ()):
+                manto.add(hijo)
+                manto.update(self.padres[hijo])
+            manto.discard(nodo)
+            self._mantos[nodo] = frozenset(manto)
+        return self._mantos[nodo]
+
+    def ancestros(self, nodos):
+        """Los nodos dados y todos sus ancestros, O(V + E)"""
+        clave = frozenset(nodos)
+        if clave not in self._ancestros:
+            vistos = set(clave)
+            pendientes = list(clave)
+            while pendientes:
+                for p in self.padres.get(pendientes.pop(), ()):
+                    if p not in vistos:
+                        vistos.add(p)
+                        pendientes.append(p)
+            self._ancestros[clave] = frozenset(vistos)
+        return self._ancestros[clave]
+
+    # ------------------------------------------------------------------------
+    # Bayes-Ball y d-separación
+    # ------------------------------------------------------------------------
+
+    def bayes_ball(self, query, evidencia):
+        """
+        Bayes-Ball (Shachter, 1998): una pelota sale de los nodos de la query
+        como si viniera de un hijo y rebota según las reglas de d-separación.
+        Cada nodo se marca arriba y abajo a lo sumo una vez: O(V + E).
+        Args:
+            query: nodos consultados
+            evidencia: nodos observados
+        Returns:
+            (marcados_arriba, marcados_abajo, visitados):
+            - arriba: nodos cuyas CPTs se necesitan para P(query | evidencia)
+            - abajo: nodos no observados d-conectados con la query
+            - visitados: todos los nodos a los que llegó la pelota
+        """
+        clave = (frozenset(query), frozenset(evidencia))
+        if clave in self._bolas:
+            return self._bolas[clave]
+
+        observados = clave[1]
+        arriba, abajo, visitados = set(), set(), set()
+        pendientes = deque((nodo, True) for nodo in clave[0])  # (nodo, desde_hijo)
+        while pendientes:
+            nodo, desde_hijo = pendientes.popleft()
+            visitados.add(nodo)
+            if nodo not in observados and desde_hijo:
+                # No observado, llega de un hijo: pasa a padres e hijos
+                if nodo not in arriba:
+                    arriba.add(nodo)
+                    pendientes.extend((p, True) for p in self.padres.get(nodo, ()))
+                if nodo not in abajo:
+                    abajo.add(nodo)
+                    pendientes.extend((h, False) for h in self.hijos.get(nodo, ()))
+            elif not desde_hijo:
+                if nodo in observados:
+                    # Observado, llega de un padre: rebota hacia los padres
+                    if nodo not in arriba:
+                        arriba.add(nodo)
+                        pendientes.extend((p, True) for p in self.padres.get(nodo, ()))
+                elif nodo not in abajo:
+                    # No observado, llega de un padre: sigue hacia los hijos
+                    abajo.add(nodo)
+                    pendientes.extend((h, False) for h in self.hijos.get(nodo, ()))
+            # Observado y llega de un hijo: la pelota se bloquea
+
+        resultado = (frozenset(arriba), frozenset(abajo), frozenset(visitados))
+        self._bolas[clave] = resultado
+        return resultado
+
+    def _conjunto(self, nodos):
+        """
+        Un nodo o una colección de nodos -> set de nodos conocidos
+        (las cadenas siempre son un solo nodo)
+        """
+        try:
+            es_nodo = nodos in self.hijos
+        except TypeError:  # No hashable (list, set): es una colección
+            es_nodo = False
+        if es_nodo or isinstance(nodos, str) or not hasattr(nodos, '__iter__'):
+            conjunto = {nodos}
+        else:
+            conjunto = set(nodos)
+        desconocidos = [n for n in conjunto if n not in self.hijos]
+        if desconocidos:
+            raise KeyError(f"Nodos desconocidos: {desconocidos}")
+        return conjunto
+
+    def d_separados(self, x, y, z=()):
+        """
+        True si los conjuntos X e Y están d-separados dado Z
+        Args:
+            x, y: nodos o colecciones de nodos
+            z: nodo o colección de nodos observados
+        """
+        x, y, z = self._conjunto(x), self._conjunto(y), self._conjunto(z)
+        _, abajo, _ = self.bayes_ball(x, z)
+        return not (y - z) & abajo
+
+    def relevantes(self, query, evidencia):
+        """
+        Poda previa a la inferencia
+        Returns:
+            (nodos cuyas CPTs hacen falta, observaciones que influyen)
+        """
+        arriba, _, visitados = self.bayes_ball(query, evidencia)
+        return arriba, visitados & frozenset(evidencia)
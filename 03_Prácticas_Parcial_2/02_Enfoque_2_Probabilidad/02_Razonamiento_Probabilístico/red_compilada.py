@@ -0,0 +1,450 @@
+"""
+RED BAYESIANA COMPILADA
+Forma compilada de RedBayesiana (7-14): variables y valores codificados como
+enteros, CPTs como arrays densos indexados por configuración de padres,
+orden topológico y listas de hijos precalculados
+"""
+
+import numpy as np
+from bisect import bisect_right
+from itertools import product
+
+from indice_estructural import IndiceEstructural
+
+# ============================================================================
+# COMPILACIÓN
+# ============================================================================
+
+def orden_topologico(estructura):
+    """
+    Orden topológico (algoritmo de Kahn) de un grafo {hijo: [padres]};
+    los empates respetan el orden de inserción
+    """
+    pendientes = {v: len(padres) for v, padres in estructura.items()}
+    hijos = {v: [] for v in estructura}
+    for v, padres in estructura.items():
+        for p in padres:
+            hijos[p].append(v)
+
+    listos = [v for v in estructura if pendientes[v] == 0]
+    orden = []
+    while listos:
+        v = listos.pop(0)
+        orden.append(v)
+        for h in hijos[v]:
+            pendientes[h] -= 1
+            if pendientes[h] == 0:
+                listos.append(h)
+
+    if len(orden) != len(estructura):
+        raise ValueError("La red contiene un ciclo")
+    return orden
+
+
+class RedCompilada:
+    """
+    Red bayesiana compilada a arrays de NumPy.
+    Las variables se numeran en orden topológico (0..n-1) y sus valores
+    según el orden de 'dominios'. La CPT de la variable v es un array
+    (configuraciones_padres, |dom(v)|) y la fila de una configuración se
+    obtiene como producto escalar de los valores de los padres con 'pasos'.
+    """
+    def __init__(self, red_bayesiana, dominios):
+        """
+        Args:
+            red_bayesiana: objeto con 'estructura' y prob_dado_padres()
+                           (cualquiera de las copias de RedBayesiana)
+            dominios: dict {variable: [valores posibles]}
+        """
+        self.nombres = orden_topologico(red_bayesiana.estructura)
+        self.indice = {v: i for i, v in enumerate(self.nombres)}
+        self.dominios = [list(dominios[v]) for v in self.nombres]
+        self.indice_valor = [{val: k for k, val in enumerate(dom)} for dom in self.dominios]
+        self.cardinalidades = np.array([len(dom) for dom in self.dominios])
+
+        n = len(self.nombres)
+        self.padres = [np.array([self.indice[p] for p in red_bayesiana.estructura[v]], dtype=np.int64)
+                       for v in self.nombres]
+        hijos = [[] for _ in range(n)]
+        for v in range(n):
+            for p in self.padres[v]:
+                hijos[p].append(v)
+        self.hijos = [np.array(h, dtype=np.int64) for h in hijos]
+        # Índice estructural sobre los índices enteros (manto, d-separación)
+        self.grafo = IndiceEstructural()
+        for v in range(n):
+            self.grafo.agregar_nodo(v, self.padres[v].tolist())
+
+        # Pasos para convertir valores de padres en índice de configuración
+        # (el primer padre es el más significativo)
+        self.pasos = []
+        for v in range(n):
+            cards = self.cardinalidades[self.padres[v]]
+            pasos = np.ones(len(cards), dtype=np.int64)
+            for k in range(len(cards) - 2, -1, -1):
+                pasos[k] = pasos[k + 1] * cards[k + 1]
+            self.pasos.append(pasos)
+
+        self.cpts = [self._compilar_cpt(red_bayesiana, v) for v in range(n)]
+        self.cdfs = [np.cumsum(cpt, axis=1) for cpt in self.cpts]
+        # CDFs de todas las filas concatenadas y desplazadas (fila c en [c, c+1])
+        # para muestrear con un solo searchsorted: ver muestrear_compilada
+        self.cdfs_planas = []
+        for cdf in self.cdfs:
+            plana = cdf + np.arange(len(cdf))[:, None]
+            plana[:, -1] = np.arange(1, len(cdf) + 1)
+            self.cdfs_planas.append(plana.ravel())
+
+        # Tablas de Gibbs por conjunto de variables observadas (ver condicionales_gibbs)
+        self._tablas_gibbs = {}
+
+    def _compilar_cpt(self, red_bayesiana, v):
+        """Lee P(v | padres) de la red original una sola vez por entrada"""
+        nombre = self.nombres[v]
+        padres = [self.nombres[p] for p in self.padres[v]]
+        dominios_padres = [self.dominios[p] for p in self.padres[v]]
+        configuraciones = list(product(*dominios_padres))
+
+        cpt = np.zeros((len(configuraciones), self.cardinalidades[v]))
+        for c, valores in enumerate(configuraciones):
+            valores_padres = dict(zip(padres, valores))
+            for k, valor in enumerate(self.dominios[v]):
+                cpt[c, k] = red_bayesiana.prob_dado_padres(nombre, valor, valores_padres)
+        return cpt
+
+    @property
+    def num_variables(self):
+        return len(self.nombres)
+
+    def condicionales_gibbs(self, observadas):
+        """
+        tablas_gibbs de las variables no observadas, calculadas una vez por
+        conjunto de variables observadas y guardadas en esta red (cada
+        proceso trabajador tiene su copia)
+        Args:
+            observadas: índices de las variables de evidencia
+        """
+        clave = frozenset(observadas)
+        if clave not in self._tablas_gibbs:
+            libres = [v for v in range(self.num_variables) if v not in clave]
+            self._tablas_gibbs[clave] = tablas_gibbs(self, libres)
+        return self._tablas_gibbs[clave]
+
+    # ------------------------------------------------------------------------
+    # Codificación
+    # ------------------------------------------------------------------------
+
+    def codificar(self, asignacion):
+        """{nombre: valor} -> {índice_variable: índice_valor}"""
+        return {self.indice[v]: self.indice_valor[self.indice[v]][val]
+                for v, val in asignacion.items()}
+
+    def decodificar_distribucion(self, v, probabilidades):
+        """Array de probabilidades de la variable v -> {valor: prob}"""
+        return {val: float(p) for val, p in zip(self.dominios[v], probabilidades)}
+
+    # ------------------------------------------------------------------------
+    # Consultas a las CPTs
+    # ------------------------------------------------------------------------
+
+    def configuracion(self, v, estados):
+        """
+        Índice de configuración de padres de v
+        Args:
+            estados: array (n,) con un estado completo o (N, n) con N estados
+        """
+        if len(self.padres[v]) == 0:
+            return 0 if estados.ndim == 1 else np.zeros(len(estados), dtype=np.int64)
+        return estados[..., self.padres[v]] @ self.pasos[v]
+
+    def prob(self, v, estado):
+        """P(X_v = estado[v] | padres) para un estado entero completo"""
+        return self.cpts[v][self.configuracion(v, estado), estado[v]]
+
+    def log_conjunta(self, estados):
+        """log P(x) de cada fila de una matriz de estados (N, n)"""
+        total = np.zeros(len(estados))
+        with np.errstate(divide='ignore'):
+            for v in range(self.num_variables):
+                total += np.log(self.cpts[v][self.configuracion(v, estados), estados[:, v]])
+        return total
+
+def crear_red_sintetica(clase_red, num_nodos=200, max_padres=3, ventana=8,
+                        cardinalidad=2, semilla=None):
+    """
+    Red aleatoria para pruebas de escala: los padres de cada nodo se eligen
+    entre los 'ventana' nodos anteriores (ancho de árbol acotado, como en las
+    redes de diagnóstico por capas) y las CPTs se sortean de una Dirichlet
+    Args:
+        clase_red: clase RedBayesiana del módulo que la usa
+        num_nodos, max_padres, ventana, cardinalidad: forma de la red
+        semilla: semilla del generador
+    Returns:
+        (red, variables en orden topológico, dominios)
+    """
+    rng = np.random.default_rng(semilla)
+    red = clase_red()
+    variables = [f"X{i}" for i in range(num_nodos)]
+    dominio = list(range(cardinalidad))
+    dominios = {v: dominio for v in variables}
+
+    for i, v in enumerate(variables):
+        candidatos = variables[max(0, i - ventana):i]
+        k = int(rng.integers(0, min(max_padres, len(candidatos)) + 1))
+        padres = [str(p) for p in rng.choice(candidatos, size=k, replace=False)] if k else []
+
+        tabla = {}
+        for config in product(dominio, repeat=len(padres)):
+            probs = rng.dirichlet(np.ones(cardinalidad))
+            for valor, p in zip(dominio, probs):
+                tabla[(valor,) + config if padres else valor] = float(p)
+        red.agregar_nodo(v, padres, tabla)
+
+    return red, variables, dominios
+
+# ============================================================================
+# INFERENCIA SOBRE LA RED COMPILADA
+# ============================================================================
+
+def enumeracion_compilada(red_c, query, evidencia):
+    """
+    Enumeración completa vectorizada: todas las asignaciones de las variables
+    ocultas se construyen como una matriz de enteros y la conjunta se obtiene
+    con un 'gather' por variable (sigue siendo O(d^n), pero sin dicts)
+    Args:
+        red_c: RedCompilada
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+    Returns:
+        dict {valor_query: probabilidad}
+    """
+    q = red_c.indice[query]
+    ev = red_c.codificar(evidencia)
+    libres = [v for v in range(red_c.num_variables) if v not in ev]
+
+    cards = red_c.cardinalidades[libres]
+    combinaciones = np.indices(cards).reshape(len(libres), -1).T
+    estados = np.zeros((len(combinaciones), red_c.num_variables), dtype=np.int64)
+    estados[:, libres] = combinaciones
+    for v, k in ev.items():
+        estados[:, v] = k
+
+    conjunta = np.exp(red_c.log_conjunta(estados))
+    resultado = np.bincount(estados[:, q], weights=conjunta, minlength=red_c.cardinalidades[q])
+    total = resultado.sum()
+    if total > 0:
+        resultado = resultado / total
+    return red_c.decodificar_distribucion(q, resultado)
+
+
+def muestrear_compilada(red_c, num_muestras, rng=None):
+    """
+    Muestreo hacia adelante en orden topológico para N muestras a la vez.
+    Los estados se guardan por columnas (una fila contigua por variable) y
+    cada variable se muestrea por CDF inversa con un searchsorted sobre las
+    CDFs concatenadas: la muestra de la configuración c con uniforme u es
+    la posición de c + u en 'cdfs_planas'.
+    Args:
+        red_c: RedCompilada
+        num_muestras: N
+        rng: np.random.Generator opcional
+    Returns:
+        matriz (N, n) de índices de valor
+    """
+    rng = rng or np.random.default_rng()
+    columnas = np.zeros((red_c.num_variables, num_muestras), dtype=np.int64)
+    for v in range(red_c.num_variables):
+        config = _configuracion_columnas(red_c, v, columnas)
+        columnas[v] = _muestrear_variable(red_c, v, config, rng)
+    return columnas.T
+
+
+def _configuracion_columnas(red_c, v, columnas):
+    """Índice de configuración de padres de v con estados por columnas (n, N)"""
+    config = np.zeros(columnas.shape[1], dtype=np.int64)
+    for p, paso in zip(red_c.padres[v], red_c.pasos[v]):
+        config += columnas[p] * paso
+    return config
+
+
+def _muestrear_variable(red_c, v, config, rng):
+    """CDF inversa de las filas 'config' de la CPT de v con un searchsorted"""
+    posicion = np.searchsorted(red_c.cdfs_planas[v], config + rng.random(len(config)),
+                               side='right')
+    return posicion - config * red_c.cardinalidades[v]
+
+
+def muestrear_ponderado(red_c, num_muestras, evidencia, rng=None):
+    """
+    Ponderación de verosimilitud vectorizada: las variables de evidencia se
+    fijan y su probabilidad se acumula como log-peso (sin underflow aunque
+    haya muchas observaciones poco probables)
+    Args:
+        red_c: RedCompilada
+        num_muestras: N
+        evidencia: dict {variable: valor}
+        rng: np.random.Generator opcional
+    Returns:
+        (matriz (N, n) de índices de valor, log-pesos (N,))
+    """
+    rng = rng or np.random.default_rng()
+    ev = red_c.codificar(evidencia)
+    columnas = np.zeros((red_c.num_variables, num_muestras), dtype=np.int64)
+    log_pesos = np.zeros(num_muestras)
+    for v in range(red_c.num_variables):
+        config = _configuracion_columnas(red_c, v, columnas)
+        if v in ev:
+            columnas[v] = ev[v]
+            with np.errstate(divide='ignore'):
+                log_pesos += np.log(red_c.cpts[v][config, ev[v]])
+        else:
+            columnas[v] = _muestrear_variable(red_c, v, config, rng)
+    return columnas.T, log_pesos
+
+
+def bloques_muestras(red_c, num_muestras, tam_bloque=1_000_000, rng=None):
+    """
+    Generador de matrices de muestras de a lo sumo 'tam_bloque' filas,
+    para llegar a 10^7+ muestras sin tenerlas todas en memoria
+    """
+    rng = rng or np.random.default_rng()
+    for inicio in range(0, num_muestras, tam_bloque):
+        yield muestrear_compilada(red_c, min(tam_bloque, num_muestras - inicio), rng)
+
+
+def mascara_evidencia(red_c, estados, evidencia):
+    """
+    Filas de una matriz de muestras (N, n) consistentes con la evidencia
+    Returns:
+        array booleano (N,)
+    """
+    mascara = np.ones(len(estados), dtype=bool)
+    for v, k in red_c.codificar(evidencia).items():
+        mascara &= estados[:, v] == k
+    return mascara
+
+
+def rechazo_compilado(red_c, query, evidencia, num_muestras, tam_bloque=1_000_000, rng=None):
+    """
+    Muestreo por rechazo por bloques: la evidencia es una máscara booleana
+    y la query se cuenta con bincount sobre las filas aceptadas
+    Args:
+        red_c: RedCompilada
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+        num_muestras: muestras a generar
+        tam_bloque: filas por bloque
+    Returns:
+        (dict {valor_query: probabilidad}, muestras aceptadas)
+    """
+    q = red_c.indice[query]
+    conteos = np.zeros(red_c.cardinalidades[q], dtype=np.int64)
+    for estados in bloques_muestras(red_c, num_muestras, tam_bloque, rng):
+        aceptadas = estados[mascara_evidencia(red_c, estados, evidencia), q]
+        conteos += np.bincount(aceptadas, minlength=len(conteos))
+    total = int(conteos.sum())
+    if total == 0:
+        return {}, 0
+    return red_c.decodificar_distribucion(q, conteos / total), total
+
+
+def tabla_condicional_manto(red_c, v):
+    """
+    Precalcula P(X_v | manto de Markov) para todas las configuraciones del
+    manto: P(v | padres) · ∏ P(hijo | padres_hijo), normalizado por fila
+    Args:
+        red_c: RedCompilada
+        v: índice de variable
+    Returns:
+        (manto, pasos, cdf) con manto = índices de variables, pasos para
+        calcular la fila y cdf (configuraciones, |dom(v)|); las filas
+        imposibles quedan en NaN
+    """
+    manto = sorted(red_c.grafo.manto_markov(v))
+
+    cards = red_c.cardinalidades[manto + [v]]
+    combinaciones = np.indices(cards).reshape(len(cards), -1).T
+    estados = np.zeros((len(combinaciones), red_c.num_variables), dtype=np.int64)
+    estados[:, manto + [v]] = combinaciones
+
+    probs = red_c.cpts[v][red_c.configuracion(v, estados), estados[:, v]]
+    for h in red_c.hijos[v]:
+        probs = probs * red_c.cpts[h][red_c.configuracion(h, estados), estados[:, h]]
+    probs = probs.reshape(-1, red_c.cardinalidades[v])
+
+    with np.errstate(invalid='ignore'):
+        cdf = np.cumsum(probs, axis=1) / probs.sum(axis=1, keepdims=True)
+
+    pasos = np.ones(len(manto), dtype=np.int64)
+    for k in range(len(manto) - 2, -1, -1):
+        pasos[k] = pasos[k + 1] * cards[k + 1]
+    return manto, pasos, cdf
+
+
+def tablas_gibbs(red_c, libres):
+    """
+    Condicionales del manto de Markov de las variables libres como listas de
+    Python, para que el bucle de Gibbs trabaje solo con enteros.
+    No dependen de los valores de la evidencia (solo de qué variables lo son).
+    Returns:
+        lista de (v, manto, pasos, filas) con filas = CDFs o None si imposible
+    """
+    tablas = []
+    for v in libres:
+        manto, pasos, cdf = tabla_condicional_manto(red_c, v)
+        filas = [None if np.isnan(fila[-1]) else fila.tolist() for fila in cdf]
+        tablas.append((v, manto, pasos.tolist(), filas))
+    return tablas
+
+
+def barridos_gibbs(tablas, estado, num_barridos, q, rng):
+    """
+    Ejecuta barridos de Gibbs sobre un estado entero (lista) en sitio
+    Args:
+        tablas: salida de tablas_gibbs
+        estado: lista de índices de valor, se modifica en sitio
+        num_barridos: barridos completos sobre las variables libres
+        q: índice de la variable cuyo valor se cuenta tras cada barrido
+        rng: np.random.Generator
+    Returns:
+        dict {índice de valor de q: barridos en los que lo tuvo}
+    """
+    conteos = {}
+    uniformes = rng.random((num_barridos, len(tablas))).tolist()
+    for u_barrido in uniformes:
+        for j, (v, manto, pasos, filas) in enumerate(tablas):
+            fila = filas[sum(estado[m] * p for m, p in zip(manto, pasos))]
+            if fila is not None:  # Si la fila es imposible se mantiene el valor
+                estado[v] = min(bisect_right(fila, u_barrido[j]), len(fila) - 1)
+        conteos[estado[q]] = conteos.get(estado[q], 0) + 1
+    return conteos
+
+
+def gibbs_compilado(red_c, query, evidencia, num_muestras=1000, burn_in=100, rng=None):
+    """
+    Gibbs sampling con las condicionales del manto de Markov precalculadas:
+    cada actualización es calcular una fila y buscar en su CDF, sobre un
+    estado entero que se modifica en sitio
+    Args:
+        red_c: RedCompilada
+        query: nombre de la variable consultada
+        evidencia: dict {variable: valor}
+        num_muestras, burn_in: como en mcmc_gibbs_sampling (14)
+    Returns:
+        dict {valor_query: probabilidad}
+    """
+    rng = rng or np.random.default_rng()
+    q = red_c.indice[query]
+    ev = red_c.codificar(evidencia)
+    libres = [v for v in range(red_c.num_variables) if v not in ev]
+    tablas = tablas_gibbs(red_c, libres)
+
+    estado = [int(ev.get(v, rng.integers(red_c.cardinalidades[v])))
+              for v in range(red_c.num_variables)]
+    barridos_gibbs(tablas, estado, burn_in, q, rng)
+    conteos = barridos_gibbs(tablas, estado, num_muestras, q, rng)
+
+    frecuencias = np.zeros(red_c.cardinalidades[q])
+    for k, c in conteos.items():
+        frecuencias[k] = c
+    return red_c.decodificar_distribucion(q, frecuencias / frecuencias.sum())
@@ -1,4 +1,8 @@
-import numpy as np # Importado en el original, aunque no se usa en estas funciones
+import time
+
+import numpy as np
+
+from cadena_markov import CadenaMarkovDispersa
 
 # ============================================================================
 # 15. PROCESOS ESTACIONARIOS
@@ -30,45 +34,54 @@ def distribucion_estacionaria(matriz_transicion, epsilon=0.001, max_iter=1000):
     """
     Encuentra la distribución estacionaria de una cadena de Markov
     Args:
-        matriz_transicion: dict {(estado_i, estado_j): probabilidad}
+        matriz_transicion: dict {(estado_i, estado_j): probabilidad} o
+                           CadenaMarkovDispersa
         epsilon: tolerancia de convergencia
         max_iter: iteraciones máximas
     Returns:
-        distribución estacionaria
+        distribución estacionaria (dict con la entrada dict, array con la
+        cadena dispersa)
     """
-    # Obtener estados únicos
-    estados = set()
-    for (s1, s2) in matriz_transicion.keys():
-        estados.add(s1)
-        estados.add(s2)
-    estados = sorted(list(estados))
-    
+    if isinstance(matriz_transicion, CadenaMarkovDispersa):
+        return matriz_transicion.potencia(tolerancia=epsilon, max_iter=max_iter)[0]
+    if not matriz_transicion:
+        return {}
+
+    # π' = π · P en O(nnz) sobre la matriz CSR en lugar de O(n²) por iteración
+    cadena = CadenaMarkovDispersa.desde_dict(matriz_transicion)
+    pi, _ = cadena.potencia(tolerancia=epsilon, max_iter=max_iter)
+    return cadena.a_dict(pi)
+
+
+def distribucion_estacionaria_dict(matriz_transicion, epsilon=0.001, max_iter=1000):
+    """
+    Versión original sobre dicts (O(n²) por iteración), como referencia
+    """
+    estados = sorted({s for par in matriz_transicion for s in par})
     if not estados:
         return {}
-        
-    # Inicializar distribución uniforme
     n = len(estados)
     dist = {s: 1.0/n for s in estados}
-    
     for _ in range(max_iter):
-        nueva_dist = {}
-        
-        # Aplicar transición: π' = π · P
-        for s_j in estados:
-            nueva_dist[s_j] = sum(
-                dist[s_i] * matriz_transicion.get((s_i, s_j), 0)
-                for s_i in estados
-            )
-        
-        # Verificar convergencia
+        nueva_dist = {s_j: sum(dist[s_i] * matriz_transicion.get((s_i, s_j), 0) for s_i in estados)
+                      for s_j in estados}
         cambio = sum(abs(nueva_dist[s] - dist[s]) for s in estados)
         dist = nueva_dist
-        
         if cambio < epsilon:
             break
-    
     return dist
 
+
+def cadena_aleatoria(n, salidas=8, semilla=0):
+    """
+    Cadena dispersa de prueba tipo grafo web: cada estado enlaza con
+    'salidas' destinos al azar (probabilidad uniforme entre sus enlaces)
+    """
+    rng = np.random.default_rng(semilla)
+    origen = np.repeat(np.arange(n), salidas)
+    destino = rng.integers(0, n, size=n * salidas)
+    return CadenaMarkovDispersa(origen, destino, np.full(n * salidas, 1.0 / salidas), n)
+
 # ============================================================================
 # EJEMPLOS DE USO
 # ============================================================================
@@ -103,4 +116,62 @@ if __name__ == "__main__":
     print(f"   Distribución estacionaria del clima:")
     for estado, prob in dist_est.items():
         print(f"      {estado}: {prob:.3f}")
-    # (Esperado: sol=0.667, lluvia=0.333)
\ No newline at end of file
+    # (Esperado: sol=0.667, lluvia=0.333)
+
+    # Ejemplo 4: Cadena dispersa, diagnóstico estructural y métodos
+    print("\nCadena dispersa (CSR):")
+    cadena = CadenaMarkovDispersa.desde_dict(transiciones_clima)
+    for metodo in ('potencia', 'directo'):
+        info = cadena.distribucion_estacionaria(metodo=metodo)
+        print(f"   {metodo:9s}: {cadena.a_dict(np.round(info['pi'], 4))} "
+              f"(irreducible={info['irreducible']}, periodo={info['periodo']})")
+
+    ciclo = CadenaMarkovDispersa([0, 1, 2], [1, 2, 0], [1.0, 1.0, 1.0])
+    info = ciclo.distribucion_estacionaria()
+    print(f"   Ciclo de 3 estados: periodo={info['periodo']}, π={np.round(info['pi'], 4)}")
+    absorbente = CadenaMarkovDispersa([0, 0, 1, 2], [1, 2, 1, 2], [0.5, 0.5, 1.0, 1.0])
+    info = absorbente.distribucion_estacionaria()
+    print(f"   Dos estados absorbentes: irreducible={info['irreducible']}, "
+          f"clases cerradas={info['clases_cerradas']} (π no es única)")
+
+    # Ejemplo 5: Comparación con la versión sobre dicts
+    print("\nComparación (cadena aleatoria de 300 estados):")
+    chica = cadena_aleatoria(300, salidas=5, semilla=1)
+    como_dict = {}
+    for i, j, p in zip(chica.filas.tolist(), chica.indices.tolist(), chica.datos.tolist()):
+        como_dict[(i, j)] = como_dict.get((i, j), 0) + p
+    t0 = time.perf_counter()
+    ref = distribucion_estacionaria_dict(como_dict, epsilon=1e-8)
+    t_dict = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    rapida = distribucion_estacionaria(como_dict, epsilon=1e-8)
+    t_csr = time.perf_counter() - t0
+    dif = max(abs(ref[s] - rapida[s]) for s in ref)
+    print(f"   dict: {t_dict:.3f} s, CSR: {t_csr:.4f} s, diferencia máx = {dif:.1e}")
+
+    # Ejemplo 6: Aceleración de Aitken en una cadena que mezcla lento
+    print("\nAitken (nacimiento y muerte, 50 estados):")
+    n = 50
+    origen = np.repeat(np.arange(n), 3)
+    destino = np.clip(origen + np.tile([-1, 0, 1], n), 0, n - 1)
+    lenta = CadenaMarkovDispersa(origen, destino, np.tile([0.3, 0.35, 0.35], n), n)
+    exacta = lenta.directa()
+    for aitken in (None, 10):
+        pi, iteraciones = lenta.potencia(tolerancia=1e-10, max_iter=100000, aitken_cada=aitken)
+        print(f"   Aitken cada {str(aitken):4s}: {iteraciones:5d} iteraciones, "
+              f"error L1 = {np.abs(pi - exacta).sum():.1e}")
+
+    # Ejemplo 7: PageRank sobre 10^6 estados
+    print("\nPageRank (10^6 estados, 8·10^6 transiciones):")
+    web = cadena_aleatoria(1_000_000, salidas=8, semilla=2)
+    t0 = time.perf_counter()
+    pi, iteraciones = web.potencia(tolerancia=1e-10, amortiguamiento=0.85, aitken_cada=10)
+    print(f"   {iteraciones} iteraciones, {time.perf_counter() - t0:.2f} s, "
+          f"Σπ={pi.sum():.6f}, máx π={pi.max():.2e}")
+
+    grande = cadena_aleatoria(100_000, salidas=3, semilla=3)
+    t0 = time.perf_counter()
+    info = grande.distribucion_estacionaria(tolerancia=1e-8)
+    print(f"   Sin amortiguar (10^5 estados): irreducible={info['irreducible']}, "
+          f"periodo={info['periodo']}, clases cerradas={info['clases_cerradas']}, "
+          f"{info['iteraciones']} iteraciones, {time.perf_counter() - t0:.2f} s")
@@ -1,3 +1,10 @@
+import time
+
+import numpy as np
+
+from cadena_markov import PrediccionMarkov
+from hmm_matricial import matriz_transicion
+
 # ============================================================================
 # 16. HIPÓTESIS DE MARKOV: PROCESOS DE MARKOV
 # ============================================================================
@@ -32,14 +39,51 @@ class ProcesoMarkov:
         self.dist_actual = nueva_dist
         return nueva_dist
     
+    @property
+    def motor(self):
+        """PrediccionMarkov con P en forma matricial (se construye una vez)"""
+        if getattr(self, '_motor', None) is None:
+            self._motor = PrediccionMarkov(matriz_transicion(self.estados, self.transiciones))
+        return self._motor
+
+    def _vector(self, dist):
+        return np.array([dist.get(s, 0) for s in self.estados], dtype=float)
+
     def predecir(self, pasos):
-        """Predice distribución después de n pasos"""
-        dist_temporal = dict(self.dist_actual)
-        for _ in range(pasos):
-            dist_temporal = self.avanzar() # Re-usar avanzar
-            self.dist_actual = dist_temporal # Actualizar estado interno
+        """Predice distribución después de n pasos (π · P^n, P^n por cuadrados)"""
+        dist = self.motor.predecir(self._vector(self.dist_actual), pasos)
+        self.dist_actual = dict(zip(self.estados, dist.tolist())) # Actualizar estado interno
         return self.dist_actual
 
+    def predecir_horizontes(self, horizontes, distribuciones=None):
+        """
+        Predicción para muchos horizontes y muchas distribuciones iniciales
+        en una sola llamada (no modifica dist_actual)
+        Args:
+            horizontes: lista de enteros
+            distribuciones: array (m, n) en el orden de self.estados o lista
+                            de dicts (por defecto, la distribución actual)
+        Returns:
+            array (len(horizontes), m, n)
+        """
+        if distribuciones is None:
+            distribuciones = [self.dist_actual]
+        if len(distribuciones) and isinstance(distribuciones[0], dict):
+            distribuciones = np.array([self._vector(d) for d in distribuciones])
+        return self.motor.predecir(np.atleast_2d(distribuciones), list(horizontes))
+
+    def simular(self, num_cadenas, pasos, semilla=None):
+        """
+        Simula muchas cadenas independientes a la vez, con estados
+        iniciales muestreados de dist_actual
+        Returns:
+            array (num_cadenas, pasos + 1) de índices en self.estados
+        """
+        rng = np.random.default_rng(semilla)
+        pi = self._vector(self.dist_actual)
+        iniciales = rng.choice(len(self.estados), size=num_cadenas, p=pi / pi.sum())
+        return self.motor.simular(iniciales, pasos, rng)
+
 
 def verificar_propiedad_markov(secuencia, transiciones):
     """
@@ -98,4 +142,38 @@ if __name__ == "__main__":
     
     # Verificar propiedad
     secuencia_valida = ['sol', 'sol', 'lluvia', 'sol']
-    print(f"   ¿Secuencia {secuencia_valida} es Markoviana? {verificar_propiedad_markov(secuencia_valida, transiciones_clima)}")
\ No newline at end of file
+    print(f"   ¿Secuencia {secuencia_valida} es Markoviana? {verificar_propiedad_markov(secuencia_valida, transiciones_clima)}")
+
+    # Predicción matricial: muchos horizontes y distribuciones iniciales
+    print("\n   Predicción para 2000 distribuciones iniciales y 6 horizontes hasta 1000:")
+    n = 200
+    rng = np.random.default_rng(0)
+    P = rng.dirichlet(np.full(n, 0.1), size=n)
+    estados_g = list(range(n))
+    trans_g = {(i, j): P[i, j] for i in range(n) for j in range(n) if P[i, j] > 0}
+    grande = ProcesoMarkov(estados_g, trans_g, {0: 1.0})
+    iniciales = rng.dirichlet(np.ones(n), size=2000)
+    horizontes = [1, 7, 20, 100, 365, 1000]
+
+    t0 = time.perf_counter()
+    resultado = grande.predecir_horizontes(horizontes, iniciales)
+    print(f"      Motor matricial: {time.perf_counter() - t0:.2f} s, forma {resultado.shape}")
+
+    t0 = time.perf_counter()
+    referencia = ProcesoMarkov(estados_g, trans_g, dict(zip(estados_g, iniciales[0])))
+    for _ in range(20):
+        referencia.avanzar()
+    paso_dict = (time.perf_counter() - t0) / 20
+    print(f"      Bucle de dicts: {paso_dict * 1000:.1f} ms por paso -> "
+          f"~{paso_dict * 1000 * 2000:.0f} s estimados para 1000 pasos x 2000 distribuciones")
+    print(f"      Diferencia en h=20: {np.abs(resultado[2, 0] - grande._vector(referencia.dist_actual)).max():.1e}")
+
+    t0 = time.perf_counter()
+    P_1000 = grande.motor.potencia(1000)
+    print(f"      P^1000 por cuadrados: {(time.perf_counter() - t0) * 1000:.1f} ms, "
+          f"filas iguales: {np.allclose(P_1000, P_1000[0])}")
+
+    # Simulación de muchas cadenas
+    trayectorias = pm.simular(100_000, 50, semilla=1)
+    frac_sol = np.mean(trayectorias[:, -1] == estados_clima.index('sol'))
+    print(f"\n   100.000 cadenas de clima, 50 pasos: fracción en sol al final = {frac_sol:.3f}")
\ No newline at end of file
@@ -1,3 +1,10 @@
+import time
+
+import numpy as np
+
+from cadena_markov import PrediccionMarkov
+from hmm_matricial import HMMMatricial, matriz_transicion
+
 # ============================================================================
 # 17. FILTRADO, PREDICCIÓN, SUAVIZADO Y EXPLICACIÓN
 # ============================================================================
@@ -15,38 +22,10 @@ def filtrado(observaciones, transiciones, sensor, dist_inicial):
         (Nota: el original parece alinear obs[0] con t=1)
     """
     estados = list(dist_inicial.keys())
-    distribuciones = []
-    
-    # t = 0 (usando dist_inicial)
-    dist_t = dist_inicial
-    distribuciones.append(dist_t) # P(X_0)
-    
-    for obs in observaciones:
-        # 1. Predicción P(X_{t} | e_{1:t-1})
-        prediccion = {}
-        for s_nuevo in estados:
-            prob = sum(
-                dist_t.get(s, 0) * transiciones.get((s, s_nuevo), 0)
-                for s in estados
-            )
-            prediccion[s_nuevo] = prob
-        
-        # 2. Actualización con observación P(X_t | e_{1:t})
-        actualizacion = {}
-        for s in estados:
-            # P(e_t | X_t) * P(X_t | e_{1:t-1})
-            actualizacion[s] = sensor.get((obs, s), 0) * prediccion[s]
-        
-        # 3. Normalizar
-        total = sum(actualizacion.values())
-        if total > 0:
-            dist_t = {k: v/total for k, v in actualizacion.items()}
-        else:
-            dist_t = {k: 0 for k in actualizacion} # Evidencia imposible
-        
-        distribuciones.append(dist_t)
-    
-    return distribuciones # Retorna [P(X_0), P(X_1|e_1), ..., P(X_t|e_1:t)]
+    modelo = HMMMatricial.desde_dicts(estados, transiciones, sensor, dist_inicial)
+    # Predicción con A y actualización con la columna de B, normalizando en cada paso
+    alfa, _ = modelo.adelante(modelo.codificar(observaciones), transicion_inicial=True)
+    return [dist_inicial] + modelo.a_dicts(alfa) # Retorna [P(X_0), P(X_1|e_1), ..., P(X_t|e_1:t)]
 
 
 def prediccion(dist_actual, transiciones, pasos):
@@ -60,19 +39,9 @@ def prediccion(dist_actual, transiciones, pasos):
         distribución predicha P(X_{t+k})
     """
     estados = list(dist_actual.keys())
-    dist = dict(dist_actual)
-    
-    for _ in range(pasos):
-        nueva_dist = {}
-        for s_nuevo in estados:
-            prob = sum(
-                dist.get(s, 0) * transiciones.get((s, s_nuevo), 0)
-                for s in estados
-            )
-            nueva_dist[s_nuevo] = prob
-        dist = nueva_dist
-    
-    return dist
+    motor = PrediccionMarkov(matriz_transicion(estados, transiciones))
+    dist = motor.predecir(np.array([dist_actual[s] for s in estados], dtype=float), pasos)
+    return dict(zip(estados, dist.tolist()))
 
 
 def suavizado(observaciones, transiciones, sensor, dist_inicial):
@@ -84,58 +53,13 @@ def suavizado(observaciones, transiciones, sensor, dist_inicial):
         sensor: P(e_t|X_t)
         dist_inicial: P(X_0)
     Returns:
-        distribuciones suavizadas
+        distribuciones suavizadas [P(X_0|e_1:t), ..., P(X_t|e_1:t)]
     """
     estados = list(dist_inicial.keys())
-    T = len(observaciones)
-
-    # 1. Forward pass (filtrado)
-    # alphas = [P(X_0), P(X_1|e_1), ..., P(X_t|e_1:t)]
-    alphas = filtrado(observaciones, transiciones, sensor, dist_inicial)
-    
-    # 2. Backward pass
-    # b_k = P(e_{k+1:t} | X_k)
-    betas = [{s: 1.0 for s in estados}] # b_t = 1
-    
-    for t in range(T - 1, -1, -1):
-        obs_t_mas_1 = observaciones[t]
-        mensaje_b_t_mas_1 = betas[0] # P(e_{t+2:T} | X_{t+1})
-        
-        mensaje_b_t = {}
-        for s in estados: # s = X_t
-            prob = sum(
-                transiciones.get((s, s_nuevo), 0) * # P(X_{t+1}|X_t)
-                sensor.get((obs_t_mas_1, s_nuevo), 0) * # P(e_{t+1}|X_{t+1})
-                mensaje_b_t_mas_1.get(s_nuevo, 0)           # P(e_{t+2:T} | X_{t+1})
-                for s_nuevo in estados # s_nuevo = X_{t+1}
-            )
-            mensaje_b_t[s] = prob
-        
-        # (Opcional: Normalizar betas para evitar underflow)
-        total_b = sum(mensaje_b_t.values())
-        if total_b > 0:
-            mensaje_b_t = {k: v/total_b for k, v in mensaje_b_t.items()}
-            
-        betas.insert(0, mensaje_b_t)
-    
-    # 3. Combinar forward y backward
-    # P(X_k | e_{1:t}) ∝ P(X_k | e_{1:k}) * P(e_{k+1:t} | X_k)
-    # P(X_k | e_{1:t}) ∝ alpha[k] * beta[k+1]
-    
-    # (El índice de alphas está desplazado por P(X_0))
-    suavizadas = []
-    for k in range(T + 1):
-        combinada = {}
-        for s in estados:
-            combinada[s] = alphas[k].get(s, 0) * betas[k].get(s, 1.0)
-        
-        # Normalizar
-        total = sum(combinada.values())
-        if total > 0:
-            combinada = {k: v/total for k, v in combinada.items()}
-        suavizadas.append(combinada)
-    
-    return suavizadas
+    modelo = HMMMatricial.desde_dicts(estados, transiciones, sensor, dist_inicial)
+    # P(X_k | e_{1:t}) ∝ P(X_k | e_{1:k}) * P(e_{k+1:t} | X_k), con ambas pasadas escaladas
+    gamma, _ = modelo.suavizar(modelo.codificar(observaciones), transicion_inicial=True)
+    return modelo.a_dicts(gamma)
 
 # ============================================================================
 # EJEMPLOS DE USO
@@ -184,4 +108,15 @@ if __name__ == "__main__":
     # dist_suavizadas[2] = P(X_2 | e_1:2)
     print(f"   P(X_0 | 'Paraguas', 'Paraguas'): {dist_suavizadas[0]}")
     print(f"   P(X_1 | 'Paraguas', 'Paraguas'): {dist_suavizadas[1]}")
-    print(f"   P(X_2 | 'Paraguas', 'Paraguas'): {dist_suavizadas[2]}")
\ No newline at end of file
+    print(f"   P(X_2 | 'Paraguas', 'Paraguas'): {dist_suavizadas[2]}")
+
+    # 4. Secuencia larga: las pasadas escaladas no se anulan por underflow
+    print("\nSecuencia larga (T = 10^5):")
+    modelo = HMMMatricial.desde_dicts(estados, trans, sensor, inicial)
+    rng = np.random.default_rng(0)
+    obs_larga = rng.choice(observaciones, size=100_000, p=[0.6, 0.4]).tolist()
+    t0 = time.perf_counter()
+    suavizadas = suavizado(obs_larga, trans, sensor, inicial)
+    _, log_p = modelo.suavizar(modelo.codificar(obs_larga), transicion_inicial=True)
+    print(f"   {time.perf_counter() - t0:.2f} s, log P(e_1:T) = {log_p:.1f}")
+    print(f"   P(X_50000 | e_1:T): {suavizadas[50_000]}")
\ No newline at end of file
@@ -1,8 +1,14 @@
+import time
+
+import numpy as np
+
+from hmm_matricial import HMMMatricial
+
 # ============================================================================
 # 18. ALGORITMO HACIA DELANTE-ATRÁS
 # ============================================================================
 
-def forward_backward(observaciones, estados, transiciones, emisiones, dist_inicial):
+def forward_backward(observaciones, estados, transiciones, emisiones, dist_inicial, escalado=False):
     """
     Algoritmo completo Forward-Backward para HMM
     Args:
@@ -11,66 +17,31 @@ def forward_backward(observaciones, estados, transiciones, emisiones, dist_inici
         transiciones: P(s'|s) dict {(s, s'): prob}
         emisiones: P(o|s) dict {(obs, estado): prob}
         dist_inicial: P(s_0) dict {estado: prob}
+        escalado: si es True, alphas son P(X_t | e_{1:t}) y betas las
+                  versiones escaladas (no se anulan en secuencias largas)
     Returns:
         (alphas, betas, gammas) - probabilidades forward, backward y suavizadas
     """
-    T = len(observaciones)
-    
-    # --- Forward (alpha) ---
-    # alpha_t(i) = P(e_{1:t}, X_t = i)
-    alphas = []
-    
-    # t = 0 (usando obs[0])
-    alpha = {}
-    for s in estados:
-        alpha[s] = dist_inicial.get(s, 0) * emisiones.get((observaciones[0], s), 0)
-    alphas.append(alpha)
-    
-    # t = 1 a T-1
-    for t in range(1, T):
-        alpha_t = {}
-        for s_nuevo in estados:
-            prob = sum(
-                alphas[-1].get(s, 0) * transiciones.get((s, s_nuevo), 0)
-                for s in estados
-            ) * emisiones.get((observaciones[t], s_nuevo), 0)
-            alpha_t[s_nuevo] = prob
-        alphas.append(alpha_t)
-    
-    # --- Backward (beta) ---
-    # beta_t(i) = P(e_{t+1:T} | X_t = i)
-    betas = [{s: 1.0 for s in estados}] # t = T-1
-    
-    for t in range(T - 2, -1, -1):
-        beta_t = {}
-        obs_t_mas_1 = observaciones[t+1]
-        beta_t_mas_1 = betas[0] # beta de t+1
-        
-        for s in estados: # s = X_t
-            prob = sum(
-                transiciones.get((s, s_nuevo), 0) * # P(X_{t+1}|X_t)
-                emisiones.get((obs_t_mas_1, s_nuevo), 0) * # P(e_{t+1}|X_{t+1})
-                beta_t_mas_1.get(s_nuevo, 0)              # P(e_{t+2:T}|X_{t+1})
-                for s_nuevo in estados # s_nuevo = X_{t+1}
-            )
-            beta_t[s] = prob
-        betas.insert(0, beta_t)
-    
-    # --- Gamma (suavizado) ---
-    # gamma_t(i) = P(X_t = i | e_{1:T})
-    gammas = []
-    for t in range(T):
-        gamma = {}
-        for s in estados:
-            gamma[s] = alphas[t].get(s, 0) * betas[t].get(s, 0)
-        
-        # Normalizar
-        suma = sum(gamma.values())
-        if suma > 0:
-            gamma = {k: v/suma for k, v in gamma.items()}
-        gammas.append(gamma)
-    
-    return alphas, betas, gammas
+    modelo = HMMMatricial.desde_dicts(estados, transiciones, emisiones, dist_inicial)
+    obs = modelo.codificar(observaciones)
+
+    # Ambas pasadas se calculan escaladas; alfa[t]·beta[t] ya es gamma[t]
+    alfa, log_c = modelo.adelante(obs)
+    beta = modelo.atras(obs, log_c)
+    gamma = alfa * beta
+    total = gamma.sum(axis=1, keepdims=True)
+    np.divide(gamma, total, out=gamma, where=total > 0)
+
+    if not escalado:
+        # alpha_t(i) = P(e_{1:t}, X_t = i) se recupera con el producto de las
+        # escalas hacia delante; beta_t(i) = P(e_{t+1:T} | X_t = i) usa sus
+        # propias escalas, así sigue siendo finita (y β_{T-1} = 1) aunque
+        # alguna observación tenga probabilidad cero
+        alfa = alfa * np.exp(np.cumsum(log_c))[:, None]
+        beta, log_d = modelo.atras_normalizado(obs)
+        beta = beta * np.exp(np.cumsum(log_d[::-1])[::-1])[:, None]
+
+    return modelo.a_dicts(alfa), modelo.a_dicts(beta), modelo.a_dicts(gamma)
 
 # ============================================================================
 # EJEMPLOS DE USO
@@ -109,4 +80,14 @@ if __name__ == "__main__":
         
     print("\n--- Gammas (Suavizado) P(X_t | e_{1:T}) ---")
     for t, gamma in enumerate(gammas):
-        print(f"   t={t}: {gamma}")
\ No newline at end of file
+        print(f"   t={t}: {gamma}")
+
+    # Secuencia larga: los alphas sin escalar se anulan, las gammas no
+    print("\n--- Secuencia larga (T = 10^5) ---")
+    rng = np.random.default_rng(0)
+    obs_larga = rng.choice(observaciones_posibles, size=100_000).tolist()
+    t0 = time.perf_counter()
+    alphas, betas, gammas = forward_backward(obs_larga, estados, trans, emis, inicial, escalado=True)
+    print(f"   {time.perf_counter() - t0:.2f} s")
+    print(f"   alpha escalado t=99999: {alphas[-1]}")
+    print(f"   gamma t=50000: {gammas[50_000]}")
\ No newline at end of file
@@ -1,4 +1,9 @@
 import random
+import time
+
+import numpy as np
+
+from hmm_matricial import HMMMatricial, DecodificadorViterbi
 
 # ============================================================================
 # 19. MODELOS OCULTOS DE MARKOV (HMM)
@@ -23,62 +28,43 @@ class HMM:
         self.emisiones = emisiones
         self.inicial = inicial
     
-    def viterbi(self, secuencia_obs):
+    @property
+    def compilado(self):
+        """HMMMatricial equivalente (se construye una vez y se guarda)"""
+        if getattr(self, '_compilado', None) is None:
+            self._compilado = HMMMatricial.desde_dicts(self.estados, self.transiciones,
+                                                       self.emisiones, self.inicial,
+                                                       self.observaciones)
+        return self._compilado
+
+    def viterbi(self, secuencia_obs, haz=None):
         """
         Algoritmo de Viterbi: encuentra la secuencia más probable de estados
+        (log-probabilidades y punteros al mejor predecesor, O(T·S) memoria)
         Args:
             secuencia_obs: lista de observaciones
+            haz: si se da, solo sobreviven los 'haz' mejores estados por paso
+                 (aproximado, O(T·haz·S) tiempo)
         Returns:
             secuencia más probable de estados
         """
-        T = len(secuencia_obs)
-        
-        # Inicializar
-        viterbi_prob = [{} for _ in range(T)]
-        camino = [{} for _ in range(T)]
-        
-        # t = 0
-        obs_0 = secuencia_obs[0]
-        for s in self.estados:
-            viterbi_prob[0][s] = (self.inicial.get(s, 0) * self.emisiones.get((obs_0, s), 0))
-            camino[0][s] = [s] # Camino termina en s
-        
-        # t > 0
-        for t in range(1, T):
-            obs_t = secuencia_obs[t]
-            for s_nuevo in self.estados:
-                # Encontrar estado previo con máxima probabilidad
-                max_prob = -1
-                mejor_estado = None
-                
-                emision_prob = self.emisiones.get((obs_t, s_nuevo), 0)
-                
-                for s_prev in self.estados:
-                    prob = (viterbi_prob[t-1].get(s_prev, 0) * self.transiciones.get((s_prev, s_nuevo), 0))
-                    
-                    if prob > max_prob:
-                        max_prob = prob
-                        mejor_estado = s_prev
-                
-                viterbi_prob[t][s_nuevo] = max_prob * emision_prob
-                
-                if mejor_estado:
-                    camino[t][s_nuevo] = camino[t-1][mejor_estado] + [s_nuevo]
-                else:
-                    camino[t][s_nuevo] = [s_nuevo]
-        
-        # Encontrar el mejor camino final
-        max_prob_final = -1
-        mejor_estado_final = None
-        for s, prob in viterbi_prob[T-1].items():
-            if prob > max_prob_final:
-                max_prob_final = prob
-                mejor_estado_final = s
-        
-        if mejor_estado_final is None:
-            return [] # No se encontró camino
-            
-        return camino[T-1][mejor_estado_final]
+        modelo = self.compilado
+        obs = modelo.codificar(secuencia_obs)
+        if haz is None:
+            camino, _ = modelo.viterbi(obs)
+        else:
+            camino, _ = DecodificadorViterbi(modelo, haz).decodificar(obs)
+        return modelo.decodificar(camino)
+
+    def viterbi_en_linea(self, flujo_obs, haz=None):
+        """
+        Viterbi sobre un flujo no acotado: genera cada estado en cuanto
+        todos los caminos supervivientes coinciden en él (traceback parcial)
+        Args:
+            flujo_obs: iterable de observaciones
+            haz: poda opcional (ver viterbi)
+        """
+        return DecodificadorViterbi(self.compilado, haz).flujo(flujo_obs)
     
     def generar_secuencia(self, longitud):
         """
@@ -160,4 +146,38 @@ if __name__ == "__main__":
     estados_inferidos = hmm.viterbi(obs_test)
     print(f"   \n   Observaciones: {obs_test}")
     print(f"   Estados más probables (Viterbi): {estados_inferidos}")
-    # (Esperado: ['Sano', 'Sano', 'Fiebre'])
\ No newline at end of file
+    # (Esperado: ['Sano', 'Sano', 'Fiebre'])
+
+    # Secuencia larga: las probabilidades del original se anulan por underflow
+    seq_estados, seq_obs = hmm.generar_secuencia(100_000)
+    t0 = time.perf_counter()
+    estados_inferidos = hmm.viterbi(seq_obs)
+    aciertos = np.mean([a == b for a, b in zip(estados_inferidos, seq_estados)])
+    print(f"   \n   Viterbi con T = 10^5: {time.perf_counter() - t0:.2f} s, "
+          f"coincide con los estados reales en {aciertos:.1%}")
+
+    # Flujo: se decide el prefijo a medida que llegan observaciones
+    decodificador = DecodificadorViterbi(hmm.compilado)
+    t0 = time.perf_counter()
+    en_linea = list(decodificador.flujo(iter(seq_obs)))
+    print(f"   Viterbi en línea: {time.perf_counter() - t0:.2f} s, igual al exacto: "
+          f"{en_linea == estados_inferidos}, ventana máxima = {decodificador.ventana_maxima} pasos")
+
+    # Haz sobre un modelo con muchos estados
+    S, O = 200, 50
+    rng = np.random.default_rng(0)
+    A = rng.dirichlet(np.full(S, 0.05), size=S)
+    B = rng.dirichlet(np.full(O, 0.1), size=S)
+    grande = HMM(list(range(S)), list(range(O)),
+                 {(i, j): A[i, j] for i in range(S) for j in range(S)},
+                 {(o, i): B[i, o] for i in range(S) for o in range(O)},
+                 {i: 1.0 / S for i in range(S)})
+    _, seq_obs = grande.generar_secuencia(2000)
+    obs = grande.compilado.codificar(seq_obs)
+    exacto, log_exacto = grande.compilado.viterbi(obs)
+    for haz in (5, 20):
+        t0 = time.perf_counter()
+        aproximado, log_p = DecodificadorViterbi(grande.compilado, haz).decodificar(obs)
+        iguales = np.mean(np.array(aproximado) == np.array(exacto))
+        print(f"   Haz {haz:2d} (S = {S}): {time.perf_counter() - t0:.2f} s, "
+              f"{iguales:.1%} de estados iguales al exacto, Δlog P = {log_exacto - log_p:.2f}")
\ No newline at end of file
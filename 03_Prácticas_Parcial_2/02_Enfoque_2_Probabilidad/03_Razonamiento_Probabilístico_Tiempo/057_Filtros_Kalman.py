@@ -1,9 +1,36 @@
+import time
+
 import numpy as np
 
 # ============================================================================
 # 20. FILTROS DE KALMAN
 # ============================================================================
 
+def resolver_triangular(L, b, inferior=True):
+    """
+    Sustitución hacia delante (L inferior) o hacia atrás (L superior) para
+    pilas de sistemas: L (..., m, m), b (..., m, k). El bucle es sobre m
+    (dimensión pequeña); cada fila se resuelve para todo el lote a la vez.
+    """
+    m = L.shape[-1]
+    x = np.zeros(np.broadcast_shapes(L.shape[:-2], b.shape[:-2]) + b.shape[-2:])
+    filas = range(m) if inferior else range(m - 1, -1, -1)
+    for i in filas:
+        resuelto = slice(0, i) if inferior else slice(i + 1, m)
+        suma = L[..., i:i + 1, resuelto] @ x[..., resuelto, :]
+        x[..., i, :] = (b[..., i, :] - suma[..., 0, :]) / L[..., i, i, None]
+    return x
+
+
+def resolver_cholesky(A, b):
+    """
+    A^{-1} b para A simétrica definida positiva (apilada) con A = L L':
+    dos sustituciones triangulares en lugar de invertir A
+    """
+    L = np.linalg.cholesky(A)
+    return resolver_triangular(np.swapaxes(L, -1, -2), resolver_triangular(L, b), inferior=False)
+
+
 class FiltroKalman:
     """
     Filtro de Kalman para sistemas lineales con ruido gaussiano
@@ -48,8 +75,8 @@ class FiltroKalman:
         # Covarianza de la innovación: S = H * P_k * H' + R
         S = self.H @ self.P @ self.H.T + self.R
         
-        # Ganancia de Kalman: K = P_k * H' * S^{-1}
-        K = self.P @ self.H.T @ np.linalg.inv(S)
+        # Ganancia de Kalman: K = P_k * H' * S^{-1} (K' = S^{-1} H P, con Cholesky)
+        K = resolver_cholesky(S, self.H @ self.P).T
         
         # Actualizar estado: x_k = x_k + K * y
         self.x = self.x + K @ y
@@ -60,6 +87,223 @@ class FiltroKalman:
         
         return self.x, self.P
 
+# ============================================================================
+# BANCO DE FILTROS DE KALMAN
+# ============================================================================
+
+class BancoKalman:
+    """
+    Muchos filtros de Kalman independientes actualizados a la vez: estados
+    (B, n) y covarianzas (B, n, n). F, H, Q y R pueden ser compartidas
+    (n, n) o una por pista (B, n, n).
+    Formas:
+        'estandar': covarianza P con actualización de Joseph
+        'raiz': factor de Cholesky S (P = S S'), propagado con QR; P nunca
+                pierde la simetría ni la definición positiva
+        'informacion': Y = P^{-1} e y = Y x; la actualización es una suma y
+                       admite Y = 0 (sin información previa). predecir y
+                       actualizar devuelven (y, Y) sin resolver; x y P se
+                       obtienen de las propiedades cuando Y es invertible
+    """
+    def __init__(self, F, H, Q, R, x0, P0, forma='estandar'):
+        """
+        Args:
+            F, H, Q, R: matrices del modelo (compartidas o apiladas)
+            x0: estados iniciales (B, n)
+            P0: covarianzas iniciales (B, n, n) o una sola (n, n); con forma
+                'informacion' se interpreta como la matriz de información Y0
+            forma: 'estandar', 'raiz' o 'informacion'
+        """
+        if forma not in ('estandar', 'raiz', 'informacion'):
+            raise ValueError(f"Forma desconocida: {forma}")
+        self.forma = forma
+        self.F = np.asarray(F, dtype=float)
+        self.H = np.asarray(H, dtype=float)
+        self.Q = np.asarray(Q, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        x0 = np.asarray(x0, dtype=float)
+        self.B, self.n = x0.shape
+        P0 = np.broadcast_to(np.asarray(P0, dtype=float), (self.B, self.n, self.n)).copy()
+        self.Ft = np.swapaxes(self.F, -1, -2)
+        self.Ht = np.swapaxes(self.H, -1, -2)
+
+        if forma == 'estandar':
+            self._x, self._P = x0, P0
+        elif forma == 'raiz':
+            self._x, self._S = x0, np.linalg.cholesky(P0)
+            self.raiz_Q = np.linalg.cholesky(self.Q)
+            self.raiz_R = np.linalg.cholesky(self.R)
+        else:
+            # Constantes del modelo: se factorizan una vez, no en cada paso
+            self.Y, self.y = P0, (P0 @ x0[..., None])[..., 0]
+            self.F_inv = np.linalg.solve(self.F, np.eye(self.n))
+            self.Q_inv = resolver_cholesky(self.Q, np.eye(self.n))
+            HtRinv = np.swapaxes(resolver_cholesky(self.R, self.H), -1, -2)  # H' R^{-1}
+            self.HtRinv, self.HtRinvH = HtRinv, HtRinv @ self.H
+
+    # ------------------------------------------------------------------------
+    # Vistas del estado
+    # ------------------------------------------------------------------------
+
+    def _estado(self):
+        """Par devuelto por predecir/actualizar: (x, P), o (y, Y) en forma de información"""
+        if self.forma == 'informacion':
+            return self.y, self.Y
+        return self.x, self.P
+
+    @staticmethod
+    def _momentos(y, Y):
+        """(y, Y) -> (x, P) con Y definida positiva (apiladas)"""
+        x = resolver_cholesky(Y, y[..., None])[..., 0]
+        return x, resolver_cholesky(Y, np.broadcast_to(np.eye(Y.shape[-1]), Y.shape))
+
+    @property
+    def x(self):
+        if self.forma == 'informacion':
+            return resolver_cholesky(self.Y, self.y[..., None])[..., 0]
+        return self._x
+
+    @property
+    def P(self):
+        if self.forma == 'raiz':
+            return self._S @ np.swapaxes(self._S, -1, -2)
+        if self.forma == 'informacion':
+            return resolver_cholesky(self.Y, np.broadcast_to(np.eye(self.n), self.Y.shape))
+        return self._P
+
+    # ------------------------------------------------------------------------
+    # Predicción y actualización
+    # ------------------------------------------------------------------------
+
+    def predecir(self):
+        """
+        x = F x, P = F P F' + Q para todas las pistas
+        Returns:
+            (x, P), o (y, Y) en forma de información
+        """
+        if self.forma == 'estandar':
+            self._x = (self.F @ self._x[..., None])[..., 0]
+            self._P = self.F @ self._P @ self.Ft + self.Q
+        elif self.forma == 'raiz':
+            self._x = (self.F @ self._x[..., None])[..., 0]
+            # [F S, raiz(Q)]' = Q_r R  =>  F P F' + Q = R' R
+            bloque = np.concatenate([np.swapaxes(self.F @ self._S, -1, -2),
+                                     np.broadcast_to(np.swapaxes(self.raiz_Q, -1, -2),
+                                                     (self.B, self.n, self.n))], axis=-2)
+            self._S = np.swapaxes(np.linalg.qr(bloque, mode='r'), -1, -2)
+        else:
+            # M = F^{-T} Y F^{-1};  J = M (M + Q^{-1})^{-1}
+            # Y' = (I - J) M,  y' = (I - J) F^{-T} y
+            F_inv_t = np.swapaxes(self.F_inv, -1, -2)
+            M = F_inv_t @ self.Y @ self.F_inv
+            J = np.swapaxes(resolver_cholesky(M + self.Q_inv, M), -1, -2)
+            I_J = np.eye(self.n) - J
+            self.Y = I_J @ M
+            self.Y = 0.5 * (self.Y + np.swapaxes(self.Y, -1, -2))
+            self.y = (I_J @ F_inv_t @ self.y[..., None])[..., 0]
+        return self._estado()
+
+    def actualizar(self, z, observados=None):
+        """
+        Args:
+            z: mediciones (B, m)
+            observados: máscara (B,) de pistas con medición en este paso
+                        (las demás conservan la predicción)
+        Returns:
+            (x, P), o (y, Y) en forma de información
+        """
+        z = np.asarray(z, dtype=float)
+        previo = self._guardar() if observados is not None else None
+
+        if self.forma == 'estandar':
+            y = z - (self.H @ self._x[..., None])[..., 0]
+            PHt = self._P @ self.Ht
+            S = self.H @ PHt + self.R
+            K = np.swapaxes(resolver_cholesky(S, np.swapaxes(PHt, -1, -2)), -1, -2)
+            self._x = self._x + (K @ y[..., None])[..., 0]
+            # Joseph: (I - KH) P (I - KH)' + K R K' (simétrica y definida positiva)
+            I_KH = np.eye(self.n) - K @ self.H
+            self._P = I_KH @ self._P @ np.swapaxes(I_KH, -1, -2) + K @ self.R @ np.swapaxes(K, -1, -2)
+        elif self.forma == 'raiz':
+            # Pre-arreglo [[raiz(R), H S], [0, S]] -> triangular inferior
+            # [[raiz(S_innov), 0], [K̄, S']] con K = K̄ raiz(S_innov)^{-1}
+            m = self.H.shape[-2]
+            arriba = np.concatenate([np.broadcast_to(self.raiz_R, (self.B, m, m)),
+                                     self.H @ self._S], axis=-1)
+            abajo = np.concatenate([np.zeros((self.B, self.n, m)), self._S], axis=-1)
+            pre = np.concatenate([arriba, abajo], axis=-2)
+            post = np.swapaxes(np.linalg.qr(np.swapaxes(pre, -1, -2), mode='r'), -1, -2)
+            raiz_innov, K_barra = post[:, :m, :m], post[:, m:, :m]
+            y = z - (self.H @ self._x[..., None])[..., 0]
+            self._x = self._x + (K_barra @ resolver_triangular(raiz_innov, y[..., None]))[..., 0]
+            self._S = post[:, m:, m:]
+        else:
+            self.Y = self.Y + self.HtRinvH
+            self.y = self.y + (self.HtRinv @ z[..., None])[..., 0]
+
+        if previo is not None:
+            self._restaurar(previo, ~np.asarray(observados, dtype=bool))
+        return self._estado()
+
+    def _guardar(self):
+        if self.forma == 'estandar':
+            return self._x.copy(), self._P.copy()
+        if self.forma == 'raiz':
+            return self._x.copy(), self._S.copy()
+        return self.y.copy(), self.Y.copy()
+
+    def _restaurar(self, previo, pistas):
+        vector, matriz = previo
+        if self.forma == 'estandar':
+            self._x[pistas], self._P[pistas] = vector[pistas], matriz[pistas]
+        elif self.forma == 'raiz':
+            self._x[pistas], self._S[pistas] = vector[pistas], matriz[pistas]
+        else:
+            self.y[pistas], self.Y[pistas] = vector[pistas], matriz[pistas]
+
+    # ------------------------------------------------------------------------
+    # Secuencias completas y suavizado RTS
+    # ------------------------------------------------------------------------
+
+    def filtrar(self, Z, observados=None):
+        """
+        Args:
+            Z: mediciones (T, B, m)
+            observados: máscara opcional (T, B)
+        Returns:
+            (x_filtrados, P_filtrados, x_predichos, P_predichos), cada uno
+            con un primer eje T ((y, Y) en lugar de (x, P) en forma de
+            información)
+        """
+        historia = ([], [], [], [])
+        for t, z in enumerate(Z):
+            xp, Pp = self.predecir()
+            historia[2].append(xp.copy())
+            historia[3].append(Pp.copy())
+            xf, Pf = self.actualizar(z, None if observados is None else observados[t])
+            historia[0].append(xf.copy())
+            historia[1].append(Pf.copy())
+        return tuple(np.array(h) for h in historia)
+
+    def suavizar_rts(self, Z, observados=None):
+        """
+        Suavizador de Rauch-Tung-Striebel: filtra hacia delante y corrige
+        hacia atrás con C_t = P_t F' (P_{t+1|t})^{-1} (resuelto con Cholesky).
+        En forma de información Y debe ser invertible en todos los pasos.
+        Returns:
+            (x_suavizados (T, B, n), P_suavizados (T, B, n, n))
+        """
+        xf, Pf, xp, Pp = self.filtrar(Z, observados)
+        if self.forma == 'informacion':
+            (xf, Pf), (xp, Pp) = self._momentos(xf, Pf), self._momentos(xp, Pp)
+        xs, Ps = xf.copy(), Pf.copy()
+        for t in range(len(Z) - 2, -1, -1):
+            # C' = (P_{t+1|t})^{-1} F P_t
+            C = np.swapaxes(resolver_cholesky(Pp[t + 1], self.F @ Pf[t]), -1, -2)
+            xs[t] = xf[t] + (C @ (xs[t + 1] - xp[t + 1])[..., None])[..., 0]
+            Ps[t] = Pf[t] + C @ (Ps[t + 1] - Pp[t + 1]) @ np.swapaxes(C, -1, -2)
+        return xs, Ps
+
 # ============================================================================
 # EJEMPLOS DE USO
 # ============================================================================
@@ -94,4 +338,56 @@ if __name__ == "__main__":
     for i, z in enumerate(mediciones):
         kf.predecir()
         estado, cov = kf.actualizar([z])
-        print(f"   Tiempo {i+1}: medición={z:.2f}, estimado_pos={estado[0]:.2f}, estimado_vel={estado[1]:.2f}")
\ No newline at end of file
+        print(f"   Tiempo {i+1}: medición={z:.2f}, estimado_pos={estado[0]:.2f}, estimado_vel={estado[1]:.2f}")
+
+    # Banco de filtros: 50k pistas 2D con velocidad constante
+    print("\nBanco de filtros (50.000 pistas, estado [x, y, vx, vy]):")
+    B = 50_000
+    F2 = np.block([[np.eye(2), dt * np.eye(2)], [np.zeros((2, 2)), np.eye(2)]])
+    H2 = np.hstack([np.eye(2), np.zeros((2, 2))])
+    Q2, R2 = 0.01 * np.eye(4), 0.5 * np.eye(2)
+    rng = np.random.default_rng(0)
+    verdad = np.hstack([rng.uniform(0, 100, (B, 2)), rng.normal(0, 1, (B, 2))])
+    cuadros = []
+    for _ in range(20):
+        verdad = verdad @ F2.T
+        cuadros.append(verdad[:, :2] + rng.normal(0, np.sqrt(0.5), (B, 2)))
+    Z = np.array(cuadros)
+    visibles = rng.random((len(Z), B)) > 0.1  # 10% de las pistas sin medición por cuadro
+
+    t0 = time.perf_counter()
+    for b in range(200):
+        kf = FiltroKalman(F2, H2, Q2, R2, np.zeros(4), 10 * np.eye(4))
+        kf.predecir()
+        kf.actualizar(Z[0, b])
+    print(f"   FiltroKalman uno a uno: {(time.perf_counter() - t0) / 200 * B * 1000:.0f} ms/cuadro (estimado)")
+
+    for forma in ('estandar', 'raiz', 'informacion'):
+        P0_banco = 0.1 * np.eye(4) if forma == 'informacion' else 10 * np.eye(4)
+        banco = BancoKalman(F2, H2, Q2, R2, np.zeros((B, 4)), P0_banco, forma=forma)
+        t0 = time.perf_counter()
+        for z, visible in zip(Z, visibles):
+            banco.predecir()
+            banco.actualizar(z, visible)
+        por_cuadro = (time.perf_counter() - t0) / len(Z) * 1000
+        error = np.sqrt(np.mean((banco.x[:, :2] - verdad[:, :2]) ** 2))
+        print(f"   BancoKalman '{forma}': {por_cuadro:.0f} ms/cuadro, RMSE posición = {error:.3f}")
+
+    # Forma de información sin información previa (Y0 = 0, P0 infinita)
+    banco = BancoKalman(F2, H2, Q2, R2, np.zeros((B, 4)), np.zeros((4, 4)), forma='informacion')
+    for z, visible in zip(Z, visibles):
+        banco.predecir()
+        banco.actualizar(z, visible)
+    error = np.sqrt(np.mean((banco.x[:, :2] - verdad[:, :2]) ** 2))
+    print(f"   BancoKalman 'informacion' con Y0 = 0: RMSE posición = {error:.3f}")
+
+    # Suavizado RTS sobre la secuencia completa (1.000 pistas)
+    banco = BancoKalman(F2, H2, Q2, R2, np.zeros((1000, 4)), 1e4 * np.eye(4))
+    xf, _, _, _ = banco.filtrar(Z[:, :1000])
+    banco = BancoKalman(F2, H2, Q2, R2, np.zeros((1000, 4)), 1e4 * np.eye(4))
+    xs, _ = banco.suavizar_rts(Z[:, :1000])
+    # Posición real en el primer cuadro (la verdad no tiene ruido de proceso)
+    primero = np.linalg.solve(np.linalg.matrix_power(F2, len(Z) - 1), verdad[:1000].T).T[:, :2]
+    print(f"   RTS (1.000 pistas): RMSE en el primer cuadro filtrado = "
+          f"{np.sqrt(np.mean((xf[0, :, :2] - primero) ** 2)):.3f}, suavizado = "
+          f"{np.sqrt(np.mean((xs[0, :, :2] - primero) ** 2)):.3f}")
@@ -1,10 +1,135 @@
 import random
 import math
+import time
+
+import numpy as np
 
 # ============================================================================
 # 21. RED BAYESIANA DINÁMICA: FILTRADO DE PARTÍCULAS
 # ============================================================================
 
+def remuestreo_sistematico(pesos, n, rng):
+    """
+    Un solo uniforme U y posiciones (U + j) / n: la partícula i se copia
+    floor(n·C_i - U) - floor(n·C_{i-1} - U) veces, O(N) sin búsquedas
+    Returns:
+        índices de las partículas elegidas (n,)
+    """
+    acumulada = np.cumsum(pesos)
+    acumulada *= n / acumulada[-1]
+    acumulada[-1] = n  # Sin error de redondeo: se eligen exactamente n
+    u = rng.random()
+    tope = np.floor(acumulada - u)
+    copias = np.diff(tope, prepend=np.floor(-u)).astype(np.int64)
+    return np.repeat(np.arange(len(pesos)), copias)
+
+
+def remuestreo_estratificado(pesos, n, rng):
+    """
+    Un uniforme independiente por estrato [j/n, (j+1)/n): posiciones ya
+    ordenadas, una sola búsqueda vectorizada sobre la acumulada
+    """
+    acumulada = np.cumsum(pesos)
+    acumulada /= acumulada[-1]
+    posiciones = (np.arange(n) + rng.random(n)) / n
+    return np.minimum(np.searchsorted(acumulada, posiciones, side='right'), len(pesos) - 1)
+
+
+def remuestreo_multinomial(pesos, n, rng):
+    """n extracciones independientes (el método del original, más varianza)"""
+    return rng.choice(len(pesos), size=n, p=pesos / pesos.sum())
+
+
+REMUESTREOS = {
+    'sistematico': remuestreo_sistematico,
+    'estratificado': remuestreo_estratificado,
+    'multinomial': remuestreo_multinomial,
+}
+
+
+class FiltroParticulas:
+    """
+    Filtro de partículas con los estados en un array (N,) o (N, d) y los
+    pesos en un array (N,). Los modelos reciben todas las partículas a la
+    vez:
+        inicial(n, rng) -> estados
+        transicion(estados, rng) -> estados
+        verosimilitud(obs, estados) -> array (N,) con P(obs | estado)
+    """
+    def __init__(self, transicion, verosimilitud, inicial, num_particulas=1000,
+                 remuestreo='sistematico', umbral_ess=0.5, semilla=None):
+        """
+        Args:
+            remuestreo: 'sistematico', 'estratificado' o 'multinomial'
+            umbral_ess: se remuestrea cuando ESS < umbral_ess · N
+            semilla: semilla del generador de NumPy
+        """
+        if remuestreo not in REMUESTREOS:
+            raise ValueError(f"Remuestreo desconocido: {remuestreo}")
+        self.transicion = transicion
+        self.verosimilitud = verosimilitud
+        self.n = num_particulas
+        self.remuestrear = REMUESTREOS[remuestreo]
+        self.umbral_ess = umbral_ess
+        self.rng = np.random.default_rng(semilla)
+        self.estados = inicial(num_particulas, self.rng)
+        self.pesos = np.full(num_particulas, 1.0 / num_particulas)
+
+    def resumen(self):
+        """
+        Tamaño efectivo de muestra y, si los estados son numéricos, media y
+        varianza ponderadas (por componente si son vectores)
+        """
+        resumen = {'ess': 1.0 / (self.pesos @ self.pesos)}
+        if np.issubdtype(self.estados.dtype, np.number):
+            media = self.pesos @ self.estados
+            resumen['media'] = media
+            resumen['varianza'] = self.pesos @ (self.estados - media) ** 2
+        return resumen
+
+    def paso(self, obs):
+        """
+        Predicción, ponderación y (si hace falta) remuestreo
+        Returns:
+            resumen antes de remuestrear (la media ponderada tiene menos
+            varianza que la de las copias) con la clave 'remuestreado'
+        """
+        self.estados = self.transicion(self.estados, self.rng)
+        pesos = self.pesos * np.asarray(self.verosimilitud(obs, self.estados), dtype=float)
+        total = pesos.sum()
+        if total > 0:
+            self.pesos = pesos / total
+        else:
+            self.pesos = np.full(self.n, 1.0 / self.n)  # Resetear si pesos colapsan
+
+        resumen = self.resumen()
+        resumen['remuestreado'] = resumen['ess'] < self.umbral_ess * self.n
+        if resumen['remuestreado']:
+            self.estados = self.estados[self.remuestrear(self.pesos, self.n, self.rng)]
+            self.pesos = np.full(self.n, 1.0 / self.n)
+        return resumen
+
+    def ejecutar(self, observaciones, guardar='resumen'):
+        """
+        Args:
+            observaciones: iterable de observaciones
+            guardar: 'resumen' (solo estadísticas por paso, memoria O(T)) o
+                     'todo' (copia de estados y pesos por paso, O(T·N))
+        Returns:
+            lista con un elemento por instante, incluido el inicial
+        """
+        if guardar not in ('resumen', 'todo'):
+            raise ValueError(f"Opción de guardado desconocida: {guardar}")
+        if guardar == 'todo':
+            historia = [(self.estados.copy(), self.pesos.copy())]
+        else:
+            historia = [self.resumen()]
+        for obs in observaciones:
+            resumen = self.paso(obs)
+            historia.append((self.estados.copy(), self.pesos.copy()) if guardar == 'todo' else resumen)
+        return historia
+
+
 def filtrado_particulas(observaciones, transicion_func, sensor_func, 
                         inicial_func, num_particulas=1000):
     """
@@ -18,51 +143,24 @@ def filtrado_particulas(observaciones, transicion_func, sensor_func,
     Returns:
         lista de conjuntos de partículas filtradas
     """
-    # Inicializar partículas
-    particulas = [{'estado': inicial_func(), 'peso': 1.0/num_particulas} 
-                  for _ in range(num_particulas)]
-    
-    historia_particulas = [list(particulas)]
-    
-    for obs in observaciones:
-        nuevas_particulas = []
-        
-        # 1. Predicción: mover partículas según modelo de transición
-        for p in particulas:
-            nuevo_estado = transicion_func(p['estado'])
-            nuevas_particulas.append({'estado': nuevo_estado, 'peso': p['peso']})
-        
-        particulas = nuevas_particulas
-        
-        # 2. Actualización: ponderar por verosimilitud de observación
-        suma_pesos = 0
-        for p in particulas:
-            p['peso'] *= sensor_func(obs, p['estado'])
-            suma_pesos += p['peso']
-        
-        # 3. Normalizar pesos
-        if suma_pesos > 0:
-            for p in particulas:
-                p['peso'] /= suma_pesos
-        else:
-             for p in particulas:
-                p['peso'] = 1.0 / num_particulas # Resetear si pesos colapsan
-        
-        # 4. Re-muestreo (Resampling)
-        # Calcular tamaño efectivo de muestra
-        n_eff = 1.0 / sum(p['peso']**2 for p in particulas if p['peso'] > 0)
-        
-        if n_eff < num_particulas / 2:
-            # Re-muestrear (muestreo de baja varianza o sistemático)
-            estados = [p['estado'] for p in particulas]
-            pesos = [p['peso'] for p in particulas]
-            nuevos_estados = random.choices(estados, weights=pesos, k=num_particulas)
-            particulas = [{'estado': e, 'peso': 1.0/num_particulas} 
-                          for e in nuevos_estados]
-        
-        historia_particulas.append(list(particulas))
-    
-    return historia_particulas
+    # Adaptadores partícula a partícula sobre arrays de objetos (los
+    # estados pueden ser de cualquier tipo); con modelos vectorizados
+    # conviene usar FiltroParticulas directamente
+    def a_array(valores):
+        arr = np.empty(num_particulas, dtype=object)
+        arr[:] = valores
+        return arr
+
+    filtro = FiltroParticulas(
+        transicion=lambda x, rng: a_array([transicion_func(e) for e in x]),
+        verosimilitud=lambda obs, x: [sensor_func(obs, e) for e in x],
+        inicial=lambda n, rng: a_array([inicial_func() for _ in range(n)]),
+        num_particulas=num_particulas,
+        semilla=random.getrandbits(32))
+
+    historia = filtro.ejecutar(observaciones, guardar='todo')
+    return [[{'estado': e, 'peso': float(w)} for e, w in zip(estados, pesos)]
+            for estados, pesos in historia]
 
 # ============================================================================
 # EJEMPLOS DE USO
@@ -105,4 +203,25 @@ if __name__ == "__main__":
             print(f"   Tiempo {i} (Inicial): {media:.2f}")
         else:
             media = sum(p['estado'] * p['peso'] for p in particulas)
-            print(f"   Tiempo {i} (Obs: {obs_particulas[i-1]}): {media:.2f}")
\ No newline at end of file
+            print(f"   Tiempo {i} (Obs: {obs_particulas[i-1]}): {media:.2f}")
+
+    # Motor vectorizado: 10^6 partículas, modelos por lotes
+    print("\nFiltro vectorizado (10^6 partículas, solo resúmenes):")
+    rng = np.random.default_rng(0)
+    verdad = np.cumsum(np.full(30, 1.0) + rng.normal(0, 0.5, 30))
+    obs_largas = verdad + rng.normal(0, 1.0, 30)
+
+    for metodo in ('sistematico', 'estratificado', 'multinomial'):
+        filtro = FiltroParticulas(
+            transicion=lambda x, rng: x + 1.0 + rng.normal(0, 0.5, x.shape),
+            verosimilitud=lambda obs, x: np.exp(-0.5 * (obs - x) ** 2) + 1e-9,
+            inicial=lambda n, rng: rng.normal(0, 0.1, n),
+            num_particulas=1_000_000, remuestreo=metodo, semilla=1)
+        t0 = time.perf_counter()
+        resumenes = filtro.ejecutar(obs_largas)
+        duracion = time.perf_counter() - t0
+        medias = np.array([r['media'] for r in resumenes[1:]])
+        error = np.sqrt(np.mean((medias - verdad) ** 2))
+        remuestreos = sum(r['remuestreado'] for r in resumenes[1:])
+        print(f"   {metodo:13s}: {len(obs_largas) / duracion:5.1f} pasos/s, "
+              f"RMSE = {error:.3f}, remuestreos = {remuestreos}/{len(obs_largas)}")
\ No newline at end of file
@@ -1,4 +1,12 @@
+import math
 import random
+import tempfile
+import time
+
+import numpy as np
+
+from hmm_matricial import HMMMatricial
+from modelo_ngramas import ModeloNgramas
 
 # ============================================================================
 # 19. MODELOS OCULTOS DE MARKOV (HMM) - DEPENDENCIA
@@ -13,81 +21,246 @@ class HMM:
         self.emisiones = emisiones
         self.inicial = inicial
     
+    @property
+    def compilado(self):
+        if getattr(self, '_compilado', None) is None:
+            self._compilado = HMMMatricial.desde_dicts(self.estados, self.transiciones,
+                                                       self.emisiones, self.inicial,
+                                                       self.observaciones)
+        return self._compilado
+
     def viterbi(self, secuencia_obs):
-        # (Implementación de Viterbi, copiada de 056_HMM.py)
-        T = len(secuencia_obs)
-        viterbi_prob = [{} for _ in range(T)]
-        camino = [{} for _ in range(T)]
-        
-        if T == 0: return []
-        
-        obs_0 = secuencia_obs[0]
-        for s in self.estados:
-            viterbi_prob[0][s] = (self.inicial.get(s, 0) * self.emisiones.get((obs_0, s), 0))
-            camino[0][s] = [s]
-        
-        for t in range(1, T):
-            obs_t = secuencia_obs[t]
-            for s_nuevo in self.estados:
-                max_prob = -1
-                mejor_estado = None
-                emision_prob = self.emisiones.get((obs_t, s_nuevo), 0)
-                
-                for s_prev in self.estados:
-                    prob = (viterbi_prob[t-1].get(s_prev, 0) * self.transiciones.get((s_prev, s_nuevo), 0))
-                    if prob > max_prob:
-                        max_prob = prob
-                        mejor_estado = s_prev
-                
-                viterbi_prob[t][s_nuevo] = max_prob * emision_prob
-                if mejor_estado and camino[t-1].get(mejor_estado):
-                    camino[t][s_nuevo] = camino[t-1][mejor_estado] + [s_nuevo]
-                else:
-                    camino[t][s_nuevo] = [s_nuevo]
-        
-        max_prob_final = -1
-        mejor_estado_final = None
-        for s, prob in viterbi_prob[T-1].items():
-            if prob > max_prob_final:
-                max_prob_final = prob
-                mejor_estado_final = s
-        
-        if mejor_estado_final is None:
-            return []
-        return camino[T-1][mejor_estado_final]
+        # (Mismo núcleo que 056_HMM.py: log-probabilidades y punteros)
+        modelo = self.compilado
+        camino, _ = modelo.viterbi(modelo.codificar(secuencia_obs))
+        return modelo.decodificar(camino)
 
 # ============================================================================
 # 22. RECONOCIMIENTO DEL HABLA
 # ============================================================================
 
-def reconocimiento_habla_hmm(audio_features, hmm_palabras):
+class RedCompuesta:
+    """
+    Los HMM de todas las palabras compilados en una sola red: estados
+    globales numerados palabra por palabra, transiciones internas en CSR
+    (por estado de origen), estados de entrada con log P(s_0) y estados de
+    salida con log P(fin de palabra | s). Por defecto la probabilidad de
+    salida de un estado es la masa que no reparten sus transiciones
+    (1 - Σ P(s'|s)); si el modelo de la palabra no deja masa libre (filas
+    que suman 1, como en el formato de 54-59) puede terminar en cualquier
+    estado sin costo. Las salidas solo se usan en reconocimiento continuo.
+    """
+    def __init__(self, hmm_palabras, salidas=None):
+        """
+        Args:
+            hmm_palabras: dict {palabra: HMM}
+            salidas: dict opcional {palabra: {estado: P(salir | estado)}}
+        """
+        self.palabras = list(hmm_palabras)
+        modelos = [hmm_palabras[w].compilado for w in self.palabras]
+        self.observaciones = list(dict.fromkeys(o for m in modelos for o in m.observaciones))
+        self.indice_obs = {o: k for k, o in enumerate(self.observaciones)}
+        sin_dato = len(self.observaciones)  # Columna de ceros para observaciones desconocidas
+
+        self.inicio = np.cumsum([0] + [len(m.estados) for m in modelos])
+        G = int(self.inicio[-1])
+        self.palabra_de = np.repeat(np.arange(len(modelos)), np.diff(self.inicio))
+        self.log_B = np.full((G, sin_dato + 1), -np.inf)
+        origen, destino, log_p = [], [], []
+        entrada, log_entrada = [], []
+        salida = np.zeros(G)
+
+        for w, (palabra, m) in enumerate(zip(self.palabras, modelos)):
+            base = int(self.inicio[w])
+            columnas = [self.indice_obs[o] for o in m.observaciones]
+            self.log_B[base:base + len(m.estados), columnas] = m.log_B[:, :-1]
+            i, j = np.nonzero(m.A > 0)
+            origen.append(base + i)
+            destino.append(base + j)
+            log_p.append(m.log_A[i, j])
+            k = np.flatnonzero(m.inicial > 0)
+            entrada.append(base + k)
+            log_entrada.append(m.log_inicial[k])
+            if salidas is not None and palabra in salidas:
+                for estado, p in salidas[palabra].items():
+                    salida[base + m.estados.index(estado)] = p
+            else:
+                libre = np.clip(1.0 - m.A.sum(axis=1), 0.0, 1.0)
+                salida[base:base + len(m.estados)] = libre if libre.any() else 1.0
+
+        origen, destino, log_p = map(np.concatenate, (origen, destino, log_p))
+        orden = np.argsort(origen, kind='stable')
+        self.destino, self.log_transicion = destino[orden], log_p[orden]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(origen, minlength=G))])
+        self.entrada = np.concatenate(entrada)
+        self.log_entrada = np.concatenate(log_entrada)
+        self.palabra_entrada = self.palabra_de[self.entrada]
+        with np.errstate(divide='ignore'):
+            self.log_salida = np.log(salida)
+
+    def codificar(self, secuencia):
+        sin_dato = len(self.observaciones)
+        return np.array([self.indice_obs.get(o, sin_dato) for o in secuencia], dtype=np.int64)
+
+
+def _modelo_lenguaje_log(modelo_lenguaje, palabras, piso=1e-8):
     """
-    Reconocimiento de habla usando HMMs para palabras (conceptual)
+    Adapta el modelo de lenguaje a una función contexto -> log-probabilidades
+    de todas las palabras (más '</s>' al final), con caché por contexto
+    Args:
+        modelo_lenguaje: None, dict de bigramas {(w1, w2): p} como el de
+                         modelo_lenguaje_bigrama (los no vistos valen 'piso')
+                         u objeto con log_probs_siguientes(contexto, palabras)
+    """
+    siguientes = list(palabras) + ['</s>']
+    cache = {}
+
+    def fila(contexto):
+        if contexto not in cache:
+            if modelo_lenguaje is None:
+                cache[contexto] = np.zeros(len(siguientes))
+            elif isinstance(modelo_lenguaje, dict):
+                cache[contexto] = np.log([max(modelo_lenguaje.get((contexto, w), 0.0), piso)
+                                          for w in siguientes])
+            else:
+                cache[contexto] = np.asarray(modelo_lenguaje.log_probs_siguientes(contexto, siguientes))
+        return cache[contexto]
+    return fila
+
+
+def _mejor_por_grupo(grupo, puntaje):
+    """Posiciones del máximo de 'puntaje' dentro de cada valor de 'grupo'"""
+    orden = np.lexsort((puntaje, grupo))
+    ultimo = np.r_[grupo[orden][1:] != grupo[orden][:-1], True]
+    return orden[ultimo]
+
+
+def decodificar_tokens(red, observaciones, modelo_lenguaje=None, haz=20.0, max_tokens=None,
+                       n_mejores=1, aislada=False, peso_lm=1.0, penalizacion_palabra=0.0):
+    """
+    Viterbi por paso de tokens (token passing) sobre la RedCompuesta en
+    espacio logarítmico. Cada token activo es (estado global, puntaje,
+    registro de palabras); al final de palabra se crea un registro
+    (palabra, previo) y los tokens entran a las palabras siguientes con
+    peso_lm · log P(w | anterior) + penalizacion_palabra. Solo se expanden
+    los tokens dentro del haz, así que el trabajo por cuadro depende de los
+    tokens activos y no de vocabulario × longitud.
+    Args:
+        red: RedCompuesta
+        observaciones: secuencia de observaciones
+        modelo_lenguaje: ver _modelo_lenguaje_log (None = sin modelo)
+        haz: se descartan tokens con puntaje < mejor - haz
+        max_tokens: tope opcional de tokens por cuadro (poda por histograma)
+        n_mejores: número de hipótesis a devolver
+        aislada: una sola palabra por enunciado (sin transiciones entre
+                 palabras); el puntaje de cada palabra es el máximo de su
+                 delta de Viterbi sobre todos sus estados, sin costo de
+                 salida
+    Returns:
+        lista de (tupla de palabras, log-puntaje) ordenada de mayor a menor.
+        Con haz=inf la primera hipótesis es exacta (Viterbi sobre la red).
+        En reconocimiento continuo las alternativas salen de los tokens que
+        terminan palabra en el último cuadro y, como cada estado conserva
+        un solo token, su puntaje es una cota inferior del de su mejor
+        segmentación (n-best aproximado). En modo aislado todas son exactas.
+    """
+    obs = red.codificar(observaciones)
+    lm = _modelo_lenguaje_log(modelo_lenguaje, red.palabras)
+    V = len(red.palabras)
+    registros_palabra, registros_previo = [], []
+
+    def entrar(puntajes_palabra, registros_por_palabra, o):
+        """Tokens nuevos en los estados de entrada de cada palabra"""
+        p = puntajes_palabra[red.palabra_entrada] + red.log_entrada + red.log_B[red.entrada, o]
+        return red.entrada, p, registros_por_palabra[red.palabra_entrada]
+
+    def podar(estados, puntajes, registros):
+        vivos = puntajes > -np.inf
+        if vivos.any():
+            vivos &= puntajes >= puntajes[vivos].max() - haz
+        estados, puntajes, registros = estados[vivos], puntajes[vivos], registros[vivos]
+        if max_tokens is not None and len(estados) > max_tokens:
+            mejores = np.argpartition(puntajes, -max_tokens)[-max_tokens:]
+            estados, puntajes, registros = estados[mejores], puntajes[mejores], registros[mejores]
+        return estados, puntajes, registros
+
+    if len(obs) == 0:
+        return []
+    inicio = peso_lm * lm('<s>')[:V] + penalizacion_palabra
+    estados, puntajes, registros = podar(*entrar(inicio, np.full(V, -1), obs[0]))
+
+    for o in obs[1:]:
+        # 1. Transiciones internas desde los tokens activos (CSR)
+        desde = red.indptr[estados]
+        largo = red.indptr[estados + 1] - desde
+        fuente = np.repeat(np.arange(len(estados)), largo)
+        arista = np.repeat(desde, largo) + np.arange(largo.sum()) - np.repeat(np.cumsum(largo) - largo, largo)
+        candidatos = [(red.destino[arista], puntajes[fuente] + red.log_transicion[arista] + red.log_B[red.destino[arista], o],
+                       registros[fuente])]
+
+        # 2. Fin de palabra: el mejor token que sale de cada palabra crea un registro
+        if not aislada:
+            sale = puntajes + red.log_salida[estados]
+            finitos = np.flatnonzero(sale > -np.inf)
+            if finitos.size:
+                mejores = finitos[_mejor_por_grupo(red.palabra_de[estados[finitos]], sale[finitos])]
+                mejores = mejores[sale[mejores] >= puntajes.max() - haz]
+                por_palabra = np.full(V, -np.inf)
+                registro_palabra = np.full(V, -1)
+                for k in mejores.tolist():
+                    w = int(red.palabra_de[estados[k]])
+                    registros_palabra.append(w)
+                    registros_previo.append(int(registros[k]))
+                    nuevo = len(registros_palabra) - 1
+                    # 3. Entrada a las siguientes palabras con el modelo de lenguaje
+                    total = sale[k] + peso_lm * lm(red.palabras[w])[:V] + penalizacion_palabra
+                    mejora = total > por_palabra
+                    por_palabra[mejora] = total[mejora]
+                    registro_palabra[mejora] = nuevo
+                candidatos.append(entrar(por_palabra, registro_palabra, o))
+
+        destino, puntaje, registro = (np.concatenate(c) for c in zip(*candidatos))
+        mejores = _mejor_por_grupo(destino, puntaje)  # Viterbi: un token por estado
+        estados, puntajes, registros = podar(destino[mejores], puntaje[mejores], registro[mejores])
+        if not len(estados):
+            return []
+
+    # Final: salir de la última palabra con P(</s> | w); en modo aislado
+    # cualquier estado puede terminar el enunciado
+    sale = puntajes if aislada else puntajes + red.log_salida[estados]
+    hipotesis = {}
+    for k in np.flatnonzero(sale > -np.inf).tolist():
+        w = int(red.palabra_de[estados[k]])
+        puntaje = float(sale[k] + peso_lm * lm(red.palabras[w])[V])
+        palabras, r = [red.palabras[w]], int(registros[k])
+        while r >= 0:
+            palabras.append(red.palabras[registros_palabra[r]])
+            r = registros_previo[r]
+        clave = tuple(reversed(palabras))
+        if puntaje > hipotesis.get(clave, -np.inf):
+            hipotesis[clave] = puntaje
+    return sorted(hipotesis.items(), key=lambda h: -h[1])[:n_mejores]
+
+
+def reconocimiento_habla_hmm(audio_features, hmm_palabras, n_mejores=None):
+    """
+    Reconocimiento de habla usando HMMs para palabras
     Args:
         audio_features: características extraídas del audio (ej. MFCCs)
         hmm_palabras: dict {palabra: HMM}
+        n_mejores: si se da, devuelve las n mejores (palabra, log P)
     Returns:
-        palabra más probable
+        palabra más probable (máximo log P(audio, camino de Viterbi | palabra),
+        el mismo puntaje que HMM.viterbi de cada palabra)
     """
-    mejor_palabra = None
-    mejor_prob = float('-inf') # Usar log-probabilidades en la práctica
-    
-    for palabra, hmm in hmm_palabras.items():
-        # Usar Viterbi para encontrar P(audio_features | HMM_palabra)
-        try:
-            secuencia = hmm.viterbi(audio_features)
-            
-            # (Simplificado: En la práctica, se calcula la probabilidad
-            # del camino de Viterbi, no solo su longitud)
-            prob_secuencia = -len(secuencia) # Ejemplo simple
-            
-            if prob_secuencia > mejor_prob:
-                mejor_prob = prob_secuencia
-                mejor_palabra = palabra
-        except Exception:
-            continue
-    
-    return mejor_palabra
+    # Todas las palabras en una sola red y una sola pasada de tokens, con
+    # el puntaje real del camino de Viterbi (no la longitud de la secuencia)
+    red = RedCompuesta(hmm_palabras)
+    resultado = decodificar_tokens(red, audio_features, aislada=True,
+                                   n_mejores=n_mejores or 1, haz=math.inf)
+    if n_mejores is not None:
+        return [(palabras[0], puntaje) for palabras, puntaje in resultado]
+    return resultado[0][0][0] if resultado else None
 
 
 def modelo_lenguaje_bigrama(corpus):
@@ -97,6 +270,8 @@ def modelo_lenguaje_bigrama(corpus):
         corpus: lista de pares de palabras (w_{i-1}, w_i)
     Returns:
         dict {(palabra1, palabra2): probabilidad}
+        (máxima verosimilitud sin suavizar; para corpus grandes y bigramas
+        no vistos usar ModeloNgramas)
     """
     conteos = {}
     conteos_palabra1 = {}
@@ -158,4 +333,79 @@ if __name__ == "__main__":
     
     palabra_reconocida = reconocimiento_habla_hmm(audio_features, hmm_palabras)
     print(f"   Features de audio: {audio_features}")
-    print(f"   Palabra reconocida: {palabra_reconocida}")
\ No newline at end of file
+    print(f"   Palabra reconocida: {palabra_reconocida}")
+    print(f"   N-mejores: {reconocimiento_habla_hmm(audio_features, hmm_palabras, n_mejores=2)}\n")
+
+    # 3. Reconocimiento continuo con red compuesta y bigramas
+    print("Reconocimiento continuo (paso de tokens + bigramas):")
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+
+    def hmm_izquierda_derecha(palabra):
+        """Un estado por letra con auto-lazo; el último sale con prob. 0.7"""
+        est = [f'{palabra}{i}' for i in range(len(palabra))]
+        trans = {(e, e): 0.3 for e in est}
+        trans.update({(a, b): 0.7 for a, b in zip(est, est[1:])})
+        emis = {(l, e): 0.8 if l == palabra[i] else 0.2 / 25
+                for i, e in enumerate(est) for l in letras}
+        return HMM(est, list(letras), trans, emis, {est[0]: 1.0})
+
+    vocabulario = ['hola', 'mundo', 'adios', 'ia', 'hoy', 'dia']
+    red = RedCompuesta({w: hmm_izquierda_derecha(w) for w in vocabulario})
+    corpus_lm = [('<s>', 'hola'), ('hola', 'mundo'), ('mundo', '</s>'), ('hola', 'hoy'),
+                 ('hoy', 'dia'), ('dia', '</s>'), ('<s>', 'adios'), ('adios', '</s>')]
+    bigramas_lm = modelo_lenguaje_bigrama(corpus_lm)
+    audio = list('hholamuunfo')  # 'hola mundo' con una letra errónea
+    print(f"   Audio: {''.join(audio)}")
+    for nombre, lm in (('sin modelo de lenguaje', None), ('con bigramas', bigramas_lm)):
+        print(f"   {nombre}:")
+        for palabras, puntaje in decodificar_tokens(red, audio, lm, haz=40.0, n_mejores=3):
+            print(f"      {' '.join(palabras):18s} log P = {puntaje:.2f}")
+
+    # 4. Vocabulario grande: el costo depende de los tokens activos
+    rng = random.Random(0)
+    palabras_grandes = list(dict.fromkeys(''.join(rng.choice(letras) for _ in range(rng.randint(3, 7)))
+                                          for _ in range(2000)))
+    red_grande = RedCompuesta({w: hmm_izquierda_derecha(w) for w in palabras_grandes})
+    frase = rng.sample(palabras_grandes, 5)
+    audio = [c for w in frase for c in w for _ in range(rng.randint(1, 2))]
+    print(f"\n   Vocabulario de {len(palabras_grandes)} palabras, frase '{' '.join(frase)}' ({len(audio)} cuadros):")
+    for haz in (math.inf, 15.0):
+        t0 = time.perf_counter()
+        (palabras, puntaje), = decodificar_tokens(red_grande, audio, haz=haz, penalizacion_palabra=-5.0)
+        print(f"      haz={haz}: {' '.join(palabras)} (log P = {puntaje:.1f}), "
+              f"{time.perf_counter() - t0:.2f} s")
+
+    # 5. Modelo de n-gramas: enteros empaquetados, Kneser-Ney y mmap
+    print("\nModelo de n-gramas (trigramas, Kneser-Ney):")
+    print(f"   MLE: P(IA | mundo) = {bigramas.get(('mundo', 'IA'), 0):.3f}")
+    kn = ModeloNgramas.desde_corpus([['hola', 'mundo'], ['hola', 'IA']], orden=2)
+    print(f"   KN:  P(IA | mundo) = {math.exp(kn.log_prob('IA', ['mundo'])):.3f}")
+    kn_frases = ModeloNgramas.desde_corpus([['hola', 'mundo'], ['hola', 'hoy', 'dia'], ['adios']], orden=2)
+    (palabras, puntaje), = decodificar_tokens(red, list('hholamuunfo'), kn_frases)
+    print(f"   Decodificador con KN: {' '.join(palabras)} (log P = {puntaje:.2f})")
+
+    rng_np = np.random.default_rng(0)
+    vocabulario_zipf = [f'p{i}' for i in range(5000)]
+    def oraciones_zipf(n):
+        largos = rng_np.integers(5, 20, size=n)
+        ids = np.minimum(rng_np.zipf(1.3, size=largos.sum()), len(vocabulario_zipf)) - 1
+        # Dependencia local: la mitad de las palabras repite la anterior + 1
+        ids = np.where(rng_np.random(len(ids)) < 0.5, np.roll(ids, 1) + 1, ids) % len(vocabulario_zipf)
+        palabras = [vocabulario_zipf[i] for i in ids.tolist()]
+        cortes = np.cumsum(largos)[:-1]
+        return [palabras[a:b] for a, b in zip(np.r_[0, cortes], np.r_[cortes, len(palabras)])]
+
+    entrenamiento, prueba = oraciones_zipf(80_000), oraciones_zipf(2_000)
+    t0 = time.perf_counter()
+    kn = ModeloNgramas.desde_corpus(entrenamiento, orden=3, bloque=20_000)
+    tokens = sum(len(o) for o in entrenamiento)
+    print(f"   {tokens:,} tokens, {len(kn.claves[3]):,} trigramas distintos: "
+          f"{time.perf_counter() - t0:.1f} s, {kn.bytes_en_memoria() / 2**20:.1f} MiB")
+    with tempfile.TemporaryDirectory() as directorio:
+        kn.guardar(directorio)
+        mapeado = ModeloNgramas.cargar(directorio, mmap=True)
+        t0 = time.perf_counter()
+        log_p, n = mapeado.puntuar(prueba)
+        print(f"   Puntuación por lotes (mmap): {n.sum() / (time.perf_counter() - t0):,.0f} "
+              f"predicciones/s, perplejidad = {np.exp(-log_p.sum() / n.sum()):.1f}")
+        del mapeado  # Libera el mmap antes de borrar el directorio
\ No newline at end of file
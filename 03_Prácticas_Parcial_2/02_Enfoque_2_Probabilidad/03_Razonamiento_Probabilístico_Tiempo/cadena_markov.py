@@ -0,0 +1,397 @@
+"""
+CADENAS DE MARKOV EN FORMA MATRICIAL
+Matriz de transición dispersa en formato CSR (filas comprimidas) sobre
+arrays de NumPy: producto π·P en O(nnz), componentes fuertemente conexas,
+periodo y distribución estacionaria con método de la potencia acelerado
+(extrapolación de Aitken) o resolución directa. Matriz densa para
+predicción: P^k por cuadrados sucesivos con caché, muchos horizontes y
+muchas distribuciones en una llamada, y simulación de muchas cadenas.
+"""
+
+import numpy as np
+
+# ============================================================================
+# MATRIZ DE TRANSICIÓN DISPERSA
+# ============================================================================
+
+class CadenaMarkovDispersa:
+    """
+    Cadena de Markov con P en CSR: las transiciones que salen del estado i
+    son indices[indptr[i]:indptr[i+1]] con probabilidades datos[...].
+    Los estados se numeran 0..n-1; 'estados' guarda sus nombres.
+    """
+    def __init__(self, origen, destino, probabilidades, num_estados=None, estados=None):
+        """
+        Args:
+            origen, destino: arrays (nnz,) con los índices de cada transición
+            probabilidades: array (nnz,) con P(destino | origen)
+            num_estados: n (por defecto, el mayor índice + 1)
+            estados: nombres de los estados (por defecto 0..n-1)
+        """
+        origen = np.asarray(origen, dtype=np.int64)
+        destino = np.asarray(destino, dtype=np.int64)
+        probabilidades = np.asarray(probabilidades, dtype=float)
+        positivas = probabilidades > 0
+        origen, destino, probabilidades = origen[positivas], destino[positivas], probabilidades[positivas]
+
+        if num_estados is None:
+            num_estados = int(max(origen.max(initial=-1), destino.max(initial=-1))) + 1
+        self.num_estados = num_estados
+        self.estados = list(range(num_estados)) if estados is None else list(estados)
+
+        orden = np.argsort(origen, kind='stable')
+        self.filas = origen[orden]           # Fila de cada entrada (para π·P)
+        self.indices = destino[orden]
+        self.datos = probabilidades[orden]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.filas, minlength=num_estados))])
+
+        self._componentes = None
+        self._periodo = None
+
+    @classmethod
+    def desde_dict(cls, matriz_transicion):
+        """
+        Desde el formato de 52: {(estado_i, estado_j): probabilidad}
+        (estados ordenados como en distribucion_estacionaria)
+        """
+        estados = sorted({s for par in matriz_transicion for s in par})
+        indice = {s: i for i, s in enumerate(estados)}
+        origen = [indice[i] for i, _ in matriz_transicion]
+        destino = [indice[j] for _, j in matriz_transicion]
+        return cls(origen, destino, list(matriz_transicion.values()), len(estados), estados)
+
+    def a_dict(self, distribucion):
+        """Array (n,) -> {estado: probabilidad}"""
+        return {s: float(p) for s, p in zip(self.estados, distribucion)}
+
+    @property
+    def sin_salida(self):
+        """Estados sin transiciones salientes (filas vacías)"""
+        return np.diff(self.indptr) == 0
+
+    def paso(self, pi, amortiguamiento=None):
+        """
+        π·P en O(nnz). Con amortiguamiento d (estilo PageRank) se usa
+        d·π·P + (1-d)/n, y la masa de los estados sin salida se reparte
+        uniformemente
+        """
+        nuevo = np.bincount(self.indices, weights=self.datos * pi[self.filas],
+                            minlength=self.num_estados)
+        if amortiguamiento is not None:
+            perdida = pi[self.sin_salida].sum()
+            nuevo = amortiguamiento * (nuevo + perdida / self.num_estados)
+            nuevo += (1 - amortiguamiento) * pi.sum() / self.num_estados
+        return nuevo
+
+    # ------------------------------------------------------------------------
+    # Estructura: componentes fuertemente conexas y periodo
+    # ------------------------------------------------------------------------
+
+    def componentes_fuertes(self):
+        """
+        Tarjan iterativo (sin recursión) sobre el grafo de transiciones
+        Returns:
+            (etiqueta de componente por estado, número de componentes)
+        """
+        if self._componentes is not None:
+            return self._componentes
+
+        n = self.num_estados
+        indptr, indices = self.indptr.tolist(), self.indices.tolist()
+        orden, bajo = [-1] * n, [0] * n
+        en_pila, componente = [False] * n, [-1] * n
+        pila, contador, num_componentes = [], 0, 0
+
+        for raiz in range(n):
+            if orden[raiz] != -1:
+                continue
+            orden[raiz] = bajo[raiz] = contador
+            contador += 1
+            pila.append(raiz)
+            en_pila[raiz] = True
+            trabajo = [[raiz, indptr[raiz]]]
+            while trabajo:
+                marco = trabajo[-1]
+                v, i = marco
+                if i < indptr[v + 1]:
+                    marco[1] += 1
+                    w = indices[i]
+                    if orden[w] == -1:
+                        orden[w] = bajo[w] = contador
+                        contador += 1
+                        pila.append(w)
+                        en_pila[w] = True
+                        trabajo.append([w, indptr[w]])
+                    elif en_pila[w]:
+                        bajo[v] = min(bajo[v], orden[w])
+                else:
+                    trabajo.pop()
+                    if trabajo:
+                        u = trabajo[-1][0]
+                        bajo[u] = min(bajo[u], bajo[v])
+                    if bajo[v] == orden[v]:
+                        while True:
+                            w = pila.pop()
+                            en_pila[w] = False
+                            componente[w] = num_componentes
+                            if w == v:
+                                break
+                        num_componentes += 1
+
+        self._componentes = (np.array(componente), num_componentes)
+        return self._componentes
+
+    def es_irreducible(self):
+        return self.componentes_fuertes()[1] == 1
+
+    def clases_cerradas(self):
+        """
+        Componentes de las que no sale ninguna transición (clases
+        recurrentes): la distribución estacionaria solo vive en ellas
+        Returns:
+            lista de etiquetas de componente
+        """
+        etiquetas, k = self.componentes_fuertes()
+        sale = np.zeros(k, dtype=bool)
+        cruzan = etiquetas[self.filas] != etiquetas[self.indices]
+        sale[etiquetas[self.filas[cruzan]]] = True
+        return [c for c in range(k) if not sale[c]]
+
+    def _vecinos(self, frontera):
+        """Destinos de todas las transiciones que salen de 'frontera' (vectorizado)"""
+        inicio = self.indptr[frontera]
+        largo = self.indptr[frontera + 1] - inicio
+        desplazamiento = np.arange(largo.sum()) - np.repeat(np.cumsum(largo) - largo, largo)
+        return self.indices[np.repeat(inicio, largo) + desplazamiento]
+
+    def periodo(self):
+        """
+        Periodo de una cadena irreducible: mcd de nivel(u) + 1 - nivel(v)
+        sobre todas las aristas u -> v, con niveles de un BFS desde el
+        estado 0. Devuelve None si la cadena no es irreducible.
+        """
+        if self._periodo is not None or not self.es_irreducible():
+            return self._periodo
+        nivel = np.full(self.num_estados, -1, dtype=np.int64)
+        nivel[0] = 0
+        frontera = np.array([0])
+        profundidad = 0
+        while frontera.size:
+            vecinos = np.unique(self._vecinos(frontera))
+            frontera = vecinos[nivel[vecinos] == -1]
+            profundidad += 1
+            nivel[frontera] = profundidad
+        self._periodo = int(np.gcd.reduce(np.abs(nivel[self.filas] + 1 - nivel[self.indices])))
+        return self._periodo
+
+    # ------------------------------------------------------------------------
+    # Distribución estacionaria
+    # ------------------------------------------------------------------------
+
+    def potencia(self, pi=None, tolerancia=1e-10, max_iter=10000, aitken_cada=None,
+                 amortiguamiento=None, perezosa=False):
+        """
+        Método de la potencia π <- π·P
+        Args:
+            pi: distribución inicial (uniforme por defecto)
+            tolerancia: parada cuando ||π' - π||_1 < tolerancia
+            max_iter: iteraciones máximas
+            aitken_cada: cada cuántas iteraciones se intenta una
+                         extrapolación Δ² de Aitken con los tres últimos
+                         iterados (se acepta solo si reduce el residuo)
+            amortiguamiento: factor d de PageRank (None = cadena original)
+            perezosa: usar (P + I) / 2, misma estacionaria pero aperiódica
+        Returns:
+            (π, iteraciones)
+        """
+        n = self.num_estados
+        pi = np.full(n, 1.0 / n) if pi is None else np.asarray(pi, dtype=float)
+
+        def aplicar(x):
+            y = self.paso(x, amortiguamiento)
+            return 0.5 * (x + y) if perezosa else y
+
+        anteriores = []
+        for iteracion in range(1, max_iter + 1):
+            nuevo = aplicar(pi)
+            cambio = np.abs(nuevo - pi).sum()
+            anteriores = (anteriores + [pi])[-2:]
+            pi = nuevo
+            if cambio < tolerancia:
+                break
+
+            if aitken_cada and iteracion % aitken_cada == 0 and len(anteriores) == 2:
+                x0, x1 = anteriores
+                denominador = pi - 2 * x1 + x0
+                seguro = np.abs(denominador) > 1e-300
+                extrapolado = pi.copy()
+                extrapolado[seguro] = pi[seguro] - (pi[seguro] - x1[seguro]) ** 2 / denominador[seguro]
+                extrapolado = np.maximum(extrapolado, 0)
+                total = extrapolado.sum()
+                if total > 0:
+                    extrapolado /= total
+                    if np.abs(aplicar(extrapolado) - extrapolado).sum() < cambio:
+                        pi = extrapolado
+                        anteriores = []
+        return pi, iteracion
+
+    def directa(self, amortiguamiento=None, max_estados=5000):
+        """
+        Resuelve π(P - I) = 0 con Σπ = 1 como sistema denso (NumPy no
+        tiene factorizaciones dispersas); pensado para cadenas pequeñas o
+        para validar el método iterativo. Sin amortiguamiento exige una
+        sola clase cerrada (si hay más, π no es única y el sistema es
+        singular).
+        """
+        n = self.num_estados
+        if n > max_estados:
+            raise ValueError(f"Resolución directa limitada a {max_estados} estados (n = {n})")
+        if amortiguamiento is None and len(self.clases_cerradas()) > 1:
+            raise ValueError(f"La cadena tiene {len(self.clases_cerradas())} clases cerradas: "
+                             "la distribución estacionaria no es única")
+        P = np.zeros((n, n))
+        np.add.at(P, (self.filas, self.indices), self.datos)
+        if amortiguamiento is not None:
+            P[self.sin_salida] = 1.0 / n
+            P = amortiguamiento * P + (1 - amortiguamiento) / n
+        A = P.T - np.eye(n)
+        A[-1] = 1.0  # Reemplaza una ecuación redundante por Σπ = 1
+        b = np.zeros(n)
+        b[-1] = 1.0
+        return np.linalg.solve(A, b)
+
+    def distribucion_estacionaria(self, metodo='potencia', tolerancia=1e-10, max_iter=10000,
+                                  aitken_cada=10, amortiguamiento=None):
+        """
+        Distribución estacionaria con diagnóstico estructural
+        Args:
+            metodo: 'potencia' (acelerado con Aitken) o 'directo'
+            amortiguamiento: factor d de PageRank (hace la cadena irreducible
+                             y aperiódica)
+        Returns:
+            dict con 'pi', 'iteraciones', 'irreducible', 'periodo' y
+            'clases_cerradas' (si hay más de una, π depende del inicio)
+        """
+        if amortiguamiento is None:
+            irreducible = self.es_irreducible()
+            periodo = self.periodo()
+            cerradas = self.clases_cerradas()
+        else:
+            irreducible, periodo, cerradas = True, 1, [0]
+
+        if metodo == 'directo':
+            pi, iteraciones = self.directa(amortiguamiento), 0
+        elif metodo == 'potencia':
+            # En una cadena periódica π·P^t oscila: se usa la versión perezosa
+            pi, iteraciones = self.potencia(tolerancia=tolerancia, max_iter=max_iter,
+                                            aitken_cada=aitken_cada,
+                                            amortiguamiento=amortiguamiento,
+                                            perezosa=periodo != 1)
+        else:
+            raise ValueError(f"Método desconocido: {metodo}")
+
+        return {'pi': pi, 'iteraciones': iteraciones, 'irreducible': irreducible,
+                'periodo': periodo, 'clases_cerradas': len(cerradas)}
+
+# ============================================================================
+# PREDICCIÓN CON MATRIZ DENSA
+# ============================================================================
+
+class PrediccionMarkov:
+    """
+    Predicción k pasos adelante con P densa (n, n). P^k se arma con las
+    potencias P^(2^i) (que se guardan) según los bits de k, en
+    O(n³ log k), y las potencias ya pedidas quedan en una caché acotada.
+    """
+    def __init__(self, P, max_cache=64):
+        self.P = np.asarray(P, dtype=float)
+        self.n = self.P.shape[0]
+        self._cuadrados = [self.P]   # P^(2^i)
+        self._cache = {0: np.eye(self.n), 1: self.P}
+        self.max_cache = max_cache
+        self._cdf_plana = None
+
+    def potencia(self, k):
+        """P^k por cuadrados sucesivos (con caché); k entero >= 0"""
+        if k in self._cache:
+            return self._cache[k]
+        if k < 0:
+            raise ValueError(f"El exponente debe ser >= 0 (k = {k})")
+        resultado, bit, resto = None, 0, k
+        while resto:
+            if bit == len(self._cuadrados):
+                self._cuadrados.append(self._cuadrados[-1] @ self._cuadrados[-1])
+            if resto & 1:
+                resultado = self._cuadrados[bit] if resultado is None else resultado @ self._cuadrados[bit]
+            resto >>= 1
+            bit += 1
+        if len(self._cache) >= self.max_cache:
+            # La más antigua; P^0 y P^1 no se desalojan
+            antigua = next((j for j in self._cache if j > 1), None)
+            if antigua is None:
+                return resultado
+            self._cache.pop(antigua)
+        self._cache[k] = resultado
+        return resultado
+
+    def predecir(self, distribuciones, horizontes):
+        """
+        P(X_{t+h}) para varias distribuciones iniciales y varios horizontes
+        a la vez: se recorren los horizontes ordenados y cada uno parte del
+        anterior con P^(h_i - h_{i-1}), sin recalcular desde t
+        Args:
+            distribuciones: array (n,) o (m, n)
+            horizontes: entero o lista de enteros >= 0
+        Returns:
+            array (len(horizontes), m, n) (o sin los ejes de tamaño 1 que
+            no se pidieron como lista)
+        """
+        D = np.asarray(distribuciones, dtype=float)
+        una = D.ndim == 1
+        D = np.atleast_2d(D)
+        escalar = np.isscalar(horizontes)
+        horizontes = np.atleast_1d(horizontes).astype(np.int64)
+
+        resultado = np.empty((len(horizontes), D.shape[0], self.n))
+        actual, h_actual = D, 0
+        for i in np.argsort(horizontes, kind='stable'):
+            h = int(horizontes[i])
+            if h != h_actual:
+                actual = actual @ self.potencia(h - h_actual)
+                h_actual = h
+            resultado[i] = actual
+        if una:
+            resultado = resultado[:, 0]
+        return resultado[0] if escalar else resultado
+
+    def simular(self, iniciales, pasos, rng=None):
+        """
+        Trayectorias de muchas cadenas independientes: en cada paso una
+        sola búsqueda sobre las CDF de todas las filas concatenadas (la
+        fila i desplazada en +i), O(m log(n²)) por paso
+        Args:
+            iniciales: índices de estado iniciales (m,)
+            pasos: número de transiciones
+            rng: np.random.Generator
+        Returns:
+            array (m, pasos + 1) de índices de estado
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        if self._cdf_plana is None:
+            sumas = self.P.sum(axis=1, keepdims=True)
+            if np.any(sumas <= 0):
+                raise ValueError("Hay estados sin transiciones salientes")
+            cdf = np.cumsum(self.P / sumas, axis=1)
+            cdf[:, -1] = 1.0
+            self._cdf_plana = (cdf + np.arange(self.n)[:, None]).ravel()
+
+        iniciales = np.asarray(iniciales, dtype=np.int64)
+        trayectorias = np.empty((len(iniciales), pasos + 1), dtype=np.int64)
+        trayectorias[:, 0] = actual = iniciales
+        filas = actual * self.n
+        for t in range(1, pasos + 1):
+            posicion = np.searchsorted(self._cdf_plana, actual + rng.random(len(actual)), side='right')
+            actual = np.minimum(posicion - filas, self.n - 1)
+            filas = actual * self.n
+            trayectorias[:, t] = actual
+        return trayectorias
@@ -0,0 +1,345 @@
+"""
+HMM MATRICIAL
+Núcleo de inferencia para modelos ocultos de Markov con las probabilidades
+en arrays de NumPy: pasadas hacia delante y hacia atrás escaladas (producto
+matriz-vector por paso, sin underflow en secuencias largas), suavizado,
+log-verosimilitud y Viterbi en espacio logarítmico con matriz de punteros.
+Lo usan filtrado/suavizado (54), forward_backward (55) y HMM.viterbi (56, 59).
+"""
+
+import numpy as np
+
+# ============================================================================
+# MODELO
+# ============================================================================
+
+def matriz_transicion(estados, transiciones):
+    """
+    dict {(s, s'): P(s'|s)} -> array A[i, j] en el orden de 'estados'
+    (los pares con estados desconocidos se ignoran)
+    """
+    ie = {s: i for i, s in enumerate(estados)}
+    A = np.zeros((len(estados), len(estados)))
+    for (s, s_nuevo), p in transiciones.items():
+        if s in ie and s_nuevo in ie:
+            A[ie[s], ie[s_nuevo]] = p
+    return A
+
+
+class HMMMatricial:
+    """
+    HMM con estados y observaciones numerados:
+        A[i, j] = P(X_t = j | X_{t-1} = i)
+        B[i, o] = P(e_t = o | X_t = i)
+        inicial[i] = P(X_0 = i)
+    B lleva una columna extra de ceros para observaciones desconocidas.
+    """
+    def __init__(self, estados, observaciones, A, B, inicial):
+        self.estados = list(estados)
+        self.observaciones = list(observaciones)
+        self.indice_obs = {o: k for k, o in enumerate(self.observaciones)}
+        self.A = np.asarray(A, dtype=float)
+        B = np.asarray(B, dtype=float)
+        self.B = np.hstack([B, np.zeros((len(self.estados), 1))])
+        self.inicial = np.asarray(inicial, dtype=float)
+        with np.errstate(divide='ignore'):
+            self.log_A = np.log(self.A)
+            self.log_B = np.log(self.B)
+            self.log_inicial = np.log(self.inicial)
+
+    @classmethod
+    def desde_dicts(cls, estados, transiciones, emisiones, inicial, observaciones=None):
+        """
+        Desde el formato de los módulos 54-59
+        Args:
+            estados: lista de estados ocultos
+            transiciones: dict {(s, s'): P(s'|s)}
+            emisiones: dict {(obs, estado): P(obs|estado)}
+            inicial: dict {estado: P(s_0)}
+            observaciones: dominio de las observaciones (por defecto, las
+                           que aparecen en 'emisiones')
+        """
+        if observaciones is None:
+            observaciones = list(dict.fromkeys(o for o, _ in emisiones))
+        ie = {s: i for i, s in enumerate(estados)}
+        io = {o: k for k, o in enumerate(observaciones)}
+        A = matriz_transicion(estados, transiciones)
+        B = np.zeros((len(estados), len(observaciones)))
+        for (o, s), p in emisiones.items():
+            if o in io and s in ie:
+                B[ie[s], io[o]] = p
+        pi = np.array([inicial.get(s, 0) for s in estados], dtype=float)
+        return cls(estados, observaciones, A, B, pi)
+
+    def codificar(self, secuencia):
+        """Observaciones -> índices (las desconocidas van a la columna de ceros)"""
+        desconocida = len(self.observaciones)
+        return np.array([self.indice_obs.get(o, desconocida) for o in secuencia], dtype=np.int64)
+
+    def decodificar(self, indices):
+        return [self.estados[i] for i in indices]
+
+    def a_dicts(self, matriz):
+        """Array (T, S) -> lista de dicts {estado: valor}"""
+        return [dict(zip(self.estados, fila)) for fila in matriz.tolist()]
+
+    # ------------------------------------------------------------------------
+    # Pasadas hacia delante y hacia atrás
+    # ------------------------------------------------------------------------
+
+    def adelante(self, obs, inicial=None, transicion_inicial=False):
+        """
+        Pasada hacia delante escalada: alfa[t] = P(X_t | e_{1:t}) y
+        c[t] = P(e_t | e_{1:t-1}), de modo que log P(e_{1:T}) = Σ log c[t]
+        Args:
+            obs: índices de observación (ver codificar)
+            inicial: distribución previa (por defecto self.inicial)
+            transicion_inicial: si es True la previa es P(X_0) y la primera
+                                observación corresponde a X_1 (convención de
+                                54); si no, la primera observación es de X_0
+                                (convención de 55 y 56)
+        Returns:
+            (alfa (T, S), log_c (T,))
+        """
+        T, S = len(obs), len(self.estados)
+        alfa = np.zeros((T, S))
+        log_c = np.zeros(T)
+        previo = self.inicial if inicial is None else np.asarray(inicial, dtype=float)
+        B_t = self.B.T  # (O+1, S): una fila contigua por observación
+        for t in range(T):
+            prediccion = previo @ self.A if (t > 0 or transicion_inicial) else previo
+            a = prediccion * B_t[obs[t]]
+            c = a.sum()
+            if c > 0:
+                alfa[t] = a / c
+                log_c[t] = np.log(c)
+            else:
+                log_c[t:] = -np.inf  # Evidencia imposible: el resto queda en cero
+                break
+            previo = alfa[t]
+        return alfa, log_c
+
+    def atras(self, obs, log_c):
+        """
+        Pasada hacia atrás con las mismas escalas: beta[t] es
+        P(e_{t+1:T} | X_t) / P(e_{t+1:T} | e_{1:t}), así alfa[t]·beta[t]
+        ya es la marginal suavizada
+        Returns:
+            beta (T, S)
+        """
+        T, S = len(obs), len(self.estados)
+        beta = np.ones((T, S))
+        escala = np.exp(log_c)
+        B_t = self.B.T
+        for t in range(T - 2, -1, -1):
+            if escala[t + 1] > 0:
+                beta[t] = self.A @ (B_t[obs[t + 1]] * beta[t + 1]) / escala[t + 1]
+            else:
+                beta[t] = 0.0
+        return beta
+
+    def atras_normalizado(self, obs):
+        """
+        Pasada hacia atrás con escalas propias (no dependen de la pasada
+        hacia delante, así que sirve aunque la evidencia sea imposible):
+        cada beta[t] se normaliza a suma 1 y log_d[t] guarda el logaritmo
+        de esa suma
+        Returns:
+            (beta (T, S), log_d (T,)), con
+            P(e_{t+1:T} | X_t) = beta[t] · exp(Σ_{u >= t} log_d[u])
+        """
+        T, S = len(obs), len(self.estados)
+        beta = np.ones((T, S))
+        log_d = np.zeros(T)
+        B_t = self.B.T
+        for t in range(T - 2, -1, -1):
+            b = self.A @ (B_t[obs[t + 1]] * beta[t + 1])
+            d = b.sum()
+            if d > 0:
+                beta[t] = b / d
+                log_d[t] = np.log(d)
+            else:
+                beta[:t + 1] = 0.0
+                log_d[:t + 1] = -np.inf
+                break
+        return beta, log_d
+
+    def suavizar(self, obs, transicion_inicial=False):
+        """
+        P(X_t | e_{1:T}) para todo t
+        Returns:
+            (gamma, log P(e_{1:T})); con transicion_inicial gamma tiene T + 1
+            filas (X_0 ... X_T), si no T filas
+        """
+        alfa, log_c = self.adelante(obs, transicion_inicial=transicion_inicial)
+        beta = self.atras(obs, log_c)
+        gamma = alfa * beta
+        if transicion_inicial and len(obs):
+            c0 = np.exp(log_c[0])
+            beta_0 = self.A @ (self.B.T[obs[0]] * beta[0]) / c0 if c0 > 0 else np.zeros(len(self.estados))
+            gamma = np.vstack([self.inicial * beta_0, gamma])
+        elif transicion_inicial:
+            gamma = self.inicial[None, :].copy()
+        total = gamma.sum(axis=1, keepdims=True)
+        np.divide(gamma, total, out=gamma, where=total > 0)
+        return gamma, float(log_c.sum())
+
+    def log_verosimilitud(self, obs):
+        """log P(e_{1:T}) (la primera observación es de X_0)"""
+        return float(self.adelante(obs)[1].sum())
+
+    def prediccion(self, distribucion, pasos):
+        """P(X_{t+k}) = P(X_t) · A^k"""
+        return np.asarray(distribucion, dtype=float) @ np.linalg.matrix_power(self.A, pasos)
+
+    # ------------------------------------------------------------------------
+    # Viterbi
+    # ------------------------------------------------------------------------
+
+    def viterbi(self, obs):
+        """
+        Secuencia de estados más probable en espacio logarítmico: por paso
+        se guarda solo el argmax del predecesor (matriz (T, S) de enteros)
+        y el camino se reconstruye al final hacia atrás
+        Returns:
+            (índices de estado, log P(camino, e_{1:T}))
+        """
+        T = len(obs)
+        if T == 0:
+            return [], 0.0
+        punteros = np.zeros((T, len(self.estados)), dtype=np.int32)
+        log_B_t = self.log_B.T
+        delta = self.log_inicial + log_B_t[obs[0]]
+        for t in range(1, T):
+            candidatos = delta[:, None] + self.log_A  # (previo, nuevo)
+            punteros[t] = candidatos.argmax(axis=0)
+            delta = candidatos[punteros[t], np.arange(len(self.estados))] + log_B_t[obs[t]]
+
+        camino = np.empty(T, dtype=np.int64)
+        camino[-1] = int(delta.argmax())
+        for t in range(T - 1, 0, -1):
+            camino[t - 1] = punteros[t, camino[t]]
+        return camino.tolist(), float(delta.max())
+
+# ============================================================================
+# VITERBI CON HAZ Y EN LÍNEA
+# ============================================================================
+
+class DecodificadorViterbi:
+    """
+    Viterbi incremental: recibe una observación a la vez, guarda un vector
+    de punteros (S,) por paso solo para la parte todavía no decidida y,
+    cuando todos los caminos supervivientes pasan por el mismo estado en
+    un instante, emite el prefijo hasta ese instante (traceback parcial).
+    Con 'haz' se conservan solo los B estados con mejor puntaje por paso.
+    """
+    def __init__(self, modelo, haz=None):
+        """
+        Args:
+            modelo: HMMMatricial
+            haz: número de estados que sobreviven por paso (None = todos,
+                 Viterbi exacto)
+        """
+        self.modelo = modelo
+        self.haz = haz
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.t = -1              # Instante de 'delta'
+        self.inicio = 0          # Primer instante sin decidir
+        self.punteros = []       # punteros[k]: instante inicio + k -> inicio + k - 1
+        self.delta = None
+        self.ventana_maxima = 0  # Mayor número de pasos pendientes (memoria usada)
+
+    def _activos(self):
+        activos = np.flatnonzero(self.delta > -np.inf)
+        return activos if activos.size else np.arange(len(self.delta))
+
+    def _rastrear(self, estado, hasta):
+        """Estados desde 'inicio' hasta 'hasta' siguiendo los punteros hacia atrás"""
+        camino = [estado]
+        for k in range(hasta - self.inicio, 0, -1):
+            estado = int(self.punteros[k][estado])
+            camino.append(estado)
+        camino.reverse()
+        return camino
+
+    def _emitir(self, estado, hasta):
+        decididos = self._rastrear(estado, hasta)
+        self.punteros = self.punteros[hasta - self.inicio + 1:]
+        self.inicio = hasta + 1
+        return decididos
+
+    def agregar(self, obs):
+        """
+        Procesa una observación (índice)
+        Returns:
+            lista de estados (índices) que quedaron decididos en este paso,
+            posiblemente vacía
+        """
+        m = self.modelo
+        if self.t < 0:
+            self.delta = m.log_inicial + m.log_B[:, obs]
+            self.punteros.append(np.zeros(len(m.estados), dtype=np.int32))
+        else:
+            activos = self._activos()
+            candidatos = self.delta[activos, None] + m.log_A[activos]  # (activos, S)
+            mejor = candidatos.argmax(axis=0)
+            self.punteros.append(activos[mejor].astype(np.int32))
+            self.delta = candidatos[mejor, np.arange(len(m.estados))] + m.log_B[:, obs]
+        self.t += 1
+
+        if self.haz is not None and self.haz < len(self.delta):
+            podados = np.argpartition(self.delta, -self.haz)[:-self.haz]
+            self.delta[podados] = -np.inf
+        self.ventana_maxima = max(self.ventana_maxima, len(self.punteros))
+
+        # Traceback parcial: ¿en qué instante convergen todos los supervivientes?
+        conjunto = self._activos()
+        if len(conjunto) == 1:
+            return self._emitir(int(conjunto[0]), self.t)
+        for k in range(len(self.punteros) - 1, 0, -1):
+            conjunto = np.unique(self.punteros[k][conjunto])
+            if len(conjunto) == 1:
+                return self._emitir(int(conjunto[0]), self.inicio + k - 1)
+        return []
+
+    def finalizar(self):
+        """
+        Cierra la secuencia: decide el resto con el mejor estado final
+        Returns:
+            (estados pendientes, log P(camino, e_{1:T}))
+        """
+        if self.t < 0:
+            return [], 0.0
+        mejor = int(self.delta.argmax())
+        log_p = float(self.delta[mejor])
+        pendientes = self._rastrear(mejor, self.t) if self.inicio <= self.t else []
+        ventana = self.ventana_maxima
+        self.reiniciar()
+        self.ventana_maxima = ventana  # Se conserva para consultarla al terminar
+        return pendientes, log_p
+
+    def decodificar(self, obs):
+        """Secuencia completa: (índices de estado, log P(camino, e_{1:T}))"""
+        self.reiniciar()
+        camino = []
+        for o in obs:
+            camino.extend(self.agregar(int(o)))
+        resto, log_p = self.finalizar()
+        return camino + resto, log_p
+
+    def flujo(self, observaciones):
+        """
+        Generador para secuencias no acotadas: consume observaciones (sin
+        codificar) de cualquier iterable y produce cada estado en cuanto
+        queda decidido; los pendientes salen al agotarse el iterable
+        """
+        self.reiniciar()
+        desconocida = len(self.modelo.observaciones)
+        for o in observaciones:
+            for estado in self.agregar(self.modelo.indice_obs.get(o, desconocida)):
+                yield self.modelo.estados[estado]
+        resto, _ = self.finalizar()
+        for estado in resto:
+            yield self.modelo.estados[estado]
@@ -0,0 +1,283 @@
+"""
+MODELO DE N-GRAMAS
+Almacén compacto de n-gramas para modelos de lenguaje: vocabulario
+internado a enteros, cada n-grama empaquetado en un int64 (base^n) dentro
+de arrays ordenados, conteos acumulados por bloques, suavizado Kneser-Ney
+interpolado, formato en disco de arrays .npy abribles con mmap y
+puntuación por lotes con searchsorted
+"""
+
+import json
+import os
+
+import numpy as np
+
+INICIO, FIN, DESCONOCIDA = '<s>', '</s>', '<unk>'
+
+# ============================================================================
+# CONTEOS EMPAQUETADOS
+# ============================================================================
+
+def _empaquetar(ventanas, base):
+    """Filas de ids (M, k) -> claves int64 Σ id_i · base^(k-1-i)"""
+    claves = np.zeros(len(ventanas), dtype=np.int64)
+    for columna in ventanas.T:
+        claves = claves * base + columna
+    return claves
+
+
+def _unir_conteos(claves_a, conteos_a, claves_b, conteos_b):
+    """Suma dos tablas (claves ordenadas, conteos) en una sola tabla ordenada"""
+    claves, inversa = np.unique(np.concatenate([claves_a, claves_b]), return_inverse=True)
+    conteos = np.bincount(inversa, weights=np.concatenate([conteos_a, conteos_b]))
+    return claves, conteos.astype(np.int64)
+
+# ============================================================================
+# MODELO
+# ============================================================================
+
+class ModeloNgramas:
+    """
+    Modelo de n-gramas con Kneser-Ney interpolado. Para cada orden k:
+        claves[k]: n-gramas distintos de longitud k, empaquetados y ordenados
+        conteos[k]: conteo real (k = orden) o de continuación N1+(• g)
+                    (k < orden), alineado con claves[k]
+        historias[k], totales[k], tipos[k]: historias de longitud k - 1
+                    (ordenadas) con Σ conteos y N1+(h •)
+        descuentos[k]: D = n1 / (n1 + 2·n2)
+    """
+    def __init__(self, orden=3, base=2 ** 20):
+        """
+        Args:
+            orden: n (longitud máxima de los n-gramas)
+            base: cota del vocabulario; las claves ocupan base^orden < 2^63
+        """
+        if base ** orden >= 2 ** 63:
+            raise ValueError(f"base^orden no cabe en int64 (base={base}, orden={orden})")
+        self.orden = orden
+        self.base = base
+        self.vocabulario = [INICIO, FIN, DESCONOCIDA]
+        self.indice = {w: i for i, w in enumerate(self.vocabulario)}
+        self._claves_n = np.zeros(0, dtype=np.int64)
+        self._conteos_n = np.zeros(0, dtype=np.int64)
+        self.claves, self.conteos = {}, {}
+        self.historias, self.totales, self.tipos, self.descuentos = {}, {}, {}, {}
+
+    # ------------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------------
+
+    def internar(self, palabras, agregar=True):
+        """Palabras -> ids (las nuevas se agregan o van a '<unk>')"""
+        ids = []
+        for w in palabras:
+            i = self.indice.get(w)
+            if i is None:
+                if not agregar:
+                    i = self.indice[DESCONOCIDA]
+                else:
+                    if len(self.vocabulario) >= self.base:
+                        raise ValueError(f"El vocabulario supera la base ({self.base})")
+                    i = len(self.vocabulario)
+                    self.indice[w] = i
+                    self.vocabulario.append(w)
+            ids.append(i)
+        return ids
+
+    def _secuencia(self, oraciones, agregar=True):
+        """
+        Oraciones -> array concatenado con orden-1 '<s>' antes de cada una y
+        '</s>' al final, más la máscara de posiciones reales (las que
+        terminan un n-grama; ninguna ventana cruza a la oración anterior)
+        """
+        relleno = [self.indice[INICIO]] * (self.orden - 1)
+        fin = self.indice[FIN]
+        ids, reales = [], []
+        for oracion in oraciones:
+            ids_oracion = self.internar(oracion, agregar) + [fin]
+            ids.extend(relleno)
+            ids.extend(ids_oracion)
+            reales.extend([False] * len(relleno) + [True] * len(ids_oracion))
+        return np.array(ids, dtype=np.int64), np.array(reales, dtype=bool)
+
+    def _ventanas(self, ids, reales, k):
+        """Filas (M, k) con los k ids que terminan en cada posición real"""
+        fin = np.flatnonzero(reales)
+        return np.stack([ids[fin - (k - 1 - i)] for i in range(k)], axis=1)
+
+    def agregar_oraciones(self, oraciones):
+        """
+        Cuenta los n-gramas de orden máximo de un bloque de oraciones y los
+        suma a los acumulados (llamar por bloques en corpus grandes y luego
+        compilar())
+        """
+        ids, reales = self._secuencia(oraciones)
+        if not reales.any():
+            return
+        claves, conteos = np.unique(_empaquetar(self._ventanas(ids, reales, self.orden), self.base),
+                                    return_counts=True)
+        self._claves_n, self._conteos_n = _unir_conteos(self._claves_n, self._conteos_n,
+                                                        claves, conteos)
+
+    def compilar(self):
+        """
+        Deriva los órdenes inferiores y los estadísticos de Kneser-Ney a
+        partir de los n-gramas de orden máximo (todo vectorizado)
+        """
+        N, base = self.orden, self.base
+        self.claves[N], self.conteos[N] = self._claves_n, self._conteos_n
+        for k in range(N - 1, 0, -1):
+            # Continuación: N1+(• g) = número de (k+1)-gramas distintos con sufijo g
+            self.claves[k], self.conteos[k] = np.unique(self.claves[k + 1] % base ** k,
+                                                        return_counts=True)
+        for k in range(1, N + 1):
+            historias, inversa = np.unique(self.claves[k] // base, return_inverse=True)
+            self.historias[k] = historias
+            self.totales[k] = np.bincount(inversa, weights=self.conteos[k]).astype(np.int64)
+            self.tipos[k] = np.bincount(inversa).astype(np.int64)
+            n1 = np.count_nonzero(self.conteos[k] == 1)
+            n2 = np.count_nonzero(self.conteos[k] == 2)
+            # Sin singletons o sin dobles la estimación degenera (D = 0 deja sin
+            # masa a lo no visto): se usa 0.5
+            self.descuentos[k] = n1 / (n1 + 2 * n2) if n1 > 0 and n2 > 0 else 0.5
+        return self
+
+    @classmethod
+    def desde_corpus(cls, oraciones, orden=3, base=2 ** 20, bloque=100_000):
+        """
+        Args:
+            oraciones: iterable de listas de palabras (se consume por bloques)
+            bloque: oraciones por bloque de conteo
+        """
+        modelo = cls(orden, base)
+        pendientes = []
+        for oracion in oraciones:
+            pendientes.append(oracion)
+            if len(pendientes) >= bloque:
+                modelo.agregar_oraciones(pendientes)
+                pendientes = []
+        modelo.agregar_oraciones(pendientes)
+        return modelo.compilar()
+
+    # ------------------------------------------------------------------------
+    # Probabilidades
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _buscar(ordenadas, claves):
+        """Posición de cada clave en el array ordenado y si está presente"""
+        pos = np.searchsorted(ordenadas, claves)
+        pos = np.minimum(pos, len(ordenadas) - 1)
+        return pos, ordenadas[pos] == claves if len(ordenadas) else np.zeros(len(claves), bool)
+
+    def log_prob_lote(self, historias, palabras):
+        """
+        log P_KN(w | h) para M pares a la vez
+        Args:
+            historias: ids (M, h) con h < orden (se usan las últimas orden-1)
+            palabras: ids (M,)
+        Returns:
+            array (M,) de log-probabilidades naturales
+        """
+        palabras = np.asarray(palabras, dtype=np.int64)
+        historias = np.asarray(historias, dtype=np.int64).reshape(len(palabras), -1)
+        historias = historias[:, historias.shape[1] - min(historias.shape[1], self.orden - 1):]
+        V = len(self.vocabulario)
+
+        # Unigrama de continuación interpolado con la uniforme
+        pos, hay = self._buscar(self.claves[1], palabras)
+        c = np.where(hay, self.conteos[1][pos], 0)
+        D, total, tipos = self.descuentos[1], self.totales[1][0], self.tipos[1][0]
+        p = (np.maximum(c - D, 0) + D * tipos / V) / total
+
+        for k in range(2, historias.shape[1] + 2):
+            h = historias[:, historias.shape[1] - (k - 1):]
+            clave_h = _empaquetar(h, self.base)
+            pos_h, hay_h = self._buscar(self.historias[k], clave_h)
+            pos, hay = self._buscar(self.claves[k], clave_h * self.base + palabras)
+            c = np.where(hay, self.conteos[k][pos], 0)
+            total = np.where(hay_h, self.totales[k][pos_h], 0)
+            tipos = np.where(hay_h, self.tipos[k][pos_h], 0)
+            D = self.descuentos[k]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                interpolada = (np.maximum(c - D, 0) + D * tipos * p) / total
+            p = np.where(total > 0, interpolada, p)  # Historia no vista: queda el orden inferior
+        return np.log(p)
+
+    def log_prob(self, palabra, contexto=()):
+        """log P(palabra | contexto) con palabras como cadenas"""
+        contexto = list(contexto)
+        h = np.array([self.internar(contexto, agregar=False)], dtype=np.int64).reshape(1, len(contexto))
+        return float(self.log_prob_lote(h, self.internar([palabra], agregar=False))[0])
+
+    def log_probs_siguientes(self, contexto, palabras):
+        """
+        log P(w | contexto) para muchas palabras (interfaz del decodificador
+        de 59); contexto es una palabra o una tupla de palabras
+        """
+        contexto = [contexto] if isinstance(contexto, str) else list(contexto)
+        ids = np.array(self.internar(palabras, agregar=False), dtype=np.int64)
+        h = np.tile(self.internar(contexto, agregar=False), (len(ids), 1)).reshape(len(ids), len(contexto))
+        return self.log_prob_lote(h, ids)
+
+    def puntuar(self, oraciones):
+        """
+        log P(oración) de muchas oraciones con una sola evaluación
+        vectorizada de todos sus n-gramas
+        Returns:
+            (log-probabilidades por oración, número de predicciones por
+            oración: palabras + '</s>')
+        """
+        ids, reales = self._secuencia(oraciones, agregar=False)
+        ventanas = self._ventanas(ids, reales, self.orden)
+        log_p = self.log_prob_lote(ventanas[:, :-1], ventanas[:, -1])
+        por_oracion = np.array([len(o) + 1 for o in oraciones])
+        inicios = np.concatenate([[0], np.cumsum(por_oracion)[:-1]])
+        return np.add.reduceat(log_p, inicios), por_oracion
+
+    def perplejidad(self, oraciones):
+        log_p, n = self.puntuar(oraciones)
+        return float(np.exp(-log_p.sum() / n.sum()))
+
+    # ------------------------------------------------------------------------
+    # Formato en disco
+    # ------------------------------------------------------------------------
+
+    def guardar(self, directorio):
+        """
+        Un .npy por array (abribles con mmap) más vocabulario.json y
+        meta.json con orden, base y descuentos
+        """
+        os.makedirs(directorio, exist_ok=True)
+        for k in range(1, self.orden + 1):
+            for nombre in ('claves', 'conteos', 'historias', 'totales', 'tipos'):
+                np.save(os.path.join(directorio, f'{nombre}_{k}.npy'), getattr(self, nombre)[k])
+        with open(os.path.join(directorio, 'vocabulario.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.vocabulario, f, ensure_ascii=False)
+        with open(os.path.join(directorio, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'orden': self.orden, 'base': self.base,
+                       'descuentos': {str(k): d for k, d in self.descuentos.items()}}, f)
+
+    @classmethod
+    def cargar(cls, directorio, mmap=True):
+        """
+        Abre un modelo guardado; con mmap los arrays se leen del disco bajo
+        demanda (varios procesos comparten las mismas páginas)
+        """
+        with open(os.path.join(directorio, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        modelo = cls(meta['orden'], meta['base'])
+        with open(os.path.join(directorio, 'vocabulario.json'), encoding='utf-8') as f:
+            modelo.vocabulario = json.load(f)
+        modelo.indice = {w: i for i, w in enumerate(modelo.vocabulario)}
+        modelo.descuentos = {int(k): d for k, d in meta['descuentos'].items()}
+        for k in range(1, modelo.orden + 1):
+            for nombre in ('claves', 'conteos', 'historias', 'totales', 'tipos'):
+                getattr(modelo, nombre)[k] = np.load(os.path.join(directorio, f'{nombre}_{k}.npy'),
+                                                     mmap_mode='r' if mmap else None)
+        modelo._claves_n, modelo._conteos_n = modelo.claves[modelo.orden], modelo.conteos[modelo.orden]
+        return modelo
+
+    def bytes_en_memoria(self):
+        return sum(a.nbytes for nombre in ('claves', 'conteos', 'historias', 'totales', 'tipos')
+                   for a in getattr(self, nombre).values())